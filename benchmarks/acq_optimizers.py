@@ -0,0 +1,140 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+"""
+Acquisition maximum and time per suggestion of the acquisition optimizers of the GP optimizer on a mixed searchspace.
+
+The GP is fit on random observations of a synthetic objective once per seed. Every acquisition optimizer then
+proposes configs from the same model. The acquisition function (EI) is evaluated at the proposed config after it has
+been mapped to the hparam types, i.e. after rounding INTEGER and CATEGORICAL hparams, which is the config that is
+actually evaluated.
+
+Usage (with maggy installed or on the `PYTHONPATH`):
+
+    python benchmarks/acq_optimizers.py --doubles 6 --integers 2 --categoricals 2 --seeds 5
+"""
+
+import argparse
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+from maggy import Searchspace
+from maggy.optimizer import bayes
+from maggy.trial import Trial
+
+ACQ_OPTIMIZERS = ["sampling", "lbfgs", "evolution"]
+
+
+def objective(params):
+    """smooth function of the continuous hparams plus a penalty per wrong category"""
+    value = 0.0
+    for name, param in params.items():
+        if name.startswith("d"):
+            value += np.sin(3 * param) + param ** 2
+        elif name.startswith("i"):
+            value += 0.05 * (param - 7) ** 2
+        else:
+            value += 0.0 if param == "b" else 1.0
+    return value
+
+
+def searchspace(args):
+    sp_kwargs = {"d{}".format(i): ("DOUBLE", [-2.0, 2.0]) for i in range(args.doubles)}
+    sp_kwargs.update(
+        {"i{}".format(i): ("INTEGER", [0, 20]) for i in range(args.integers)}
+    )
+    sp_kwargs.update(
+        {
+            "c{}".format(i): ("CATEGORICAL", ["a", "b", "c", "d"])
+            for i in range(args.categoricals)
+        }
+    )
+    return Searchspace(**sp_kwargs)
+
+
+def fitted_optimizer(acq_optimizer, sp, observations, seed):
+    """GP optimizer with a model fit on `observations`"""
+    optimizer = bayes.GP(num_warmup_trials=0, acq_optimizer=acq_optimizer)
+    optimizer.num_trials = len(observations) + 1
+    optimizer.searchspace = sp
+    optimizer.trial_store = {}
+    optimizer.final_store = []
+    optimizer.direction = "min"
+    optimizer.seed = seed
+    optimizer._initialize(exp_dir=tempfile.mkdtemp())
+    for params in observations:
+        trial = Trial(params)
+        trial.final_metric = objective(params)
+        trial.status = Trial.FINALIZED
+        optimizer.final_store.append(trial)
+    optimizer.update_model()
+    return optimizer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--doubles", type=int, default=6)
+    parser.add_argument("--integers", type=int, default=2)
+    parser.add_argument("--categoricals", type=int, default=2)
+    parser.add_argument("--observations", type=int, default=50)
+    parser.add_argument("--suggestions", type=int, default=5)
+    parser.add_argument("--seeds", type=int, default=5)
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    sp = searchspace(args)
+    results = {name: ([], []) for name in ACQ_OPTIMIZERS}
+    for seed in range(args.seeds):
+        np.random.seed(seed)
+        observations = sp.get_random_parameter_values(args.observations)
+        # the model only depends on the observations, hence all optimizers propose from the same model
+        optimizers = {
+            name: fitted_optimizer(name, sp, observations, seed)
+            for name in ACQ_OPTIMIZERS
+        }
+        for name, optimizer in optimizers.items():
+            y_opt = optimizer.ybest(0)
+            for _ in range(args.suggestions):
+                start = time.perf_counter()
+                params = optimizer.sampling_routine(0)
+                results[name][0].append(time.perf_counter() - start)
+
+                x = np.array(
+                    sp.transform(sp.dict_to_list(params), normalize_categorical=True)
+                ).reshape(1, -1)
+                ei = -optimizer.acq_fun.evaluate(x, optimizer.models[0], y_opt)[0]
+                results[name][1].append(ei)
+            optimizer._finalize_experiment(optimizer.final_store)
+
+    print("{} suggestions per optimizer".format(args.seeds * args.suggestions))
+    print(
+        "{:>10} {:>12} {:>12} {:>12}".format(
+            "optimizer", "time [ms]", "mean EI", "median EI"
+        )
+    )
+    for name, (times, eis) in results.items():
+        print(
+            "{:>10} {:>12.1f} {:>12.5f} {:>12.5f}".format(
+                name, 1000 * np.mean(times), np.mean(eis), np.median(eis)
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+"""
+Time per promotion decision of the ASHA optimizer with many finalized trials per rung.
+
+The rungs are filled with `--trials` finalized trials each. Then trials are finalized one by one and `get_suggestion`
+is called after every one of them, like the driver does. The time is compared to the previous implementation, which
+scanned and sorted every rung on every call (reproduced in `scan_promotion`), and both are checked to promote the same
+trials.
+
+Usage (with maggy installed or on the `PYTHONPATH`):
+
+    python benchmarks/asha_promotion.py --trials 1000 10000 --calls 200
+"""
+
+import argparse
+import random
+import time
+
+from maggy import Searchspace
+from maggy.optimizer import Asha
+from maggy.optimizer.asha import _Rung
+from maggy.trial import Trial
+
+
+def scan_promotion(optimizer, promoted):
+    """returns the trial the previous implementation promotes, by scanning and sorting the rungs"""
+    for k in range(optimizer.max_rung - 1, -1, -1):
+        if k not in optimizer.rungs:
+            continue
+        finalized = [
+            x for x in optimizer.rungs[k].trials if x.status == Trial.FINALIZED
+        ]
+        n_top = len(finalized) // optimizer.reduction_factor
+        if n_top - len(promoted.setdefault(k, [])) <= 0:
+            continue
+        finalized.sort(key=lambda x: x.final_metric)
+        promotable = [t for t in finalized[:n_top] if t.trial_id not in promoted[k]]
+        if promotable:
+            promoted[k].append(promotable[0].trial_id)
+            return promotable[0]
+    return None
+
+
+def finalize(optimizer, trial):
+    trial.status = Trial.FINALIZED
+    trial.final_metric = random.random()
+    optimizer.final_store.append(trial)
+
+
+def filled_optimizer(n_trials):
+    """Asha optimizer with `n_trials` finalized trials in rung 0 and 1, nothing promotable"""
+    optimizer = Asha(reduction_factor=3, resource_min=1, resource_max=729)
+    optimizer.searchspace = Searchspace(x=("DOUBLE", [0.0, 1.0]))
+    optimizer.num_trials = 10 * n_trials
+    optimizer.trial_store = {}
+    optimizer.final_store = []
+    optimizer.direction = "min"
+    optimizer.initialize()
+
+    for k in (0, 1):
+        if k not in optimizer.rungs:
+            optimizer.rungs[k] = _Rung(optimizer.reduction_factor)
+        for _ in range(n_trials):
+            params = {"x": random.random(), "budget": 3**k}
+            trial = Trial(params)
+            optimizer._add(trial, k)
+            finalize(optimizer, trial)
+    optimizer._add_finalized_trials()
+    # mark the top trials as promoted, so promotion depends on the next finalized trials
+    promoted = {}
+    for k in (0, 1):
+        while True:
+            trial = optimizer.rungs[k].pop_promotable()
+            if trial is None:
+                break
+            promoted.setdefault(k, []).append(trial.trial_id)
+    return optimizer, promoted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--trials", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    print("{:>8} {:>14} {:>14}".format("trials", "heaps [ms]", "scan [ms]"))
+    for n_trials in args.trials:
+        random.seed(0)
+        optimizer, promoted = filled_optimizer(n_trials)
+        heap_time = scan_time = 0.0
+        running = []
+        for _ in range(args.calls):
+            trial = running.pop(0) if running else optimizer.get_suggestion()
+            finalize(optimizer, trial)
+
+            start = time.perf_counter()
+            expected = scan_promotion(optimizer, promoted)
+            scan_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            suggestion = optimizer.get_suggestion(trial)
+            heap_time += time.perf_counter() - start
+
+            if expected is None:
+                assert suggestion.params["budget"] == optimizer.resource_min
+            else:
+                assert suggestion.params["x"] == expected.params["x"]
+            running.append(suggestion)
+
+        print(
+            "{:>8} {:>14.3f} {:>14.3f}".format(
+                n_trials,
+                1000 * heap_time / args.calls,
+                1000 * scan_time / args.calls,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
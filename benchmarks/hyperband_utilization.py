@@ -0,0 +1,133 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+"""
+Cluster utilization of the synchronous and asynchronous Hyperband pruners.
+
+The driver and the executors are simulated in virtual time: a trial takes as long as its budget times a random factor
+in [0.5, 1.5]. Idle executors ask the pruner for a run whenever a trial finishes, like in the IDLE retry loop of the
+driver. Utilization is the fraction of executor time spent evaluating trials until the last trial finished. The time
+until the first trial on the maximum budget finished shows how early a fully trained model is available.
+
+Usage (with maggy installed or on the `PYTHONPATH`):
+
+    python benchmarks/hyperband_utilization.py --workers 4 8 16 --iterations 8 --seeds 5
+"""
+
+import argparse
+import heapq
+import tempfile
+
+import numpy as np
+
+from maggy.pruner import AsyncHyperband, Hyperband
+
+PRUNERS = {"hyperband": Hyperband, "asynchyperband": AsyncHyperband}
+
+
+def simulate(pruner_cls, n_workers, n_iterations, seed):
+    """runs an experiment with `n_workers` simulated executors
+
+    :return: utilization, makespan, time of first result on max budget, number of trials, best metric on max budget
+    """
+    rng = np.random.default_rng(seed)
+    final_metrics = {}
+    pruner = pruner_cls(
+        min_budget=1,
+        max_budget=27,
+        eta=3,
+        n_iterations=n_iterations,
+        trial_metric_getter=lambda trial_ids: {
+            trial_id: final_metrics[trial_id]
+            for trial_id in ([trial_ids] if isinstance(trial_ids, str) else trial_ids)
+            if trial_id in final_metrics
+        },
+    )
+    pruner.initialize_logger(tempfile.mkdtemp())
+    quality = {}
+    budgets = {}
+    running = []  # heap of (end time, trial id)
+    idle = n_workers
+    now = busy = 0.0
+    first = None
+    n_trials = 0
+
+    while True:
+        # assign runs to idle workers
+        while idle > 0:
+            run = pruner.pruning_routine()
+            if run is None or run == "IDLE":
+                break
+            trial_id = "trial{}".format(n_trials)
+            n_trials += 1
+            # promoted trials keep the quality of their config
+            quality[trial_id] = (
+                rng.random() if run["trial_id"] is None else quality[run["trial_id"]]
+            )
+            budgets[trial_id] = run["budget"]
+            pruner.report_trial(run["trial_id"], trial_id)
+            duration = run["budget"] * rng.uniform(0.5, 1.5)
+            busy += duration
+            heapq.heappush(running, (now + duration, trial_id))
+            idle -= 1
+        if not running:
+            break
+        # next trial finishes
+        now, trial_id = heapq.heappop(running)
+        final_metrics[trial_id] = quality[trial_id] + rng.normal(
+            0, 0.3 / budgets[trial_id]
+        )
+        idle += 1
+        if first is None and budgets[trial_id] == pruner.max_budget:
+            first = now
+
+    best = min(
+        quality[trial_id]
+        for trial_id in final_metrics
+        if budgets[trial_id] == pruner.max_budget
+    )
+    return busy / (n_workers * now), now, first, n_trials, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--iterations", type=int, default=8)
+    parser.add_argument("--seeds", type=int, default=5)
+    args = parser.parse_args()
+
+    print(
+        "{:>15} {:>8} {:>12} {:>10} {:>10} {:>8} {:>10}".format(
+            "pruner", "workers", "utilization", "makespan", "first", "trials", "best"
+        )
+    )
+    for n_workers in args.workers:
+        for name, pruner_cls in PRUNERS.items():
+            results = np.array(
+                [
+                    simulate(pruner_cls, n_workers, args.iterations, seed)
+                    for seed in range(args.seeds)
+                ]
+            ).mean(axis=0)
+            print(
+                "{:>15} {:>8} {:>12.3f} {:>10.1f} {:>10.1f} {:>8.0f} {:>10.4f}".format(
+                    name, n_workers, *results
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+"""
+Assembly of the interim results dataset of `BaseAsyncBO.get_XY(interim_results=True)`.
+
+Compares the previous assembly (`np.vstack` per interim result in a double
+python loop) to the vectorized, incremental `ObservationStore.interim()`, for a
+full rebuild and for the incremental update after one more finalized trial.
+
+Usage (with maggy installed or on the `PYTHONPATH`):
+
+    python benchmarks/interim_dataset.py --trials 1000 --epochs 100 --interval 10
+"""
+
+import argparse
+import time
+from copy import deepcopy
+
+import numpy as np
+
+from maggy import Searchspace
+from maggy.optimizer.bayes.base import BaseAsyncBO
+from maggy.optimizer.observations import ObservationStore
+from maggy.trial import Trial
+
+
+def loop_assembly(store, interval, max_budget):
+    """assembly of the dataset before it was vectorized"""
+    hparams_transform = store.X()
+    metrics = store.curves()
+    interim_result_indices = [
+        BaseAsyncBO.get_interim_result_idx(None, metric_history, interval)
+        for metric_history in metrics
+    ]
+    metrics_flat = np.hstack(
+        [
+            metrics[trial_idx][indices]
+            for trial_idx, indices in enumerate(interim_result_indices)
+        ]
+    )
+    hparams_augumented = np.empty((0, hparams_transform.shape[1] + 1))
+    for indices, trial_hparams in zip(interim_result_indices, hparams_transform):
+        for idx in indices:
+            normalized_budget = Searchspace._normalize_integer([0, max_budget - 1], idx)
+            augumented_trial_hparams = np.append(
+                deepcopy(trial_hparams), normalized_budget
+            )
+            hparams_augumented = np.vstack(
+                (hparams_augumented, augumented_trial_hparams)
+            )
+    return hparams_augumented, metrics_flat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trials", type=int, default=1000)
+    parser.add_argument("--epochs", type=int, default=100)
+    parser.add_argument("--interval", type=int, default=10)
+    args = parser.parse_args()
+
+    sp = Searchspace(
+        lr=("DOUBLE", [0.0001, 0.1]),
+        dropout=("DOUBLE", [0.0, 0.9]),
+        layers=("INTEGER", [1, 8]),
+        activation=("CATEGORICAL", ["relu", "tanh", "sigmoid", "elu"]),
+    )
+    final_store = []
+    for params in sp.get_random_parameter_values(args.trials + 1):
+        trial = Trial(params)
+        trial.metric_history = list(np.random.rand(args.epochs))
+        trial.final_metric = trial.metric_history[-1]
+        final_store.append(trial)
+
+    store = ObservationStore(sp, normalize_categorical=True)
+    store.sync(final_store[:-1])
+
+    start = time.perf_counter()
+    Z_loop, y_loop = loop_assembly(store, args.interval, args.epochs)
+    t_loop = time.perf_counter() - start
+
+    start = time.perf_counter()
+    Z, y = store.interim(args.interval, args.epochs)
+    t_cold = time.perf_counter() - start
+    assert np.allclose(Z, Z_loop) and np.allclose(y, y_loop)
+
+    store.sync(final_store)
+    start = time.perf_counter()
+    store.interim(args.interval, args.epochs)
+    t_incremental = time.perf_counter() - start
+
+    print(
+        "{} trials x {} epochs, interval {}: {} interim results".format(
+            args.trials, args.epochs, args.interval, len(y)
+        )
+    )
+    print("python loop + vstack:      {:>10.4f}s".format(t_loop))
+    print(
+        "vectorized (full):        {:>10.4f}s  {:>8.1f}x".format(
+            t_cold, t_loop / t_cold
+        )
+    )
+    print(
+        "vectorized (+1 trial):    {:>10.4f}s  {:>8.1f}x".format(
+            t_incremental, t_loop / t_incremental
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
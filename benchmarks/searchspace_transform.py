@@ -0,0 +1,121 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+"""
+Compares the row-wise `Searchspace.transform()`/`inverse_transform()` applied
+with `np.apply_along_axis` to the column-wise batch transforms.
+
+Usage (with maggy installed or on the `PYTHONPATH`):
+
+    python benchmarks/searchspace_transform.py --rows 10000 100000 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from maggy import Searchspace
+
+
+def _timeit(fn, repeat):
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument(
+        "--max-rowwise-rows",
+        type=int,
+        default=100000,
+        help="skip the row-wise transforms for more rows than this",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sp = Searchspace(
+        lr=("DOUBLE", [0.0001, 0.1]),
+        dropout=("DOUBLE", [0.0, 0.9]),
+        layers=("INTEGER", [1, 8]),
+        units=("INTEGER", [16, 1024]),
+        activation=("CATEGORICAL", ["relu", "tanh", "sigmoid", "elu"]),
+        optimizer=("CATEGORICAL", ["adam", "sgd", "rmsprop"]),
+    )
+
+    print(
+        "{:>10} | {:>12} {:>12} {:>8} | {:>12} {:>12} {:>8}".format(
+            "rows",
+            "transform",
+            "batch",
+            "speedup",
+            "inverse",
+            "batch",
+            "speedup",
+        )
+    )
+    for n_rows in args.rows:
+        # object array, so numeric hparams are not converted to strings
+        hparams = np.array(
+            [
+                sp.dict_to_list(params)
+                for params in sp.get_random_parameter_values(n_rows)
+            ],
+            dtype=object,
+        )
+        transformed = sp.transform_batch(hparams, normalize_categorical=True)
+
+        t_batch = _timeit(
+            lambda: sp.transform_batch(hparams, normalize_categorical=True),
+            args.repeat,
+        )
+        t_inv_batch = _timeit(
+            lambda: sp.inverse_transform_batch(transformed, normalize_categorical=True),
+            args.repeat,
+        )
+        if n_rows <= args.max_rowwise_rows:
+            t_row = _timeit(
+                lambda: np.apply_along_axis(
+                    sp.transform, 1, hparams, normalize_categorical=True
+                ),
+                1,
+            )
+            t_inv_row = _timeit(
+                lambda: [
+                    sp.inverse_transform(row, normalize_categorical=True)
+                    for row in transformed
+                ],
+                1,
+            )
+            row_cols = "{:>11.4f}s {:>11.4f}s {:>7.1f}x".format(
+                t_row, t_batch, t_row / t_batch
+            )
+            inv_cols = "{:>11.4f}s {:>11.4f}s {:>7.1f}x".format(
+                t_inv_row, t_inv_batch, t_inv_row / t_inv_batch
+            )
+        else:
+            row_cols = "{:>12} {:>11.4f}s {:>8}".format("-", t_batch, "-")
+            inv_cols = "{:>12} {:>11.4f}s {:>8}".format("-", t_inv_batch, "-")
+        print("{:>10} | {} | {}".format(n_rows, row_cols, inv_cols))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+"""
+Fit and suggestion time of the `"exact"` and `"sparse"` GP surrogates for large observation counts, e.g. interim
+results where every interim epoch is a row.
+
+The fit time is measured for a cold fit (including kernel hyperparameter restarts) and a warm started refit. The
+suggestion time covers what `GP.sampling_routine()` does with the surrogate: evaluating EI at `n_points` random
+candidates and the stacked lbfgs optimization from the best `n_restarts` of them. The exact GP is skipped for more than
+`--max-exact` rows, as it needs O(n^2) memory.
+
+Usage (with maggy installed or on the `PYTHONPATH`):
+
+    python benchmarks/sparse_gp.py --rows 1000 10000 50000 --n-inducing 500
+"""
+
+import argparse
+import time
+import warnings
+
+import numpy as np
+from scipy.optimize import fmin_l_bfgs_b
+from skopt.learning.gaussian_process import GaussianProcessRegressor
+from skopt.learning.gaussian_process.kernels import ConstantKernel, Matern
+
+from maggy.optimizer.bayes.acquisitions import GaussianProcess_EI
+from maggy.optimizer.bayes.surrogates import SparseGaussianProcessRegressor
+
+
+def objective(X):
+    """smooth test function on the unit hypercube, the last column plays the role of the budget"""
+    return np.sin(3 * X[:, 0]) * np.cos(2 * X[:, 1]) + (X[:, 2:] ** 2).sum(axis=1)
+
+
+def base_model(surrogate, n_dims, n_inducing):
+    """surrogate model configured like in `GP.init_model()`"""
+    kernel = ConstantKernel(1.0, (0.01, 1000.0)) * Matern(
+        length_scale=np.ones(n_dims),
+        length_scale_bounds=[(0.01, 100)] * n_dims,
+        nu=2.5,
+    )
+    kwargs = dict(
+        kernel=kernel, normalize_y=True, noise="gaussian", n_restarts_optimizer=2
+    )
+    if surrogate == "sparse":
+        return SparseGaussianProcessRegressor(
+            n_inducing=n_inducing, random_state=0, **kwargs
+        )
+    return GaussianProcessRegressor(**kwargs)
+
+
+def suggest(model, y_opt, n_dims, n_points, n_restarts, rng):
+    """acquisition optimization like `GP.sampling_routine()` with the stacked lbfgs optimizer"""
+    X = rng.random((n_points, n_dims))
+    values = GaussianProcess_EI.evaluate(X, model, y_opt)
+    x0 = X[np.argsort(values)[:n_restarts]]
+
+    def func(z):
+        values, grads = GaussianProcess_EI.evaluate_batch(
+            z.reshape(x0.shape), model, y_opt
+        )
+        return np.sum(values), grads.ravel()
+
+    fmin_l_bfgs_b(func, x0.ravel(), bounds=[(0.0, 1.0)] * x0.size, maxiter=20)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--dims", type=int, default=5)
+    parser.add_argument("--n-inducing", type=int, default=500)
+    parser.add_argument("--max-exact", type=int, default=2000)
+    parser.add_argument("--n-points", type=int, default=10000)
+    parser.add_argument("--n-restarts", type=int, default=5)
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    rng = np.random.default_rng(0)
+    X_test = rng.random((1000, args.dims))
+    print(
+        "{:>8} {:>8} {:>10} {:>10} {:>10} {:>8}".format(
+            "rows", "model", "fit", "refit", "suggest", "rmse"
+        )
+    )
+    for n in args.rows:
+        X = rng.random((n, args.dims))
+        y = objective(X) + 0.05 * rng.standard_normal(n)
+        for surrogate in ["exact", "sparse"]:
+            if surrogate == "exact" and n > args.max_exact:
+                print("{:>8} {:>8} {:>10}".format(n, surrogate, "skipped"))
+                continue
+            model = base_model(surrogate, args.dims, args.n_inducing)
+
+            start = time.perf_counter()
+            model.fit(X, y)
+            t_fit = time.perf_counter() - start
+
+            if surrogate == "sparse":
+                # warm started from the fitted kernel hyperparameters
+                start = time.perf_counter()
+                model.fit(X, y)
+                t_refit = "{:>10.3f}".format(time.perf_counter() - start)
+            else:
+                t_refit = "{:>10}".format("-")
+
+            start = time.perf_counter()
+            suggest(model, y.min(), args.dims, args.n_points, args.n_restarts, rng)
+            t_suggest = time.perf_counter() - start
+
+            rmse = np.sqrt(np.mean((model.predict(X_test) - objective(X_test)) ** 2))
+            print(
+                "{:>8} {:>8} {:>10.3f} {} {:>10.3f} {:>8.4f}".format(
+                    n, surrogate, t_fit, t_refit, t_suggest, rmse
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
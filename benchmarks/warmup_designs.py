@@ -0,0 +1,180 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+"""
+Number of trials the GP optimizer needs to reach a target regret on synthetic
+objectives, for each warmup design of `BaseAsyncBO`.
+
+Trials are evaluated sequentially in the benchmark process, mimicking the
+experiment driver with a single executor.
+
+Usage (with maggy installed or on the `PYTHONPATH`):
+
+    python benchmarks/warmup_designs.py --seeds 10 --trials 40
+"""
+
+import argparse
+import random
+import tempfile
+import warnings
+
+import numpy as np
+
+from maggy import Searchspace
+from maggy.optimizer import bayes
+from maggy.trial import Trial
+
+DESIGNS = ["random", "sobol", "lhs", "maximin"]
+
+
+def branin(x1, x2):
+    return (
+        (x2 - 5.1 / (4 * np.pi ** 2) * x1 ** 2 + 5 / np.pi * x1 - 6) ** 2
+        + 10 * (1 - 1 / (8 * np.pi)) * np.cos(x1)
+        + 10
+    )
+
+
+_HARTMANN_A = np.array(
+    [
+        [10, 3, 17, 3.5, 1.7, 8],
+        [0.05, 10, 17, 0.1, 8, 14],
+        [3, 3.5, 1.7, 10, 17, 8],
+        [17, 8, 0.05, 10, 0.1, 14],
+    ]
+)
+_HARTMANN_P = 1e-4 * np.array(
+    [
+        [1312, 1696, 5569, 124, 8283, 5886],
+        [2329, 4135, 8307, 3736, 1004, 9991],
+        [2348, 1451, 3522, 2883, 3047, 6650],
+        [4047, 8828, 8732, 5743, 1091, 381],
+    ]
+)
+_HARTMANN_ALPHA = np.array([1.0, 1.2, 3.0, 3.2])
+
+
+def hartmann6(**params):
+    x = np.array([params["x{}".format(i)] for i in range(6)])
+    return -np.sum(
+        _HARTMANN_ALPHA * np.exp(-np.sum(_HARTMANN_A * (x - _HARTMANN_P) ** 2, axis=1))
+    )
+
+
+def mixed(lr, layers, activation):
+    # optimum 0 at lr=0.3, layers=4, activation="elu"
+    penalty = {"relu": 0.5, "tanh": 1.0, "sigmoid": 1.5, "elu": 0.0}
+    return 10 * (lr - 0.3) ** 2 + 0.1 * (layers - 4) ** 2 + penalty[activation]
+
+
+# name: (objective, searchspace kwargs, optimum, target regret)
+OBJECTIVES = {
+    "branin": (
+        branin,
+        {"x1": ("DOUBLE", [-5, 10]), "x2": ("DOUBLE", [0, 15])},
+        0.397887,
+        0.5,
+    ),
+    "hartmann6": (
+        hartmann6,
+        {"x{}".format(i): ("DOUBLE", [0, 1]) for i in range(6)},
+        -3.32237,
+        1.0,
+    ),
+    "mixed": (
+        mixed,
+        {
+            "lr": ("DOUBLE", [0.0, 1.0]),
+            "layers": ("INTEGER", [1, 12]),
+            "activation": ("CATEGORICAL", ["relu", "tanh", "sigmoid", "elu"]),
+        },
+        0.0,
+        0.2,
+    ),
+}
+
+
+def trials_to_target(objective, sp_kwargs, optimum, target, design, args, seed):
+    """runs one experiment and returns the number of trials until the target regret was reached, or None"""
+    np.random.seed(seed)
+    random.seed(seed)
+    optimizer = bayes.GP(num_warmup_trials=args.warmup_trials, warmup_sampling=design)
+    optimizer.num_trials = args.trials
+    optimizer.searchspace = Searchspace(**sp_kwargs)
+    optimizer.trial_store = {}
+    optimizer.final_store = []
+    optimizer.direction = "min"
+    optimizer.seed = seed
+    optimizer._initialize(exp_dir=tempfile.mkdtemp())
+
+    trial = optimizer.get_suggestion()
+    while trial is not None:
+        optimizer.trial_store[trial.trial_id] = trial
+        trial.final_metric = objective(**trial.params)
+        trial.status = Trial.FINALIZED
+        optimizer.final_store.append(optimizer.trial_store.pop(trial.trial_id))
+        if trial.final_metric - optimum <= target:
+            optimizer._finalize_experiment(optimizer.final_store)
+            return len(optimizer.final_store)
+        trial = optimizer.get_suggestion(trial)
+
+    optimizer._finalize_experiment(optimizer.final_store)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seeds", type=int, default=5)
+    parser.add_argument("--trials", type=int, default=40)
+    parser.add_argument("--warmup-trials", type=int, default=8)
+    parser.add_argument("--objectives", nargs="+", default=list(OBJECTIVES.keys()))
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    print(
+        "trials to reach target regret, median over {} seeds "
+        "(-: target not reached within {} trials in most experiments)".format(args.seeds, args.trials)
+    )
+    print(
+        "{:>10} | ".format("objective") + " ".join("{:>14}".format(d) for d in DESIGNS)
+    )
+    for name in args.objectives:
+        objective, sp_kwargs, optimum, target = OBJECTIVES[name]
+        cols = []
+        for design in DESIGNS:
+            n_trials = [
+                trials_to_target(
+                    objective, sp_kwargs, optimum, target, design, args, seed
+                )
+                for seed in range(args.seeds)
+            ]
+            reached = [n for n in n_trials if n is not None]
+            # experiments that did not reach the target count as infinitely many trials
+            median = np.median([np.inf if n is None else n for n in n_trials])
+            cols.append(
+                "{:>14}".format(
+                    "{} ({}/{})".format(
+                        median if np.isfinite(median) else "-",
+                        len(reached),
+                        len(n_trials),
+                    )
+                )
+            )
+        print("{:>10} | ".format(name) + " ".join(cols))
+
+
+if __name__ == "__main__":
+    main()
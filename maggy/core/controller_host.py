@@ -0,0 +1,261 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+"""
+Runs an optimizer in a dedicated process.
+
+Surrogate fitting and acquisition optimization are CPU bound numpy/scipy
+workloads that hold the GIL of the driver for long stretches of time. Since
+the RPC listener thread and the message digestion thread of the driver share
+this interpreter, heartbeats of the executors are answered late while a
+suggestion is computed. The `ControllerHost` moves the optimizer into a
+separate process and only exchanges observation deltas and suggestions with it
+over a pipe. Waiting on the pipe releases the GIL.
+"""
+
+import multiprocessing
+import traceback
+
+from pyspark import cloudpickle
+
+from maggy.core.exceptions import ControllerHostError
+from maggy.optimizer.abstractoptimizer import AbstractOptimizer
+
+
+class ControllerHost(AbstractOptimizer):
+    """Proxy for an optimizer that runs in a separate host process.
+
+    The proxy behaves like an `AbstractOptimizer` towards the experiment driver.
+    The wrapped optimizer runs unmodified in the host process, where it works on
+    mirrors of `trial_store` and `final_store`:
+
+    - trials returned by the optimizer are added to the mirrored `trial_store`,
+      the same way the driver adds them to its own `trial_store`
+    - trials that were finalized by the driver since the last suggestion are
+      sent along with the next suggestion request and moved from the mirrored
+      `trial_store` to the mirrored `final_store`
+
+    Pruners are part of the wrapped optimizer and hence run in the host process
+    as well.
+
+    Sample usage:
+
+    >>> from maggy.optimizer import bayes
+    >>> from maggy.experiment_config import OptimizationConfig
+    >>> config = OptimizationConfig(..., optimizer=bayes.GP(), controller_process=True)
+    """
+
+    def __init__(self, controller, start_method="spawn"):
+        """
+        :param controller: optimizer to run in the host process
+        :type controller: AbstractOptimizer
+        :param start_method: multiprocessing start method of the host process. Defaults to `spawn`, since forking
+                             the driver with its running threads is not safe.
+        :type start_method: str
+        """
+        super().__init__()
+        self.controller = controller
+        self.start_method = start_method
+
+        # number of trials in `final_store` that have already been sent to the host process
+        self._n_synced = 0
+        self._process = None
+        self._conn = None
+
+    def name(self):
+        return self.controller.name()
+
+    def initialize(self):
+        pass
+
+    def _initialize(self, exp_dir):
+        """starts the host process and initializes the wrapped optimizer inside of it.
+
+        :param exp_dir: path of experiment directory
+        :type exp_dir: str
+        """
+        ctx = multiprocessing.get_context(self.start_method)
+        parent_conn, child_conn = ctx.Pipe()
+        self._process = ctx.Process(
+            target=_host_loop, args=(child_conn,), name="maggy-controller", daemon=True
+        )
+        self._process.start()
+        # only the host process uses this end of the pipe
+        child_conn.close()
+        self._conn = parent_conn
+
+        self._request(
+            "INIT",
+            {
+                # cloudpickle, so optimizers defined interactively can be sent as well
+                "controller": cloudpickle.dumps(self.controller),
+                "num_trials": self.num_trials,
+                "searchspace": self.searchspace,
+                "direction": self.direction,
+                "seed": self.seed,
+                "exp_dir": exp_dir,
+            },
+        )
+
+    def get_suggestion(self, trial=None):
+        return self._request(
+            "SUGGEST",
+            {
+                "finalized": self._finalized_delta(),
+                "trial_id": trial.trial_id if trial else None,
+            },
+        )
+
+    def get_suggestions(self, n, trial=None):
+        return self._request(
+            "SUGGEST_BATCH",
+            {
+                "finalized": self._finalized_delta(),
+                "trial_id": trial.trial_id if trial else None,
+                "n": n,
+            },
+        )
+
+    def finalize_experiment(self, trials):
+        pass
+
+    def _finalize_experiment(self, trials):
+        if self._process is None:
+            return
+        self._request("FINAL", {"finalized": self._finalized_delta()})
+        self._close_log()
+
+    def _close_log(self):
+        """stops the host process, which closes the logs of the optimizer and pruner"""
+        if self._process is None:
+            return
+        try:
+            if self._process.is_alive():
+                self._conn.send(("STOP", None))
+                self._process.join(timeout=10)
+        except (BrokenPipeError, EOFError, OSError):
+            pass
+        finally:
+            if self._process.is_alive():
+                self._process.terminate()
+            self._conn.close()
+            self._process = None
+
+    def _finalized_delta(self):
+        """returns trials that were finalized since the last request to the host process"""
+        delta = self.final_store[self._n_synced :]
+        self._n_synced = len(self.final_store)
+        return delta
+
+    def _request(self, command, payload):
+        """sends `command` to the host process and blocks until it answers.
+
+        :raises ControllerHostError: if the optimizer raised an exception in the host process
+        """
+        self._conn.send((command, payload))
+        status, result = self._conn.recv()
+        if status == "ERROR":
+            raise ControllerHostError(command, result)
+        return result
+
+
+def _host_loop(conn):
+    """Main loop of the host process, serving requests from the `ControllerHost`.
+
+    :param conn: host end of the pipe
+    :type conn: multiprocessing.connection.Connection
+    """
+    controller = None
+    while True:
+        try:
+            command, payload = conn.recv()
+        except EOFError:
+            # driver went away
+            break
+
+        if command == "STOP":
+            if controller is not None and controller.fd:
+                controller._close_log()
+                if controller.pruner and controller.pruner.fd:
+                    controller.pruner._close_log()
+            break
+
+        try:
+            if command == "INIT":
+                controller = cloudpickle.loads(payload["controller"])
+                controller.num_trials = payload["num_trials"]
+                controller.searchspace = payload["searchspace"]
+                controller.direction = payload["direction"]
+                controller.seed = payload["seed"]
+                controller.trial_store = {}
+                controller.final_store = []
+                controller._initialize(exp_dir=payload["exp_dir"])
+                result = None
+            elif command == "SUGGEST":
+                last_trial = _last_trial(controller, payload)
+                result = controller.get_suggestion(last_trial)
+                if result is not None and result != "IDLE":
+                    # the driver starts every trial it receives
+                    controller.trial_store[result.trial_id] = result
+            elif command == "SUGGEST_BATCH":
+                last_trial = _last_trial(controller, payload)
+                # `get_suggestions()` adds the trials to the mirrored `trial_store` itself
+                result = controller.get_suggestions(payload["n"], last_trial)
+            elif command == "FINAL":
+                _apply_finalized(controller, payload["finalized"])
+                controller._finalize_experiment(controller.final_store)
+                result = None
+            else:
+                raise ValueError("Unknown command: {}".format(command))
+        except Exception:  # pylint: disable=broad-except
+            conn.send(("ERROR", traceback.format_exc()))
+        else:
+            conn.send(("OK", result))
+
+    conn.close()
+
+
+def _apply_finalized(controller, finalized):
+    """moves finalized trials from the mirrored `trial_store` to the mirrored `final_store`
+
+    The trials received from the driver replace the copies in the host process, but keep the `info_dict` of the host
+    copy, since optimizers annotate busy trials (e.g. imputed metrics) while they are running.
+
+    :return: the last finalized trial or None if `finalized` is empty
+    :rtype: Trial|None
+    """
+    trial = None
+    for trial in finalized:
+        busy_trial = controller.trial_store.pop(trial.trial_id, None)
+        if busy_trial is not None:
+            trial.info_dict = busy_trial.info_dict
+        controller.final_store.append(trial)
+    return trial
+
+
+def _last_trial(controller, payload):
+    """applies the finalized trials of a suggestion request and returns the finished trial the request refers to"""
+    last_trial = _apply_finalized(controller, payload["finalized"])
+    if last_trial is None or last_trial.trial_id != payload["trial_id"]:
+        last_trial = next(
+            (
+                t
+                for t in reversed(controller.final_store)
+                if t.trial_id == payload["trial_id"]
+            ),
+            None,
+        )
+    return last_trial
@@ -119,3 +119,16 @@ class BadArgumentsError(Exception):
             callable, suggestion
         )
         super().__init__(self.message)
+
+
+class ControllerHostError(Exception):
+    """Raised when the optimizer running in the controller host process
+    fails. The traceback of the host process is part of the message.
+    """
+
+    def __init__(self, command, host_traceback):
+        self.message = (
+            "The controller host process failed while processing `{}`:\n"
+            "{}".format(command, host_traceback)
+        )
+        super().__init__(self.message)
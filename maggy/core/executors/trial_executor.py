@@ -134,6 +134,7 @@ def trial_executor_fn(
                     env.mkdir(tb_logdir)
 
                 reporter.init_logger(trial_log_file)
+                reporter.init_checkpoints(log_dir)
                 tensorboard._register(tb_logdir)
                 if experiment_type == "ablation":
                     env.dump(
@@ -15,7 +15,7 @@
 #
 
 import json
-from typing import Callable, Union, Optional
+from typing import Callable, List, Union, Optional
 
 from maggy import util
 from maggy.experiment_config import AblationConfig
@@ -50,6 +50,7 @@ class AblationDriver(OptimizationDriver):
         super().__init__(config, app_id, run_id)
         # set up an ablation study experiment
         self.earlystop_check = NoStoppingRule.earlystop_check
+        self.earlystop_sweep = NoStoppingRule.earlystop_sweep
 
         if isinstance(config.ablation_study, AblationStudy):
             self.ablation_study = config.ablation_study
@@ -149,6 +150,21 @@ class AblationDriver(OptimizationDriver):
         """
         return self.controller.get_trial(trial)
 
+    def controller_get_next_batch(self, n: int) -> List[Union[Trial, None]]:
+        """Gets trials for `n` idle executors, one by one from the ablator.
+
+        :param n: Number of idle executors.
+
+        :returns: Up to `n` trials. A shorter list ends with `None`, which
+            applies to the remaining executors as well.
+        """
+        trials = []
+        for _ in range(n):
+            trials.append(self.controller_get_next())
+            if trials[-1] is None:
+                break
+        return trials
+
     def prep_results(self, duration_str: str) -> str:
         """Writes and returns the results of the experiment into one string and
         returns it.
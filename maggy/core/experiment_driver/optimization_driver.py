@@ -17,16 +17,29 @@
 import os
 import time
 import json
-from typing import Callable, Optional, Union
+from typing import Callable, List, Optional, Union
 
 from maggy import util, tensorboard
 from maggy.searchspace import Searchspace
-from maggy.optimizer import AbstractOptimizer, RandomSearch, Asha, SingleRun, GridSearch
-from maggy.earlystop import AbstractEarlyStop, MedianStoppingRule, NoStoppingRule
+from maggy.optimizer import (
+    AbstractOptimizer,
+    RandomSearch,
+    Asha,
+    SingleRun,
+    GridSearch,
+    PBT,
+)
+from maggy.earlystop import (
+    AbstractEarlyStop,
+    MedianStoppingRule,
+    NoStoppingRule,
+    PercentileStoppingRule,
+)
 from maggy.optimizer import bayes
 from maggy.trial import Trial
 from maggy.core.experiment_driver.driver import Driver
 from maggy.core.rpc import OptimizationServer
+from maggy.core.controller_host import ControllerHost
 from maggy.core.environment.singleton import EnvSing
 from maggy.core.executors.trial_executor import trial_executor_fn
 from maggy.experiment_config import AblationConfig, OptimizationConfig
@@ -46,9 +59,12 @@ class OptimizationDriver(Driver):
         "asha": Asha,
         "tpe": bayes.TPE,
         "gp": bayes.GP,
+        "rf": bayes.RF,
+        "turbo": bayes.TuRBO,
         "none": SingleRun,
         "faulty_none": None,
         "gridsearch": GridSearch,
+        "pbt": PBT,
     }
 
     def __init__(self, config: OptimizationConfig, app_id: int, run_id: int):
@@ -65,6 +81,8 @@ class OptimizationDriver(Driver):
         super().__init__(config, app_id, run_id)
         self._final_store = []
         self._trial_store = {}
+        # registration and idle messages of executors that wait for a trial
+        self._waiting = []
         self.experiment_done = False
         self.maggy_log = ""
         self.job_end = None
@@ -87,9 +105,20 @@ class OptimizationDriver(Driver):
             # number of trials need to be determined depending on searchspace of user.
             self.num_trials = self.controller.get_num_trials(config.searchspace)
 
-        self.earlystop_check = self._init_earlystop_check(config.es_policy)
+        if isinstance(self.controller, PBT):
+            # number of trials is determined by the population and the budgets
+            self.num_trials = self.controller.get_num_trials()
+
+        if config.controller_process:
+            # compute suggestions in a separate process to keep the driver responsive
+            self.controller = ControllerHost(self.controller)
+
+        es_policy = self._init_earlystop_policy(config.es_policy, self._final_store)
+        self.earlystop_check = es_policy.earlystop_check
+        self.earlystop_sweep = es_policy.earlystop_sweep
         self.es_interval = config.es_interval
         self.es_min = config.es_min
+        self.es_sweep_interval = config.es_sweep_interval
         if isinstance(config.direction, str) and config.direction.lower() in [
             "min",
             "max",
@@ -109,6 +138,7 @@ class OptimizationDriver(Driver):
         self.controller.trial_store = self._trial_store
         self.controller.final_store = self._final_store
         self.controller.direction = self.direction
+        self.controller.seed = config.seed
         self.controller._initialize(exp_dir=self.log_dir)
 
     def _exp_startup_callback(self) -> None:
@@ -120,6 +150,11 @@ class OptimizationDriver(Driver):
             EnvSing.get_instance().get_logdir(self.app_id, self.run_id),
             self.config.searchspace,
         )
+        if (
+            self.es_sweep_interval is not None
+            and self.earlystop_check != NoStoppingRule.earlystop_check
+        ):
+            self.add_message({"type": "SWEEP", "sweep_start": time.time()})
 
     def _exp_final_callback(self, job_end: float, exp_json: dict) -> dict:
         """Writes the results from the hp optimization into a dict and logs it.
@@ -182,7 +217,9 @@ class OptimizationDriver(Driver):
         """Registers message callbacks for heartbeat responses to spark
         magic, blacklist messages to exclude hp configurations, final callbacks
         to process experiment results, idle callbacks for finished executors,
-        and registration callbacks for the clients to exchange connection info.
+        registration callbacks for the clients to exchange connection info,
+        assign callbacks to serve waiting executors and sweep callbacks for
+        periodic early stopping checks.
         """
         for key, call in (
             ("METRIC", self._metric_msg_callback),
@@ -190,6 +227,8 @@ class OptimizationDriver(Driver):
             ("FINAL", self._final_msg_callback),
             ("IDLE", self._idle_msg_callback),
             ("REG", self._register_msg_callback),
+            ("ASSIGN", self._assign_msg_callback),
+            ("SWEEP", self._sweep_msg_callback),
         ):
             self.message_callbacks[key] = call
 
@@ -204,6 +243,17 @@ class OptimizationDriver(Driver):
         """
         return self.controller.get_suggestion(trial)
 
+    def controller_get_next_batch(self, n: int) -> List[Union[Trial, str, None]]:
+        """Gets trials for `n` idle executors at once, see
+        `AbstractOptimizer.get_suggestions()`.
+
+        :param n: Number of idle executors.
+
+        :returns: Up to `n` trials. A shorter list ends with `None` or "IDLE",
+            which applies to the remaining executors as well.
+        """
+        return self.controller.get_suggestions(n)
+
     def get_trial(self, trial_id: int) -> Trial:
         """Returns a trial by ID from the trial store.
 
@@ -440,22 +490,58 @@ class OptimizationDriver(Driver):
         # i.e. step nr is added to the queue as message which will
         # then later be checked for early stopping, just to not
         # block for too long for other messages
-        if self.earlystop_check != NoStoppingRule.earlystop_check:
+        if (
+            self.earlystop_check != NoStoppingRule.earlystop_check
+            and self.es_sweep_interval is None
+        ):
             if len(self._final_store) > self.es_min:
                 if step is not None and step != 0:
                     if step % self.es_interval == 0:
                         try:
-                            to_stop = self.earlystop_check(
-                                self.get_trial(msg["trial_id"]),
+                            to_stop = self.earlystop_sweep(
+                                [self.get_trial(msg["trial_id"])],
                                 self._final_store,
                                 self.direction,
                             )
                         except Exception as e:
                             self.log(e)
-                            to_stop = None
-                        if to_stop is not None:
-                            self.log("Trials to stop: {}".format(to_stop))
-                            self.get_trial(to_stop).set_early_stop()
+                            to_stop = []
+                        for trial_id in to_stop:
+                            self.log("Trials to stop: {}".format(trial_id))
+                            self.get_trial(trial_id).set_early_stop()
+
+    def _sweep_msg_callback(self, msg: dict) -> None:
+        """Sweep message callback.
+
+        Checks all running trials for early stopping at once every
+        `es_sweep_interval` seconds and stops the underperforming ones in one
+        pass. The message is queued again for the next sweep.
+
+        :param msg: The sweep message from the message queue.
+        """
+        # execute only every es_sweep_interval seconds but do not block thread
+        if time.time() - msg["sweep_start"] < self.es_sweep_interval:
+            self.add_message(msg)
+            return
+
+        if len(self._final_store) > self.es_min:
+            running_trials = [
+                trial
+                for trial in self._trial_store.values()
+                if trial.status == Trial.RUNNING and not trial.get_early_stop()
+            ]
+            try:
+                to_stop = self.earlystop_sweep(
+                    running_trials, self._final_store, self.direction
+                )
+            except Exception as e:
+                self.log(e)
+                to_stop = []
+            if to_stop:
+                self.log("Trials to stop: {}".format(", ".join(to_stop)))
+                for trial_id in to_stop:
+                    self.get_trial(trial_id).set_early_stop()
+        self.add_message({"type": "SWEEP", "sweep_start": time.time()})
 
     def _blacklist_msg_callback(self, msg: dict) -> None:
         """Blacklist message callback.
@@ -535,7 +621,59 @@ class OptimizationDriver(Driver):
         """
         # execute only every 0.1 seconds but do not block thread
         if time.time() - msg["idle_start"] > 0.1:
-            trial = self.controller_get_next()
+            self._add_waiting(msg)
+        else:
+            self.add_message(msg)
+
+    def _register_msg_callback(self, msg: dict) -> None:
+        """Register message callback.
+
+        Assigns trials on worker registration if available.
+
+        :param msg: The blacklist message from the message queue.
+        """
+        self._add_waiting(msg)
+
+    def _add_waiting(self, msg: dict) -> None:
+        """Adds the registration or idle message of an executor that waits for
+        a trial to the waiting executors.
+
+        The waiting executors are served by an ASSIGN message at the tail of
+        the queue, so the executors that register or become idle until then,
+        e.g. at the start of the experiment, are served with one batch
+        suggestion. The order of the other messages is not changed.
+
+        :param msg: The registration or idle message.
+        """
+        if not self._waiting:
+            self.add_message({"type": "ASSIGN"})
+        self._waiting.append(msg)
+
+    def _assign_msg_callback(self, msg: dict) -> None:
+        """Assign message callback.
+
+        Serves all waiting executors with one batch suggestion.
+
+        :param msg: The assign message from the message queue.
+        """
+        waiting, self._waiting = self._waiting, []
+        if waiting:
+            self._assign_trials(waiting)
+
+    def _assign_trials(self, msgs: List[dict]) -> None:
+        """Assigns trials to the executors of registration and idle messages
+        with one batch suggestion of the controller.
+
+        Executors that do not get a trial because the controller is IDLE are
+        queued again.
+
+        :param msgs: The registration and idle messages.
+        """
+        suggestions = self.controller_get_next_batch(len(msgs))
+        for i, msg in enumerate(msgs):
+            # a shorter list ends with None or IDLE, which applies to the
+            # remaining executors as well
+            trial = suggestions[min(i, len(suggestions) - 1)]
             if trial is None:
                 self.server.reservations.assign_trial(msg["partition_id"], None)
                 self.experiment_done = True
@@ -551,32 +689,6 @@ class OptimizationDriver(Driver):
                         msg["partition_id"], trial.trial_id
                     )
                     self.add_trial(trial)
-        else:
-            self.add_message(msg)
-
-    def _register_msg_callback(self, msg: dict) -> None:
-        """Register message callback.
-
-        Assigns trials on worker registration if available.
-
-        :param msg: The blacklist message from the message queue.
-        """
-        trial = self.controller_get_next()
-        if trial is None:
-            self.server.reservations.assign_trial(msg["partition_id"], None)
-            self.experiment_done = True
-        elif trial == "IDLE":
-            # reset timeout
-            msg["idle_start"] = time.time()
-            self.add_message(msg)
-        else:
-            with trial.lock:
-                trial.start = time.time()
-                trial.status = Trial.SCHEDULED
-                self.server.reservations.assign_trial(
-                    msg["partition_id"], trial.trial_id
-                )
-                self.add_trial(trial)
 
     @staticmethod
     def _init_searchspace(searchspace: Searchspace) -> Searchspace:
@@ -642,10 +754,14 @@ class OptimizationDriver(Driver):
             )
 
     @staticmethod
-    def _init_earlystop_check(es_policy: Union[str, AbstractEarlyStop]) -> Callable:
+    def _init_earlystop_policy(
+        es_policy: Union[str, AbstractEarlyStop], final_store: List[Trial]
+    ) -> AbstractEarlyStop:
         """Checks for a valid early stop policy.
 
         :param es_policy: The early stop policy to be checked.
+        :param final_store: The finalized trials the built-in policies are
+            bound to.
 
         :raises TypeError: In case the policy is of wrong type or not in the
             set of supported stopping policies.
@@ -655,24 +771,24 @@ class OptimizationDriver(Driver):
         if not isinstance(es_policy, (str, AbstractEarlyStop)):
             raise TypeError(
                 """The experiment's early stopping policy should either be a string
-                ('median' or 'none') or a custom policy that is an instance of
-                maggy.earlystop.AbstractEarlyStop, but it is {} (of type '{}').""".format(
-                    str(es_policy), type(es_policy).__name__
-                )
+                ('median', 'percentile' or 'none') or a custom policy that is an
+                instance of maggy.earlystop.AbstractEarlyStop, but it is {} (of
+                type '{}').""".format(str(es_policy), type(es_policy).__name__)
             )
         if isinstance(es_policy, str):
-            if es_policy.lower() not in ["median", "none"]:
+            if es_policy.lower() not in ["median", "percentile", "none"]:
                 raise TypeError(
                     """The experiment's early stopping policy should either be a
-                    string ('median' or 'none') or a custom policy that is an
-                    instance of maggy.earlystop.AbstractEarlyStop, but it is {}
-                    (of type '{}').""".format(
+                    string ('median', 'percentile' or 'none') or a custom policy
+                    that is an instance of maggy.earlystop.AbstractEarlyStop, but
+                    it is {} (of type '{}').""".format(
                         str(es_policy), type(es_policy).__name__
                     )
                 )
-            rule = (
-                MedianStoppingRule if es_policy.lower() == "median" else NoStoppingRule
-            )
-            return rule.earlystop_check
+            if es_policy.lower() == "median":
+                return MedianStoppingRule(final_store)
+            if es_policy.lower() == "percentile":
+                return PercentileStoppingRule(finalized_trials=final_store)
+            return NoStoppingRule()
         print("Custom Early Stopping policy initialized.")
-        return es_policy.earlystop_check
+        return es_policy
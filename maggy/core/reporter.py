@@ -18,6 +18,7 @@
 API Module for the user to include in his training code.
 
 """
+import pickle
 import threading
 from datetime import datetime
 
@@ -30,14 +31,27 @@ from maggy.core.environment.singleton import EnvSing
 class Reporter(object):
     """
     Thread-safe store for sending a metric and logs from executor to driver
+
+    The reporter also gives the training function access to checkpoints.
+    Trials that were promoted to a larger budget, e.g. by `Asha` or
+    `Hyperband`, can resume from the checkpoint of the trial they were
+    promoted from instead of training from scratch.
     """
 
+    # checkpoints are saved in this directory of the trial directory
+    CHECKPOINT_DIR = "checkpoint"
+    CHECKPOINT_FILE = "checkpoint.pkl"
+
     def __init__(self, log_file, partition_id, task_attempt, print_executor):
         self.metric = None
         self.step = -1
         self.lock = threading.RLock()
         self.stop = False
         self.trial_id = None
+        self.parent_trial_id = None
+        self.parent_budget = None
+        self.checkpoint_dir = None
+        self.parent_checkpoint_dir = None
         self.trial_log_file = None
         self.logs = ""
         self.log_file = log_file
@@ -62,6 +76,22 @@ class Reporter(object):
             env.dump("", self.trial_log_file)
         self.trial_fd = env.open_file(self.trial_log_file, flags="w")
 
+    def init_checkpoints(self, log_dir):
+        """Sets the checkpoint directories of the current trial and of the
+        trial it was promoted from, within the experiment log directory.
+
+        :param log_dir: Experiment log directory with one directory per trial.
+        :type log_dir: str
+        """
+        with self.lock:
+            self.checkpoint_dir = "/".join(
+                [log_dir, self.trial_id, Reporter.CHECKPOINT_DIR]
+            )
+            if self.parent_trial_id is not None:
+                self.parent_checkpoint_dir = "/".join(
+                    [log_dir, self.parent_trial_id, Reporter.CHECKPOINT_DIR]
+                )
+
     def close_logger(self):
         """Savely closes the file descriptors of the log files.
 
@@ -133,6 +163,62 @@ class Reporter(object):
                     )
                 )
 
+    def save_checkpoint(self, state):
+        """Saves the training state of the current trial, e.g. model weights
+        and optimizer state, so a trial promoted from it can resume training.
+
+        The state is pickled, frameworks with their own checkpoint format can
+        save to `get_checkpoint_dir()` instead.
+
+        :param state: Picklable training state.
+        :type state: object
+        """
+        with self.lock:
+            env = EnvSing.get_instance()
+            if not env.exists(self.checkpoint_dir):
+                env.mkdir(self.checkpoint_dir)
+            path = self.checkpoint_dir + "/" + Reporter.CHECKPOINT_FILE
+            with env.open_file(path, flags="wb") as fd:
+                pickle.dump(state, fd)
+
+    def load_checkpoint(self):
+        """Loads the training state saved with `save_checkpoint()` by the trial
+        the current trial was promoted from.
+
+        The current trial only has to train for the difference of its budget
+        and `get_parent_budget()`.
+
+        :return: Training state of the parent trial, or None if the trial was
+            not promoted or the parent trial saved no checkpoint.
+        :rtype: object
+        """
+        with self.lock:
+            if self.parent_checkpoint_dir is None:
+                return None
+            env = EnvSing.get_instance()
+            path = self.parent_checkpoint_dir + "/" + Reporter.CHECKPOINT_FILE
+            if not env.exists(path):
+                return None
+            with env.open_file(path, flags="rb") as fd:
+                return pickle.load(fd)
+
+    def get_checkpoint_dir(self):
+        """Returns the directory for checkpoints of the current trial."""
+        with self.lock:
+            return self.checkpoint_dir
+
+    def get_parent_checkpoint_dir(self):
+        """Returns the checkpoint directory of the trial the current trial was
+        promoted from, or None if it was not promoted."""
+        with self.lock:
+            return self.parent_checkpoint_dir
+
+    def get_parent_budget(self):
+        """Returns the budget of the trial the current trial was promoted
+        from, or None if it was not promoted."""
+        with self.lock:
+            return self.parent_budget
+
     def get_data(self):
         """Returns the metric and logs to be sent to the experiment driver."""
         with self.lock:
@@ -150,6 +236,10 @@ class Reporter(object):
             self.step = -1
             self.stop = False
             self.trial_id = None
+            self.parent_trial_id = None
+            self.parent_budget = None
+            self.checkpoint_dir = None
+            self.parent_checkpoint_dir = None
             self.fd.flush()
             self.trial_fd.close()
             self.trial_fd = None
@@ -167,3 +257,8 @@ class Reporter(object):
     def set_trial_id(self, trial_id):
         with self.lock:
             self.trial_id = trial_id
+
+    def set_parent_trial(self, parent_trial_id, parent_budget):
+        with self.lock:
+            self.parent_trial_id = parent_trial_id
+            self.parent_budget = parent_budget
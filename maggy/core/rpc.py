@@ -391,8 +391,12 @@ class OptimizationServer(Server):
         resp["trial_id"] = trial_id
         # retrieve trial information
         if trial_id is not None:
-            resp["data"] = exp_driver.get_trial(trial_id).params
-            exp_driver.get_trial(trial_id).status = Trial.RUNNING
+            trial = exp_driver.get_trial(trial_id)
+            resp["data"] = trial.params
+            # promoted trials can resume from the checkpoint of their parent
+            resp["parent_trial_id"] = trial.info_dict.get("parent_trial_id", None)
+            resp["parent_budget"] = trial.info_dict.get("parent_budget", None)
+            trial.status = Trial.RUNNING
         else:
             resp["data"] = None
 
@@ -695,6 +699,10 @@ class Client(MessageSocket):
             reporter.log("Stopping experiment", False)
             self.done = True
         elif msg_type == "TRIAL":
+            if reporter is not None:
+                reporter.set_parent_trial(
+                    msg.get("parent_trial_id", None), msg.get("parent_budget", None)
+                )
             return msg["trial_id"], msg["data"]
         elif msg_type == "ERR":
             reporter.log("Stopping experiment", False)
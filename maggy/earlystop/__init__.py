@@ -14,10 +14,16 @@
 #   limitations under the License.
 #
 
-from maggy.earlystop import abstractearlystop, medianrule, nostop
+from maggy.earlystop import abstractearlystop, medianrule, nostop, percentilerule
 
 AbstractEarlyStop = abstractearlystop.AbstractEarlyStop
 MedianStoppingRule = medianrule.MedianStoppingRule
 NoStoppingRule = nostop.NoStoppingRule
+PercentileStoppingRule = percentilerule.PercentileStoppingRule
 
-__all__ = ["AbstractEarlyStop", "MedianStoppingRule", "NoStoppingRule"]
+__all__ = [
+    "AbstractEarlyStop",
+    "MedianStoppingRule",
+    "NoStoppingRule",
+    "PercentileStoppingRule",
+]
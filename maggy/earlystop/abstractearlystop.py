@@ -40,3 +40,30 @@ class AbstractEarlyStop(ABC):
         :type direction: str
         """
         pass
+
+    def earlystop_sweep(self, running_trials, finalized_trials, direction):
+        """Checks all running trials at once and returns the ids of the trials
+        to stop.
+
+        The method is called periodically by the driver if a sweep interval is
+        configured, see `es_sweep_interval` of `OptimizationConfig`. The default
+        implementation calls `earlystop_check` for every running trial that
+        reported a metric, policies can override it with a vectorized check.
+
+        :param running_trials: A list of currently running Trial objects.
+        :type running_trials: list
+        :param finalized_trials: A list of finalized Trial objects.
+        :type finalized_trials: list
+        :param direction: A string describing the search objective, i.e. 'min'
+        or 'max'.
+        :type direction: str
+        :return: The `trial_id` of every trial to stop.
+        :rtype: list
+        """
+        to_stop = []
+        for trial in running_trials:
+            if trial.metric_history:
+                trial_id = self.earlystop_check(trial, finalized_trials, direction)
+                if trial_id is not None:
+                    to_stop.append(trial_id)
+        return to_stop
@@ -14,7 +14,12 @@
 #   limitations under the License.
 #
 
+import heapq
+import itertools
 import statistics
+
+import numpy as np
+
 from maggy.earlystop.abstractearlystop import AbstractEarlyStop
 
 
@@ -22,8 +27,44 @@ class MedianStoppingRule(AbstractEarlyStop):
     """The Median Stopping Rule implements the simple strategy of stopping a
     trial if its performance falls below the median of other trials at similar
     points in time.
+
+    `earlystop_check` checks a single trial and averages the metric histories
+    of all finalized trials on every call. `earlystop_sweep` checks all running
+    trials at once and keeps its state between calls: the running averages of
+    the finalized trials are added to one running median per step when the
+    trials finalize, and the best metric of the running trials is updated with
+    their new steps only. The medians of the steps the running trials are at
+    are looked up once per sweep and compared with their best metrics in one
+    vectorized pass.
+
+    The state belongs to one list of finalized trials, e.g. the final store of
+    the driver, that is passed to the constructor or to `reset()`.
     """
 
+    def __init__(self, finalized_trials=None):
+        """
+        :param finalized_trials: The list of finalized Trial objects of the
+            experiment, bound on the first sweep if None.
+        :type finalized_trials: list
+        """
+        self.reset(finalized_trials)
+
+    def reset(self, finalized_trials=None):
+        """Clears the state of the sweeps and binds the rule to the list of
+        finalized trials of a new experiment.
+
+        :param finalized_trials: The list of finalized Trial objects of the
+            experiment, bound on the next sweep if None.
+        :type finalized_trials: list
+        """
+        # running averages of finalized trials, per step
+        self.step_averages = []
+        # the finalized trials that have been added, `final_store` of the driver
+        self._finalized_trials = finalized_trials
+        self._n_finalized = 0
+        # best metric of running trials, (number of steps, best metric) by `trial_id`
+        self._best = {}
+
     @staticmethod
     def earlystop_check(to_check, finalized_trials, direction):
 
@@ -58,3 +99,112 @@ class MedianStoppingRule(AbstractEarlyStop):
                     if min(to_check.metric_history) > median:
                         return to_check.trial_id
             return None
+
+    def earlystop_sweep(self, running_trials, finalized_trials, direction):
+        """Checks all running trials that reported a metric at once. Trials
+        that ran more steps than any finalized trial are not stopped, since
+        there is no threshold for their step yet.
+
+        :raises ValueError: `finalized_trials` is not the list the rule is
+            bound to, call `reset()` for a new experiment.
+
+        :return: The `trial_id` of every trial to stop.
+        :rtype: list
+        """
+        if self._finalized_trials is None:
+            self._finalized_trials = finalized_trials
+        elif finalized_trials is not self._finalized_trials:
+            raise ValueError(
+                "The early stopping rule is bound to the finalized trials of "
+                "another experiment, call reset() for a new experiment."
+            )
+        self._add_finalized_trials()
+
+        trials = [
+            trial
+            for trial in running_trials
+            if 0 < len(trial.metric_history) <= len(self.step_averages)
+        ]
+        if not trials:
+            return []
+
+        steps = np.array([len(trial.metric_history) for trial in trials])
+        # thresholds of the steps the trials are at only, not of all steps
+        unique_steps, step_idx = np.unique(steps, return_inverse=True)
+        thresholds = np.array(
+            [self._threshold(step - 1, direction) for step in unique_steps]
+        )
+        best = np.array([self._best_metric(trial, direction) for trial in trials])
+        if direction == "max":
+            stop = best < thresholds[step_idx]
+        else:
+            stop = best > thresholds[step_idx]
+        return [trial.trial_id for trial, stopped in zip(trials, stop) if stopped]
+
+    def _threshold(self, idx, direction):
+        """returns the metric a trial has to reach at step `idx`, counted from
+        zero"""
+        return self.step_averages[idx].median()
+
+    def _new_step(self):
+        """returns the container of the running averages of a new step"""
+        return _RunningMedian()
+
+    def _add_finalized_trials(self):
+        """adds the running averages of trials that finalized since the last
+        sweep to the averages of their steps"""
+        for fin_trial in self._finalized_trials[self._n_finalized :]:
+            self._best.pop(fin_trial.trial_id, None)
+            history = fin_trial.metric_history
+            while len(self.step_averages) < len(history):
+                self.step_averages.append(self._new_step())
+            for i, prefix_sum in enumerate(itertools.accumulate(history)):
+                self.step_averages[i].add(prefix_sum / float(i + 1))
+        self._n_finalized = len(self._finalized_trials)
+
+    def _best_metric(self, trial, direction):
+        """returns the best metric of `trial` so far, updated with its new steps"""
+        history = trial.metric_history
+        n_steps, best = self._best.get(trial.trial_id, (0, None))
+        if n_steps < len(history):
+            new = history[n_steps:]
+            new_best = max(new) if direction == "max" else min(new)
+            if best is None:
+                best = new_best
+            else:
+                best = (
+                    max(best, new_best) if direction == "max" else min(best, new_best)
+                )
+            self._best[trial.trial_id] = (len(history), best)
+        return best
+
+
+class _RunningMedian(object):
+    """Median of a growing multiset of values, kept in two heaps: a max-heap
+    of the lower half and a min-heap of the upper half."""
+
+    def __init__(self):
+        # negated values of the lower half
+        self._lower = []
+        self._upper = []
+
+    def __len__(self):
+        return len(self._lower) + len(self._upper)
+
+    def add(self, value):
+        if self._lower and value > -self._lower[0]:
+            heapq.heappush(self._upper, value)
+        else:
+            heapq.heappush(self._lower, -value)
+        # the lower half holds the middle value if the number of values is odd
+        if len(self._lower) > len(self._upper) + 1:
+            heapq.heappush(self._upper, -heapq.heappop(self._lower))
+        elif len(self._upper) > len(self._lower):
+            heapq.heappush(self._lower, -heapq.heappop(self._upper))
+
+    def median(self):
+        """returns the median like `statistics.median()`, i.e. the mean of the
+        two middle values if the number of values is even"""
+        if len(self._lower) > len(self._upper):
+            return -self._lower[0]
+        return (-self._lower[0] + self._upper[0]) / 2
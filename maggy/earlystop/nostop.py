@@ -23,3 +23,7 @@ class NoStoppingRule(AbstractEarlyStop):
     @staticmethod
     def earlystop_check(to_check, finalized_trials, direction):
         return None
+
+    @staticmethod
+    def earlystop_sweep(running_trials, finalized_trials, direction):
+        return []
@@ -0,0 +1,111 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import bisect
+
+import numpy as np
+
+from maggy.earlystop.medianrule import MedianStoppingRule
+
+
+class PercentileStoppingRule(MedianStoppingRule):
+    """The Percentile Stopping Rule stops a trial if its performance falls
+    below the `percentile`-th percentile of other trials at similar points in
+    time, counted from the worst trial. Hence, with `percentile=25` only trials
+    in the worst quarter are stopped, and `percentile=50` is the median rule.
+
+    The percentile is interpolated between the two closest running averages
+    like `numpy.percentile()`. For sweeps, the running averages of the
+    finalized trials are kept sorted per step. Checks and sweeps work like in
+    `MedianStoppingRule`, but `earlystop_check` is not static since it needs
+    the percentile.
+    """
+
+    def __init__(self, percentile=25, finalized_trials=None):
+        """
+        :param percentile: percentile of the running averages of the finalized
+            trials a trial has to reach, in [0, 100]
+        :type percentile: float
+        :param finalized_trials: The list of finalized Trial objects of the
+            experiment, bound on the first sweep if None.
+        :type finalized_trials: list
+        """
+        if not 0 <= percentile <= 100:
+            raise ValueError(
+                "expected percentile to be in [0, 100], got {}".format(percentile)
+            )
+        super().__init__(finalized_trials)
+        self.percentile = percentile
+
+    def earlystop_check(self, to_check, finalized_trials, direction):
+
+        # count step from zero so it can be used as index for array
+        step = len(to_check.metric_history)
+
+        if step > 0:
+            averages = [
+                sum(fin_trial.metric_history[:step]) / float(step)
+                for fin_trial in finalized_trials
+                if len(fin_trial.metric_history) >= step
+            ]
+            if not averages:
+                raise Exception(
+                    "Warning: no finalized trial reached step {}".format(step)
+                )
+            threshold = np.percentile(averages, self._q(direction))
+
+            if direction == "max":
+                if max(to_check.metric_history) < threshold:
+                    return to_check.trial_id
+            elif direction == "min":
+                if min(to_check.metric_history) > threshold:
+                    return to_check.trial_id
+            return None
+
+    def _threshold(self, idx, direction):
+        return self.step_averages[idx].percentile(self._q(direction))
+
+    def _q(self, direction):
+        """returns the percentile of the running averages, counted from the
+        lowest average"""
+        # the worst trials have the lowest metrics if the direction is `max`
+        return self.percentile if direction == "max" else 100 - self.percentile
+
+    def _new_step(self):
+        return _SortedValues()
+
+
+class _SortedValues(object):
+    """Growing multiset of values kept in a sorted list."""
+
+    def __init__(self):
+        self._values = []
+
+    def __len__(self):
+        return len(self._values)
+
+    def add(self, value):
+        bisect.insort(self._values, value)
+
+    def percentile(self, q):
+        """returns the `q`-th percentile with linear interpolation, like
+        `numpy.percentile()`"""
+        pos = q / 100 * (len(self._values) - 1)
+        lower = int(pos)
+        upper = min(lower + 1, len(self._values) - 1)
+        return self._values[lower] + (pos - lower) * (
+            self._values[upper] - self._values[lower]
+        )
@@ -37,9 +37,12 @@ class OptimizationConfig(LagomConfig):
         es_interval: int = 1,
         es_min: int = 10,
         es_policy: Union[str, AbstractEarlyStop] = "median",
+        es_sweep_interval: float = None,
         name: str = "HPOptimization",
         description: str = "",
         hb_interval: int = 1,
+        controller_process: bool = False,
+        seed: int = None,
     ):
         """Initializes HP optimization experiment parameters.
 
@@ -52,9 +55,16 @@ class OptimizationConfig(LagomConfig):
         :param es_min: Minimum number of experiments to conduct before starting the early stopping
             mechanism. Useful to establish a baseline for performance estimates.
         :param es_policy: Early stopping policy which formulates a rule for triggering aborts.
+        :param es_sweep_interval: If set, all running trials are checked for early stopping
+            at once every `es_sweep_interval` seconds instead of checking a trial when its
+            heartbeat arrives, see `AbstractEarlyStop.earlystop_sweep()`.
         :param name: Experiment name.
         :param description: A description of the experiment.
         :param hb_interval: Heartbeat interval with which the server is polling.
+        :param controller_process: If True, run the optimizer in a dedicated process, so
+            surrogate fitting does not block the driver threads answering heartbeats.
+        :param seed: Seed of the random number generator of the optimizer, makes the
+            candidate sampling reproducible.
         """
         super().__init__(name, description, hb_interval)
         if not num_trials > 0:
@@ -67,3 +77,6 @@ class OptimizationConfig(LagomConfig):
         self.es_policy = es_policy
         self.es_interval = es_interval
         self.es_min = es_min
+        self.es_sweep_interval = es_sweep_interval
+        self.controller_process = controller_process
+        self.seed = seed
@@ -14,12 +14,27 @@
 #   limitations under the License.
 #
 
-from maggy.optimizer import abstractoptimizer, randomsearch, asha, singlerun, gridsearch
+from maggy.optimizer import (
+    abstractoptimizer,
+    randomsearch,
+    asha,
+    singlerun,
+    gridsearch,
+    pbt,
+)
 
 AbstractOptimizer = abstractoptimizer.AbstractOptimizer
 RandomSearch = randomsearch.RandomSearch
 Asha = asha.Asha
 SingleRun = singlerun.SingleRun
 GridSearch = gridsearch.GridSearch
+PBT = pbt.PBT
 
-__all__ = ["AbstractOptimizer", "RandomSearch", "Asha", "SingleRun", "GridSearch"]
+__all__ = [
+    "AbstractOptimizer",
+    "RandomSearch",
+    "Asha",
+    "SingleRun",
+    "GridSearch",
+    "PBT",
+]
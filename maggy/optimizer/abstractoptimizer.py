@@ -21,14 +21,16 @@ from datetime import datetime
 import numpy as np
 
 from maggy.core.environment.singleton import EnvSing
-from maggy.pruner import Hyperband
+from maggy.optimizer.hparams_index import HparamsIndex
+from maggy.optimizer.observations import ObservationStore
+from maggy.pruner import Hyperband, AsyncHyperband
 from maggy.trial import Trial
 
 
 class AbstractOptimizer(ABC):
     def __init__(self, pruner=None, pruner_kwargs=None):
         """
-        :param pruner: name of pruning algorithm to use. So far only `hyperband` supported
+        :param pruner: name of pruning algorithm to use, `hyperband` or `asynchyperband`
         :type pruner: str
         :param pruner_kwargs: dict of arguments for initializing pruner. See pruner classes for reference.
         :type pruner_kwargs: dict
@@ -39,6 +41,22 @@ class AbstractOptimizer(ABC):
         self.final_store = None
         self.direction = None
         self.pruner = None
+        # seed of `rng`, set per experiment
+        self.seed = None
+        # random number generator of the optimizer, created in `_initialize()`
+        self.rng = None
+
+        # append-only store of observations of finalized trials, created in `_initialize()`
+        self.observations = None
+        # If True, the encoded categorical hparam is also max-min normalized in the transformed hparams of
+        # `observations`
+        self.normalize_categorical = False
+
+        # hash index of the configs of all started trials, created in `_initialize()`
+        self.hparams_index = None
+        # If set, configs whose continuous hparams are within this fraction of their range of a started config are
+        # rejected as near duplicates in `hparams_exist()`
+        self.duplicate_tolerance = None
 
         # configure pruner
         if pruner:
@@ -51,6 +69,9 @@ class AbstractOptimizer(ABC):
         # helper variable to calculate time needed for calculating next suggestion
         self.sampling_time_start = 0.0
 
+        # number of suggestions that are requested at once, including the current one, see `get_suggestions()`
+        self.n_pending_suggestions = 1
+
     @abstractmethod
     def initialize(self):
         """
@@ -70,6 +91,42 @@ class AbstractOptimizer(ABC):
         """
         pass
 
+    def get_suggestions(self, n, trial=None):
+        """
+        Return trials for `n` idle executors at once, e.g. when many executors
+        register at the start of the experiment.
+
+        The default implementation calls `get_suggestion()` `n` times. Every
+        returned trial is added to `trial_store` right away, the same way the
+        driver adds it, so the following calls take it into account. During
+        the calls `n_pending_suggestions` holds the number of suggestions that
+        are still requested, e.g. to propose all of them from one fit of a
+        surrogate model.
+
+        :param n: number of idle executors
+        :type n: int
+        :param trial: last finished trial by an executor
+        :type trial: Trial|None
+        :return: up to `n` suggestions. If the list is shorter than `n`, its
+                 last element is `None` or `"IDLE"` and applies to the
+                 remaining executors as well.
+        :rtype: list[Trial|str|None]
+        """
+        suggestions = []
+        try:
+            for i in range(n):
+                self.n_pending_suggestions = n - i
+                suggestion = self.get_suggestion(trial)
+                # only the first call is triggered by the finished trial
+                trial = None
+                suggestions.append(suggestion)
+                if suggestion is None or suggestion == "IDLE":
+                    break
+                self.trial_store[suggestion.trial_id] = suggestion
+        finally:
+            self.n_pending_suggestions = 1
+        return suggestions
+
     @abstractmethod
     def finalize_experiment(self, trials):
         """
@@ -104,6 +161,15 @@ class AbstractOptimizer(ABC):
         """
         # init logger of optimizer
         self._initialize_logger(exp_dir=exp_dir)
+        self.rng = np.random.default_rng(self.seed)
+        self.observations = ObservationStore(
+            self.searchspace,
+            direction=self.direction,
+            normalize_categorical=self.normalize_categorical,
+        )
+        self.hparams_index = HparamsIndex(
+            self.searchspace, tolerance=self.duplicate_tolerance
+        )
         # optimizer intitialization routine
         self.initialize()
         self._log("Initilized Optimizer {}: \n {}".format(self.name(), self.__dict__))
@@ -228,6 +294,9 @@ class AbstractOptimizer(ABC):
                  on max budget, else (n_finalized_trials,) → ragged array
         :rtype: np.ndarray[float|np.ndarray]
         """
+        if not interim_metrics and self.observations is not None:
+            # final metrics are kept incrementally in the observation store
+            return self.get_observations().y(budget)
 
         include_trial = lambda x: x == budget  # noqa: E731
 
@@ -251,59 +320,57 @@ class AbstractOptimizer(ABC):
 
         return metrics
 
+    def get_observations(self):
+        """returns the observation store, synced with `final_store`
+
+        :return: store with transformed hparams, metrics, budgets and metric histories of all finalized trials
+        :rtype: ObservationStore
+        """
+        self.observations.sync(self.final_store)
+        return self.observations
+
     def hparams_exist(self, trial):
         """Checks if Trial with hparams and budget has already been started
 
+        The lookup is done in `hparams_index`, which is synced with `trial_store` and `final_store` on every call.
+        If `duplicate_tolerance` is set, near duplicates are detected as well (see `HparamsIndex`).
+
         :param trial: trial instance to validate
         :type trial: Trial
         :return: True, if trial with same params already exists
         :rtype: bool
 
         """
-
-        def remove_budget(trial_params):
-            """In multi fidelity setting budget is added as key to trial.params.
-            Needs to be removed here to compare actual params defined in search space
-            """
-            return dict(
-                (k, trial_params[k])
-                for k in self.searchspace.keys()
-                if k in trial_params
-            )
-
-        # check in finished trials
-        # todo when budget becomes attr of Trial object ( and not part of params anymore ), adapt the comparison
-        for idx, finished_trial in enumerate(self.final_store):
-            if remove_budget(trial.params) == remove_budget(finished_trial.params):
-                self._log(
-                    "WARNING Duplicate Config: Hparams {} are equal to params of finished trial no. {}: {}".format(
-                        trial.params, idx, finished_trial.trial_id
-                    )
+        # todo when budget becomes attr of Trial object ( and not part of params anymore ), adapt the key
+        self.hparams_index.sync(self.trial_store, self.final_store)
+        trial_id = self.hparams_index.find(trial)
+        if trial_id is None:
+            return False
+
+        if trial_id in self.trial_store:
+            self._log(
+                "WARNING Duplicate Config: Hparams {} are equal to currently evaluating Trial: {}".format(
+                    trial.params, trial_id
                 )
-                return True
-
-        # check in currently evaluating trials
-        for trial_id, busy_trial in self.trial_store.items():
-            if remove_budget(trial.params) == remove_budget(busy_trial.params):
-                self._log(
-                    "WARNING Duplicate Config: Hparams {} are equal to currently evaluating Trial: {}".format(
-                        trial.params, busy_trial.trial_id
-                    )
+            )
+        else:
+            self._log(
+                "WARNING Duplicate Config: Hparams {} are equal to params of finished trial: {}".format(
+                    trial.params, trial_id
                 )
-                return True
-
-        return False
+            )
+        return True
 
     def init_pruner(self, pruner, pruner_kwargs):
         """intializes pruner
 
-        :param pruner: name of pruner. so far only "hyperband" implemented
+        :param pruner: name of pruner, "hyperband" or "asynchyperband"
         :type pruner: str
         :param pruner_kwargs: dict of pruner kwargs
         :type pruner_kwargs: dict
         :return: initiated pruner instance
         """
-        allowed_pruners = ["hyperband"]
+        allowed_pruners = ["hyperband", "asynchyperband"]
         if pruner not in allowed_pruners:
             raise ValueError(
                 "expected pruner to be in {}, got {}".format(allowed_pruners, pruner)
@@ -313,8 +380,20 @@ class AbstractOptimizer(ABC):
             self.pruner = Hyperband(
                 trial_metric_getter=self.get_metrics_dict, **pruner_kwargs
             )
+        elif pruner == "asynchyperband":
+            self.pruner = AsyncHyperband(
+                trial_metric_getter=self.get_metrics_dict, **pruner_kwargs
+            )
 
-    def create_trial(self, hparams, sample_type, run_budget=0, model_budget=None):
+    def create_trial(
+        self,
+        hparams,
+        sample_type,
+        run_budget=0,
+        model_budget=None,
+        parent_trial_id=None,
+        parent_budget=None,
+    ):
         """helper function to create trial with budget and trial_dict
 
         `run_budget == 0` means that it is a single fidelity optimization and budget does not need to be passed to Trial
@@ -329,11 +408,17 @@ class AbstractOptimizer(ABC):
                                              already exists
                                 - "promoted": config was promoted in multi fidelity bandit based setting
                                 - "model": config was sampled from surrogate by optimizing acquisiton function
+                                - "exploit": config was perturbed from the config of a better member in PBT
         :type sample_type: str
         :param run_budget: budget for trial or 0 if there is no budget, i.e. single fidelity optimization
         :type run_budget: int
         :param model_budget: If sample_type == `model`, specifies from which model the sample was generated
         :type model_budget: int
+        :param parent_trial_id: If sample_type == `promoted`, the id of the trial that was promoted. The training
+                                function can resume from its checkpoint, see `Reporter.load_checkpoint()`
+        :type parent_trial_id: str
+        :param parent_budget: If sample_type == `promoted`, the budget of the trial that was promoted
+        :type parent_budget: int
         :return: Trial object with specified params
         :rtype: Trial
         """
@@ -344,6 +429,7 @@ class AbstractOptimizer(ABC):
             "model",
             "promoted",
             "grid",
+            "exploit",
         ]
         if sample_type not in allowed_sample_type_values:
             raise ValueError(
@@ -368,6 +454,9 @@ class AbstractOptimizer(ABC):
         }
         if model_budget is not None:
             trial_info_dict["model_budget"] = model_budget
+        if parent_trial_id is not None:
+            trial_info_dict["parent_trial_id"] = parent_trial_id
+            trial_info_dict["parent_budget"] = parent_budget
 
         # todo legacy → in the long run have budget as explicit attr of trial object
         if run_budget > 0:
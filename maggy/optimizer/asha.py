@@ -14,6 +14,8 @@
 #   limitations under the License.
 #
 
+import heapq
+import itertools
 import math
 
 from maggy.optimizer.abstractoptimizer import AbstractOptimizer
@@ -27,6 +29,10 @@ class Asha(AbstractOptimizer):
     for these, initialize the optimizer first and pass it as an argument to
     'experiment.lagom()'.
 
+    Trials are promoted according to the `direction` of the experiment. A
+    promoted trial can resume training from the checkpoint of the trial it
+    was promoted from, see `Reporter.load_checkpoint()`.
+
     Sample usage:
 
     >>> # Import Asha optimizer
@@ -70,10 +76,12 @@ class Asha(AbstractOptimizer):
 
     def initialize(self):
 
-        # maps rung index k to trials in that rung
-        self.rungs = {0: []}
-        # maps rung index k to trial ids of trials that were promoted
-        self.promoted = {0: []}
+        # maps rung index k to the trials in that rung
+        self.rungs = {0: _Rung(self.reduction_factor)}
+        # maps trial ids to the index of their rung
+        self._rung_of = {}
+        # number of trials of `final_store` that have been added to their rungs
+        self._n_finalized = 0
 
         self.max_rung = int(
             math.floor(
@@ -85,66 +93,42 @@ class Asha(AbstractOptimizer):
 
     def get_suggestion(self, trial=None):
 
-        if trial is not None:
-            # stopping criterium: one trial in max rung
-            if self.max_rung in self.rungs:
-                # return None to signal end to experiment driver
-                return None
-
-            # for each rung
-            for k in range(self.max_rung - 1, -1, -1):
-                # if rung doesn't exist yet go one lower
-                if k not in self.rungs:
-                    continue
-
-                # get top_k
-                rung_finished = len(
-                    [x for x in self.rungs[k] if x.status == Trial.FINALIZED]
-                )
+        self._add_finalized_trials()
+
+        # stopping criterium: one trial in max rung
+        if self.max_rung in self.rungs:
+            # return None to signal end to experiment driver
+            return None
+
+        # promote the best promotable trial of the highest rung
+        for k in range(self.max_rung - 1, -1, -1):
+            # if rung doesn't exist yet go one lower
+            if k not in self.rungs:
+                continue
+
+            old_trial = self.rungs[k].pop_promotable()
+            # if there are no candidates, check one rung below
+            if old_trial is None:
+                continue
+
+            new_rung = k + 1
+            # make copy of params to be able to change resource
+            params = old_trial.params.copy()
+            params["budget"] = self.resource_min * (self.reduction_factor ** new_rung)
+            # the promoted trial can resume from the checkpoint of the old trial
+            promote_trial = Trial(
+                params,
+                info_dict={
+                    "parent_trial_id": old_trial.trial_id,
+                    "parent_budget": old_trial.params["budget"],
+                },
+            )
 
-                if (rung_finished // self.reduction_factor) - len(
-                    self.promoted.get(k, [])
-                ) > 0:
-                    candidates = self._top_k(
-                        k, (rung_finished // self.reduction_factor)
-                    )
-                else:
-                    candidates = []
-
-                # if there are no candidates, check one rung below
-                if not candidates:
-                    continue
-
-                # select all that haven't been promoted yet
-                promotable = [
-                    t for t in candidates if t.trial_id not in self.promoted.get(k, [])
-                ]
-
-                nr_promotable = len(promotable)
-                if nr_promotable >= 1:
-                    new_rung = k + 1
-                    # sorted in decending order, take highest -> index 0
-                    old_trial = promotable[0]
-                    # make copy of params to be able to change resource
-                    params = old_trial.params.copy()
-                    params["budget"] = self.resource_min * (
-                        self.reduction_factor ** new_rung
-                    )
-                    promote_trial = Trial(params)
-
-                    # open new rung if not exists
-                    if new_rung in self.rungs:
-                        self.rungs[new_rung].append(promote_trial)
-                    else:
-                        self.rungs[new_rung] = [promote_trial]
-
-                    # remember promoted trial
-                    if k in self.promoted:
-                        self.promoted[k].append(old_trial.trial_id)
-                    else:
-                        self.promoted[k] = [old_trial.trial_id]
-
-                    return promote_trial
+            # open new rung if not exists
+            if new_rung not in self.rungs:
+                self.rungs[new_rung] = _Rung(self.reduction_factor)
+            self._add(promote_trial, new_rung)
+            return promote_trial
 
         # else return random configuration in base rung
         params = self.searchspace.get_random_parameter_values(1)[0]
@@ -152,18 +136,98 @@ class Asha(AbstractOptimizer):
         params["budget"] = self.resource_min
         to_return = Trial(params)
         # add to bottom rung
-        self.rungs[0].append(to_return)
+        self._add(to_return, 0)
         return to_return
 
     def finalize_experiment(self, trials):
         return
 
-    def _top_k(self, rung_k, number):
-        """Find top-`number` trials in `rung_k`."""
-        if number > 0:
-            filtered = [x for x in self.rungs[rung_k] if x.status == Trial.FINALIZED]
-            filtered.sort(key=lambda x: x.final_metric, reverse=True)
-            # return top k trials if finalized
-            return filtered[:number]
+    def _add(self, trial, rung_k):
+        """Add a started trial to `rung_k`."""
+        self.rungs[rung_k].trials.append(trial)
+        self._rung_of[trial.trial_id] = rung_k
+
+    def _add_finalized_trials(self):
+        """Add the trials that finalized since the last call to the finalized
+        trials of their rung."""
+        for trial in self.final_store[self._n_finalized :]:
+            rung_k = self._rung_of.get(trial.trial_id)
+            if rung_k is None or trial.final_metric is None:
+                continue
+            metric = trial.final_metric
+            self.rungs[rung_k].add_finalized(
+                trial, metric if self.direction == "min" else -metric
+            )
+        self._n_finalized = len(self.final_store)
+
+
+class _Rung(object):
+    """Trials of a rung of ASHA.
+
+    A trial can be promoted if it is among the top `1/reduction_factor` of
+    the finalized trials of the rung and has not been promoted yet. The
+    finalized trials are split into two heaps, the top ones and the rest, so
+    adding a finalized trial and finding the best promotable trial take
+    O(log n) time. Trials are ranked by a key that is smaller for better
+    trials, i.e. the metric negated for `max` experiments.
+    """
+
+    def __init__(self, reduction_factor):
+        self.reduction_factor = reduction_factor
+        # all trials started in the rung
+        self.trials = []
+        # trial ids of trials that were promoted
+        self.promoted = set()
+        self.n_finalized = 0
+        # max-heap of the best `n_finalized // reduction_factor` finalized
+        # trials, entries (-key, -sequence number, trial)
+        self._top = []
+        # min-heap of the other finalized trials, entries (key, sequence number, trial)
+        self._rest = []
+        # trial ids of the trials in `_top`
+        self._top_ids = set()
+        # min-heap of trials that entered `_top` and have not been promoted,
+        # entries of trials that left `_top` are removed lazily
+        self._candidates = []
+        # breaks ties between equal metrics by order of finalization
+        self._sequence = itertools.count()
+
+    def add_finalized(self, trial, key):
+        """Add a finalized trial with ranking key `key`."""
+        entry = (key, next(self._sequence), trial)
+        self.n_finalized += 1
+        if self._top and entry[:2] < (-self._top[0][0], -self._top[0][1]):
+            # replaces the worst of the top trials
+            self._push_top(entry)
+            neg_key, neg_seq, worst = heapq.heappop(self._top)
+            self._top_ids.discard(worst.trial_id)
+            heapq.heappush(self._rest, (-neg_key, -neg_seq, worst))
         else:
-            return []
+            heapq.heappush(self._rest, entry)
+
+        while len(self._top) < self.n_finalized // self.reduction_factor:
+            self._push_top(heapq.heappop(self._rest))
+
+    def pop_promotable(self):
+        """Return the best promotable trial and mark it as promoted, or None
+        if no trial can be promoted.
+
+        At most `n_finalized // reduction_factor` trials of the rung are
+        promoted in total, even if promoted trials dropped out of the top
+        trials since.
+        """
+        if len(self.promoted) >= self.n_finalized // self.reduction_factor:
+            return None
+        while self._candidates:
+            _, _, trial = heapq.heappop(self._candidates)
+            if trial.trial_id in self._top_ids and trial.trial_id not in self.promoted:
+                self.promoted.add(trial.trial_id)
+                return trial
+        return None
+
+    def _push_top(self, entry):
+        key, seq, trial = entry
+        heapq.heappush(self._top, (-key, -seq, trial))
+        self._top_ids.add(trial.trial_id)
+        if trial.trial_id not in self.promoted:
+            heapq.heappush(self._candidates, entry)
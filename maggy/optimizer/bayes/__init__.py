@@ -14,14 +14,18 @@
 #   limitations under the License.
 #
 
-from maggy.optimizer.bayes import base, gp, tpe
+from maggy.optimizer.bayes import base, gp, rf, tpe, turbo
 
 BaseAsyncBO = base.BaseAsyncBO
 GP = gp.GP
+RF = rf.RF
 TPE = tpe.TPE
+TuRBO = turbo.TuRBO
 
 __all__ = [
     "TPE",
     "BaseAsyncBO",
     "GP",
+    "RF",
+    "TuRBO",
 ]
@@ -18,9 +18,12 @@ from abc import ABC
 from abc import abstractmethod
 
 import numpy as np
+from scipy.stats import norm
 from skopt.acquisition import _gaussian_acquisition
 from skopt.acquisition import gaussian_acquisition_1D
 
+from maggy.optimizer.bayes.surrogates import predict_with_gradients
+
 
 class AbstractAcquisitionFunction(ABC):
     @staticmethod
@@ -61,6 +64,25 @@ class AbstractAcquisitionFunction(ABC):
         """
         pass
 
+    @staticmethod
+    def evaluate_batch(X, surrogate_model, y_opt, acq_func_kwargs=None):
+        """evaluates acquisition function and its gradients at many points with a single posterior prediction,
+           e.g. to optimize the acquisition function from several starting points at once.
+
+        :param X: Values where the acquisition function should be computed. shape = (n_locations, n_hparams)
+        :type X: np.ndarray
+        :param surrogate_model: the surrogate model of the bayesian optimizer.
+        :type surrogate_model: GaussianProcessRegressor
+        :param y_opt: currently best observed value
+        :type y_opt: float
+        :param acq_func_kwargs: additional arguments for the acquisition function
+        :type acq_func_kwargs: dict|None
+        :return: tuple containing two arrays. the first holds the values of the acquisition function;
+                 shape = (n_locations,). the second holds the gradients; shape = (n_locations, n_hparams).
+        :rtype: tuple
+        """
+        raise NotImplementedError
+
     def name(self):
         return str(self.__class__.__name__)
 
@@ -88,6 +110,16 @@ class GaussianProcess_EI(AbstractAcquisitionFunction):
             acq_func_kwargs=acq_func_kwargs,
         )
 
+    @staticmethod
+    def evaluate_batch(X, surrogate_model, y_opt, acq_func_kwargs=None):
+        return _gaussian_acquisition_batch(
+            X=X,
+            model=surrogate_model,
+            y_opt=y_opt,
+            acq_func="EI",
+            acq_func_kwargs=acq_func_kwargs,
+        )
+
 
 class GaussianProcess_PI(AbstractAcquisitionFunction):
     @staticmethod
@@ -110,6 +142,16 @@ class GaussianProcess_PI(AbstractAcquisitionFunction):
             acq_func_kwargs=acq_func_kwargs,
         )
 
+    @staticmethod
+    def evaluate_batch(X, surrogate_model, y_opt, acq_func_kwargs=None):
+        return _gaussian_acquisition_batch(
+            X=X,
+            model=surrogate_model,
+            y_opt=y_opt,
+            acq_func="PI",
+            acq_func_kwargs=acq_func_kwargs,
+        )
+
 
 class GaussianProcess_LCB(AbstractAcquisitionFunction):
     """kappa in acq_func_kwargs"""
@@ -134,6 +176,16 @@ class GaussianProcess_LCB(AbstractAcquisitionFunction):
             acq_func_kwargs=acq_func_kwargs,
         )
 
+    @staticmethod
+    def evaluate_batch(X, surrogate_model, y_opt, acq_func_kwargs=None):
+        return _gaussian_acquisition_batch(
+            X=X,
+            model=surrogate_model,
+            y_opt=y_opt,
+            acq_func="LCB",
+            acq_func_kwargs=acq_func_kwargs,
+        )
+
 
 class GaussianProcess_UCB(AbstractAcquisitionFunction):
     @staticmethod
@@ -191,3 +243,42 @@ class HLP(AbstractAcquisitionFunction):
     @staticmethod
     def evaluate_1_d(x, surrogate_model, y_opt, acq_func_kwargs=None):
         raise NotImplementedError
+
+
+def _gaussian_acquisition_batch(X, model, y_opt, acq_func, acq_func_kwargs=None):
+    """Vectorized version of `gaussian_acquisition_1D` for many points. Returns values and gradients of the
+    acquisition function to minimize, i.e. negated EI and PI."""
+    if acq_func_kwargs is None:
+        acq_func_kwargs = dict()
+    xi = acq_func_kwargs.get("xi", 0.01)
+    kappa = acq_func_kwargs.get("kappa", 1.96)
+
+    mu, std, mu_grad, std_grad = predict_with_gradients(model, X)
+
+    if acq_func == "LCB":
+        if kappa == "inf":
+            return -std, -std_grad
+        return mu - kappa * std, mu_grad - kappa * std_grad
+
+    values = np.zeros_like(mu)
+    grads = np.zeros_like(mu_grad)
+    # like skopt, values and gradients are 0 where the model is certain
+    mask = std > 0
+    improve = y_opt - xi - mu[mask]
+    scaled = improve / std[mask]
+    cdf = norm.cdf(scaled)
+    pdf = norm.pdf(scaled)
+    if acq_func == "EI":
+        values[mask] = improve * cdf + std[mask] * pdf
+        # the derivatives of the pdf terms cancel out
+        grads[mask] = -mu_grad[mask] * cdf[:, None] + std_grad[mask] * pdf[:, None]
+    elif acq_func == "PI":
+        values[mask] = cdf
+        # gradient of (y_opt - xi - mu) / std
+        scaled_grad = (
+            -mu_grad[mask] * std[mask, None] - std_grad[mask] * improve[:, None]
+        ) / std[mask, None] ** 2
+        grads[mask] = scaled_grad * pdf[:, None]
+    else:
+        raise ValueError("Acquisition function not implemented.")
+    return -values, -grads
@@ -16,11 +16,13 @@
 
 import time
 from copy import deepcopy
+from functools import partial
 from abc import abstractmethod
 
 import numpy as np
 
 from maggy.optimizer.abstractoptimizer import AbstractOptimizer
+from maggy.optimizer.designs import DESIGNS
 
 
 class BaseAsyncBO(AbstractOptimizer):
@@ -88,9 +90,11 @@ class BaseAsyncBO(AbstractOptimizer):
     def __init__(
         self,
         num_warmup_trials=15,
+        warmup_sampling="random",
         random_fraction=0.33,
         interim_results=False,
         interim_results_interval=10,
+        duplicate_tolerance=None,
         **kwargs
     ):
         """
@@ -108,6 +112,14 @@ class BaseAsyncBO(AbstractOptimizer):
 
         :param num_warmup_trials: number of random trials at the beginning of experiment
         :type num_warmup_trials: int
+        :param warmup_sampling: design of the warmup configs, one of
+                                - "random": random configs
+                                - "sobol": Sobol sequence, at most `designs.SOBOL_MAX_DIM` hparams
+                                - "lhs": latin hypercube
+                                - "maximin": latin hypercube that maximizes the minimum distance between the configs
+                                The space filling designs need less warmup trials than random configs to cover the
+                                searchspace.
+        :type warmup_sampling: str
         :param random_fraction: fraction of random samples, between [0,1]
         :type random_fraction: float
         :param interim_results: If True, use interim metrics from trials for fitting surrogate model. Else use final
@@ -116,15 +128,20 @@ class BaseAsyncBO(AbstractOptimizer):
         :param interim_results_interval: Specifies which interim metrics are used (if interim_results==True)
                                          e.g. interval=10: the metric of every 10th epoch is used for fitting surrogate
         :type interim_results_interval: int
+        :param duplicate_tolerance: If set, sampled configs are rejected as near duplicates if all their continuous
+                                    hparams lie within the same cell of width `duplicate_tolerance` (relative to the
+                                    hparam range) as a started config. Else only exact duplicates are rejected
+        :type duplicate_tolerance: float
         """
         super().__init__(**kwargs)
+        self.duplicate_tolerance = duplicate_tolerance
 
         # configure warmup routine
         self.num_warmup_trials = num_warmup_trials
-        self.warmup_sampling = "random"
+        self.warmup_sampling = warmup_sampling
         self.warmup_configs = []  # keeps track of warmup warmup configs
 
-        allowed_warmup_sampling_methods = ["random"]
+        allowed_warmup_sampling_methods = ["random"] + list(DESIGNS.keys())
         if self.warmup_sampling not in allowed_warmup_sampling_methods:
             raise ValueError(
                 "expected warmup_sampling to be in {}, got {}".format(
@@ -141,14 +158,24 @@ class BaseAsyncBO(AbstractOptimizer):
         # helper variable to calculate time needed for calculating next suggestion
         self.sampling_time_start = 0.0
 
+        # configs proposed by the model that are not assigned yet, see `get_suggestions()`
+        self._suggestion_batch = []
+
         # If True, the encoded categorical hparam is also max-min normalized between 0 and 1 in searchspace.transform()
         self.normalize_categorical = True
         if self.name() == "TPE":
             self.normalize_categorical = False
 
     def initialize(self):
-        # validate hparam types
-        # at least one hparam needs to be continuous & no DISCRETE hparams
+        self.validate_searchspace()
+        self.warmup_routine()
+        self.init_model()
+
+    def validate_searchspace(self):
+        """raises a ValueError if the surrogate model does not support the hparam types of the searchspace
+
+        at least one hparam needs to be continuous & no DISCRETE hparams
+        """
         cont = False
         for hparam in self.searchspace.items():
             if hparam["type"] == self.searchspace.DISCRETE:
@@ -164,9 +191,6 @@ class BaseAsyncBO(AbstractOptimizer):
                 "In this version of Bayesian Optimization at least one hparam has to be continuous (DOUBLE or INTEGER)"
             )
 
-        self.warmup_routine()
-        self.init_model()
-
     def get_suggestion(self, trial=None):
         self._log("### start get_suggestion ###")
         self.sampling_time_start = time.time()
@@ -206,6 +230,8 @@ class BaseAsyncBO(AbstractOptimizer):
                     hparams=parent_trial_hparams,
                     sample_type="promoted",
                     run_budget=next_trial_info["budget"],
+                    parent_trial_id=parent_trial_id,
+                    parent_budget=parent_trial_hparams.get("budget", None),
                 )
                 # report new trial id to pruner
                 self.pruner.report_trial(
@@ -239,13 +265,27 @@ class BaseAsyncBO(AbstractOptimizer):
                 run_budget=run_budget,
             )
 
-        elif np.random.rand() < self.random_fraction:
+        elif self.rng.random() < self.random_fraction:
             # random fraction applies, sample randomly
-            hparams = self.searchspace.get_random_parameter_values(1)[0]
+            hparams = self._random_configs(1)[0]
             next_trial = self.create_trial(
                 hparams=hparams, sample_type="random", run_budget=run_budget
             )
             self._log("sampled randomly: {}".format(hparams))
+        elif self._suggestion_batch:
+            # take next config of the batch proposed by the model for the current `get_suggestions()` call
+            hparams, model_budget = self._suggestion_batch.pop()
+            next_trial = self.create_trial(
+                hparams=hparams,
+                sample_type="model",
+                run_budget=run_budget,
+                model_budget=model_budget,
+            )
+            self._log(
+                "sampled from batch of model with budget {}: {}".format(
+                    model_budget, hparams
+                )
+            )
         else:
             # update model
             if self.pruner and not self.interim_results:
@@ -257,7 +297,7 @@ class BaseAsyncBO(AbstractOptimizer):
 
             if not self.models:
                 # in case there is no model yet, sample randomly
-                hparams = self.searchspace.get_random_parameter_values(1)[0]
+                hparams = self._random_configs(1)[0]
                 next_trial = self.create_trial(
                     hparams=hparams, sample_type="random", run_budget=run_budget
                 )
@@ -272,7 +312,17 @@ class BaseAsyncBO(AbstractOptimizer):
                         model_budget
                     )
                 )
-                hparams = self.sampling_routine(model_budget)
+                if self.n_pending_suggestions > 1:
+                    # propose configs for all pending suggestions with one fit of the model
+                    batch = self.batch_sampling_routine(
+                        model_budget, self.n_pending_suggestions
+                    )
+                    hparams = batch[0]
+                    self._suggestion_batch = [
+                        (batch_hparams, model_budget) for batch_hparams in batch[:0:-1]
+                    ]
+                else:
+                    hparams = self.sampling_routine(model_budget)
                 next_trial = self.create_trial(
                     hparams=hparams,
                     sample_type="model",
@@ -289,7 +339,7 @@ class BaseAsyncBO(AbstractOptimizer):
         i = 0
         while self.hparams_exist(trial=next_trial):
             self._log("sample randomly to encourage exploration")
-            hparams = self.searchspace.get_random_parameter_values(1)[0]
+            hparams = self._random_configs(1)[0]
             next_trial = self.create_trial(
                 hparams=hparams, sample_type="random_forced", run_budget=run_budget
             )
@@ -312,6 +362,19 @@ class BaseAsyncBO(AbstractOptimizer):
         )
         return next_trial
 
+    def get_suggestions(self, n, trial=None):
+        """Returns trials for `n` idle executors at once, see `AbstractOptimizer.get_suggestions()`.
+
+        The first config that is sampled from the model is proposed together with configs for the remaining
+        suggestions, see `batch_sampling_routine()`. Hence the model is fit once per call instead of once per
+        suggestion.
+        """
+        try:
+            return super().get_suggestions(n, trial)
+        finally:
+            # configs of the batch that were not used, e.g. because of the random fraction, are stale afterwards
+            self._suggestion_batch = []
+
     def finalize_experiment(self, trials):
         return
 
@@ -358,23 +421,70 @@ class BaseAsyncBO(AbstractOptimizer):
         """
         raise NotImplementedError
 
+    def batch_sampling_routine(self, budget=0, q=1):
+        """Samples up to `q` diverse configs from one fit of the model
+
+        The default implementation proposes a single config with `sampling_routine()`, optimizers that can propose
+        batches override this method.
+
+        :param budget: the budget from which model should be sampled. Default is 0
+        :type budget: int
+        :param q: maximum number of configs
+        :type q: int
+        :return: hyperparameter configs, the first one is the config `sampling_routine()` would return
+        :rtype: list[dict]
+        """
+        return [self.sampling_routine(budget)]
+
     def warmup_routine(self):
-        """implements logic for warming up bayesian optimization through random sampling by adding hparam configs to
-        `warmup_config` list
+        """implements logic for warming up bayesian optimization through random sampling or a space filling design by
+        adding hparam configs to `warmup_config` list
         """
 
         # generate warmup hparam configs
         if self.warmup_sampling == "random":
-            self.warmup_configs = self.searchspace.get_random_parameter_values(
-                self.num_warmup_trials
+            self.warmup_configs = self._random_configs(self.num_warmup_trials)
+        elif self.warmup_sampling in DESIGNS:
+            design_kwargs = {}
+            if self.warmup_sampling == "maximin":
+                # measure distances between the configs, i.e. after discretizing INTEGER and CATEGORICAL hparams
+                design_kwargs["transform"] = partial(
+                    self.searchspace.unit_cube_to_transformed,
+                    normalize_categorical=True,
+                )
+            points = DESIGNS[self.warmup_sampling](
+                self.num_warmup_trials,
+                len(self.searchspace.keys()),
+                rng=self.rng,
+                **design_kwargs
+            )
+            configs = self.searchspace.inverse_transform_batch(
+                self.searchspace.unit_cube_to_transformed(points)
             )
+            # configs are popped from the end of the list, keep order of the design
+            self.warmup_configs = [
+                self.searchspace.list_to_dict(config) for config in configs[::-1]
+            ]
         else:
             raise NotImplementedError(
-                "warmup sampling {} doesnt exist, use random".format(
-                    self.warmup_sampling
+                "warmup sampling {} doesnt exist, use one of {}".format(
+                    self.warmup_sampling, ["random"] + list(DESIGNS.keys())
                 )
             )
 
+    def _random_configs(self, n):
+        """returns `n` random hparam configs in dict representation, drawn from the `rng` of the experiment
+
+        :param n: number of configs
+        :type n: int
+        :return: hparam configs
+        :rtype: list[dict]
+        """
+        configs = self.searchspace.inverse_transform_batch(
+            self.searchspace.sample_transformed(n, rng=self.rng)
+        )
+        return [self.searchspace.list_to_dict(config) for config in configs]
+
     def _experiment_finished(self):
         """checks if experiment is finished
 
@@ -427,7 +537,9 @@ class BaseAsyncBO(AbstractOptimizer):
     def get_imputed_metrics(self, budget=0):
         """returns imputed metrics for currently evaluating trials
 
-        Considers only trials that were sampled from model with specified budget
+        Considers only trials that were sampled from model with specified budget. The order is the same as in
+        `get_busy_locations()`. Like the metrics of finalized trials, the imputed metrics are negated if the
+        optimization direction is `max`.
         This is a helper function, only used when async strategy is `impute`
         """
         if not self.include_busy_locations():
@@ -440,22 +552,23 @@ class BaseAsyncBO(AbstractOptimizer):
                 )
             )
 
-        metrics_busy = np.empty(0, dtype=float)
-        for trial_id, trial in self.trial_store.items():
-            if (
-                trial.info_dict["sample_type"] == "model"
-                and trial.info_dict["model_budget"] == budget
-            ):
-                imputed_metric = self.impute_metric(trial.params, budget)
-                metrics_busy = np.append(metrics_busy, imputed_metric)
-                # add info about imputed metric to trial info dict
-                if "imputed_metrics" in trial.info_dict.keys():
-                    trial.info_dict["imputed_metrics"].append(imputed_metric)
-                else:
-                    trial.info_dict["imputed_metrics"] = [imputed_metric]
+        busy_trials = [
+            trial
+            for trial in self.trial_store.values()
+            if trial.info_dict["sample_type"] == "model"
+            and trial.info_dict["model_budget"] == budget
+        ]
+        metrics_busy = self.impute_metrics(busy_trials, budget)
 
         return metrics_busy
 
+    def impute_metrics(self, trials, budget=0):
+        """returns imputed metrics for the given currently evaluating trials, see `GP.impute_metrics()`
+
+        Only optimizers with async strategy `impute` need to implement this method.
+        """
+        raise NotImplementedError
+
     def get_XY(self, budget=0, interim_results=False, interim_results_interval=10):
         """get transformed hparams and metrics for fitting surrogate
 
@@ -495,9 +608,10 @@ class BaseAsyncBO(AbstractOptimizer):
         if not interim_results:
             # return final metrics only
 
-            # get hparams and final metrics of finalized trials
-            hparams = self.get_hparams_array(budget=budget)
-            metrics = self.get_metrics_array(budget=budget, interim_metrics=False)
+            # get transformed hparams and final metrics of finalized trials
+            observations = self.get_observations()
+            X = observations.X(budget)
+            y = observations.y(budget)
 
             # if async strategy is `impute`
             if self.include_busy_locations():
@@ -512,22 +626,14 @@ class BaseAsyncBO(AbstractOptimizer):
                         hparams_busy.shape[0], imputed_metrics.shape[0]
                     )
                 )
-                # append to hparams and metrics
+                # transform and append to hparams and metrics
                 if len(hparams_busy) > 0:
-                    hparams = np.concatenate((hparams, hparams_busy))
-                    metrics = np.concatenate((metrics, imputed_metrics))
-
-            # transform hparams
-            # note that through transform, budget param gets ommited from hparams if it was existent (pruner)
-            hparams_transform = np.apply_along_axis(
-                self.searchspace.transform,
-                1,
-                hparams,
-                normalize_categorical=self.normalize_categorical,
-            )
-
-            X = hparams_transform
-            y = metrics
+                    # note that through transform, budget param gets ommited from hparams if it was existent (pruner)
+                    hparams_busy_transform = self.searchspace.transform_batch(
+                        hparams_busy, normalize_categorical=self.normalize_categorical
+                    )
+                    X = np.concatenate((X, hparams_busy_transform))
+                    y = np.concatenate((y, imputed_metrics))
 
             assert X.shape[1] == len(
                 self.searchspace.keys()
@@ -539,67 +645,12 @@ class BaseAsyncBO(AbstractOptimizer):
             # return interim results and hparams augumented with budget
             # return every nth interim result according to interim_results_interval. always return first and last result
 
-            # get and transform hparams of all finalized trials
-            hparams = self.get_hparams_array(budget=budget)
-            hparams_transform = np.apply_along_axis(
-                self.searchspace.transform,
-                1,
-                hparams,
-                normalize_categorical=self.normalize_categorical,
-            )
-
-            # get full metric history for all finalized trials
-            metrics = self.get_metrics_array(
-                interim_metrics=True, budget=budget
-            )  # array of metric history arrays
-
-            # get indices of hparams/metrics to be used for each trial
-            interim_result_indices = np.array(
-                [
-                    self.get_interim_result_idx(
-                        metric_history, interim_results_interval
-                    )
-                    for metric_history in metrics
-                ]
-            )  # araay of list. each list represents the indices of the metrics to be used of that trial
-
-            # only use every nth interim result of metric history. specified with interim_result_indices
-            metrics_filtered = np.array(
-                [
-                    metrics[trial_idx][interim_result_indices[trial_idx]]
-                    for trial_idx in range(metrics.shape[0])
-                ]
-            )
-            # flatten results so they can be used for fitting posterior
-            # if arrays in yi_filtered do not have same length, e.g. some trials were early stopped or pruner was activated,
-            # yi_filtered is ragged (yi_filtered.shape = (n_trials,)) and flatten does not work, use np.hstack().
-            # if all trials have been trained on max budget (yi_filtered.shape = (n_trials, n_filtered_results)) use flatten() since it is better for performance.
-            if len(metrics_filtered.shape) == 2:
-                metrics_flat = metrics_filtered.flatten()
-            else:
-                metrics_flat = np.hstack(metrics_filtered)
-
-            # augument hparams with budget, i.e. z_t = [x_t, n_t] for every interim result
+            # augument hparams with budget, i.e. z_t = [x_t, n_t] for every interim result. The observation store
+            # assembles them incrementally, see `get_interim_result_idx()` for the interim results that are used
             max_budget = self.get_max_budget()
-            n_hparams = len(self.searchspace.keys())
-            hparams_augumented = np.empty((0, n_hparams + 1))
-            # create one hparam config augumented with the corresponding normalized budget for every interim result
-            # loop through trials
-            for indices, trial_hparams in zip(
-                interim_result_indices, hparams_transform
-            ):
-                # loop through interim results
-                for idx in indices:
-                    # idx is budget
-                    normalized_budget = self.searchspace._normalize_integer(
-                        [0, max_budget - 1], idx
-                    )
-                    augumented_trial_hparams = np.append(
-                        deepcopy(trial_hparams), normalized_budget
-                    )
-                    hparams_augumented = np.vstack(
-                        (hparams_augumented, augumented_trial_hparams)
-                    )
+            hparams_augumented, metrics_flat = self.get_observations().interim(
+                interim_results_interval, max_budget, budget=budget
+            )
 
             # add evaluating trials if impute strategy, i.e. z = [x, max_budget] y = imputed_metric
             if self.include_busy_locations():
@@ -614,11 +665,8 @@ class BaseAsyncBO(AbstractOptimizer):
 
                 if len(hparams_busy) > 0:
                     # transform hparams
-                    hp_trans = np.apply_along_axis(
-                        self.searchspace.transform,
-                        1,
-                        hparams_busy,
-                        normalize_categorical=self.normalize_categorical,
+                    hp_trans = self.searchspace.transform_batch(
+                        hparams_busy, normalize_categorical=self.normalize_categorical
                     )
                     # augument with max budget (i.e. always 1 in normalized form)
                     hp_aug = np.append(
@@ -644,6 +692,7 @@ class BaseAsyncBO(AbstractOptimizer):
         """helper function for creating hparams with interim results
 
         get indices of interim results of one trial metric history that will be used for fitting surrogate.
+        `ObservationStore.interim()` selects the same indices for all trials at once.
 
         Note: final metric is always used
 
@@ -674,7 +723,7 @@ class BaseAsyncBO(AbstractOptimizer):
 
         This is only the case when surrogate is a Gaussian Process with `impute` as async_strategy
         """
-        if self.name() == "GP" and self.async_strategy == "impute":
+        if self.name() in ["GP", "TuRBO"] and self.async_strategy == "impute":
             return True
         else:
             return False
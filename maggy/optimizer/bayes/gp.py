@@ -14,8 +14,11 @@
 #   limitations under the License.
 #
 
+import time
+
 import numpy as np
 from scipy.optimize import fmin_l_bfgs_b
+from scipy.stats import norm
 
 from skopt.learning.gaussian_process import GaussianProcessRegressor
 from skopt.learning.gaussian_process.kernels import ConstantKernel
@@ -23,6 +26,11 @@ from skopt.learning.gaussian_process.kernels import Matern
 from sklearn.base import clone
 
 from maggy.optimizer.bayes.base import BaseAsyncBO
+from maggy.optimizer.bayes.surrogates import (
+    IncrementalGaussianProcessRegressor,
+    SparseGaussianProcessRegressor,
+    predict_mean_gradients,
+)
 from maggy.optimizer.bayes.acquisitions import (
     GaussianProcess_EI,
     GaussianProcess_LCB,
@@ -42,6 +50,9 @@ class GP(BaseAsyncBO):
         acq_fun_kwargs=None,
         acq_optimizer="lbfgs",
         acq_optimizer_kwargs=None,
+        surrogate="exact",
+        surrogate_kwargs=None,
+        batch_strategy="local_penalization",
         **kwargs
     ):
         """
@@ -93,8 +104,56 @@ class GP(BaseAsyncBO):
                                 - `"lbfgs"` is run for 20 iterations with these points as initial
                                    points to find local minima.
                                 - The optimal of these local minima is used to update the prior.
+                              - If set to `"evolution"`, then `acq_func` is optimized by an evolution strategy
+                                starting from the best `population_size` sampled points, see `_evolution()`. Every
+                                generation is evaluated with one call of the acquisition function and INTEGER,
+                                DISCRETE and CATEGORICAL hparams are mutated on their own values. Not supported with
+                                `"asy_ts"`, where every evaluation is a new posterior sample.
         :param acq_optimizer_kwargs: Additional arguments to be passed to the acquisition optimizer.
+
+                                     - `"n_points"`: number of randomly sampled points
+                                     - `"chunk_size"`: number of sampled points that are evaluated at once, default
+                                       2048. Only the best points are kept between chunks, i.e. memory is bounded
+                                       independent of `n_points`. Not supported with `"asy_ts"`, where all points
+                                       have to be part of the same posterior sample
+                                     - `"n_restarts_optimizer"`: number of starting points of `"lbfgs"`, default 5
+                                     - `"stacked"`: If True (default), all starting points are optimized in a single
+                                       `"lbfgs"` run, i.e. the surrogate is evaluated at all points with one
+                                       prediction per iteration. Not supported with `"asy_ts"`, where every starting
+                                       point is optimized on its own.
+                                     - `"max_seconds"`: wall clock limit of `"lbfgs"` and `"evolution"`, the best
+                                       point found so far is used when it is reached. Default None, i.e. no limit
+                                     - `"population_size"`: number of parents of `"evolution"`, default 20. Every
+                                       generation has five times as many offspring
+                                     - `"n_generations"`: number of generations of `"evolution"`, default 30
         :type acq_optimizer_kwargs: dict
+        :param surrogate: How the gaussian process is fit to new observations.
+
+                          - If set to `"exact"`, the model is fit from scratch, including the kernel hyperparameters,
+                            every time it is updated.
+                          - If set to `"incremental"`, new observations are added with low rank updates of the
+                            cholesky factor while the kernel hyperparameters are kept fixed. The kernel
+                            hyperparameters are refit every `refit_every` new observations (default 10) or if the last
+                            refit is older than `refit_seconds` (default None, i.e. never), warm started from the
+                            previous ones. See `IncrementalGaussianProcessRegressor`.
+                          - If set to `"sparse"`, the posterior is approximated with `n_inducing` (default 500)
+                            randomly chosen observations as inducing points, which scales linearly with the number of
+                            observations, e.g. with many interim results. Refits are warm started from the previous
+                            kernel hyperparameters. See `SparseGaussianProcessRegressor`.
+        :type surrogate: str
+        :param surrogate_kwargs: Additional arguments to be passed to the surrogate, e.g. `refit_every` and
+                                 `refit_seconds` for the `"incremental"` surrogate or `n_inducing` for the `"sparse"`
+                                 surrogate.
+        :type surrogate_kwargs: dict
+        :param batch_strategy: How configs for many idle executors are proposed at once, see
+                               `batch_sampling_routine()`.
+
+                               - If set to `"local_penalization"`, one fit of the model proposes diverse configs for
+                                 all idle executors, by local penalization with async strategy `"impute"` and by
+                                 independent posterior samples with `"asy_ts"`.
+                               - If None, the model is fit for every config, e.g. with the imputed metrics of the
+                                 configs proposed before.
+        :type batch_strategy: str|None
         """
         super().__init__(**kwargs)
 
@@ -144,13 +203,17 @@ class GP(BaseAsyncBO):
         self.acq_func_kwargs = acq_fun_kwargs
 
         # configure acquisiton function optimizer
-        allowed_acq_opt = ["sampling", "lbfgs"]
+        allowed_acq_opt = ["sampling", "lbfgs", "evolution"]
         if acq_optimizer not in allowed_acq_opt:
             raise ValueError(
                 "expected acq_optimizer to be in {}, got {}".format(
                     allowed_acq_opt, acq_optimizer
                 )
             )
+        if acq_optimizer == "evolution" and self.async_strategy == "asy_ts":
+            raise ValueError(
+                "acq_optimizer `evolution` is not supported with async_strategy `asy_ts`"
+            )
         self.acq_optimizer = acq_optimizer
         if acq_optimizer_kwargs is None:
             acq_optimizer_kwargs = dict()
@@ -161,6 +224,14 @@ class GP(BaseAsyncBO):
         else:
             self.n_points = acq_optimizer_kwargs.get("n_points", 10000)
         self.n_restarts_optimizer = acq_optimizer_kwargs.get("n_restarts_optimizer", 5)
+        if self.async_strategy == "asy_ts":
+            self.acq_chunk_size = self.n_points
+        else:
+            self.acq_chunk_size = acq_optimizer_kwargs.get("chunk_size", 2048)
+        self.acq_optimizer_stacked = acq_optimizer_kwargs.get("stacked", True)
+        self.acq_optimizer_max_seconds = acq_optimizer_kwargs.get("max_seconds", None)
+        self.population_size = acq_optimizer_kwargs.get("population_size", 20)
+        self.n_generations = acq_optimizer_kwargs.get("n_generations", 30)
         self.acq_optimizer_kwargs = acq_optimizer_kwargs
 
         # configure impute strategy
@@ -174,94 +245,406 @@ class GP(BaseAsyncBO):
                 )
             self.impute_strategy = impute_strategy
 
+        # configure surrogate
+        allowed_surrogates = ["exact", "incremental", "sparse"]
+        if surrogate not in allowed_surrogates:
+            raise ValueError(
+                "expected surrogate to be in {}, got {}".format(
+                    allowed_surrogates, surrogate
+                )
+            )
+        self.surrogate = surrogate
+        self.surrogate_kwargs = surrogate_kwargs or dict()
+
+        # configure batch strategy
+        allowed_batch_strategies = [None, "local_penalization"]
+        if batch_strategy not in allowed_batch_strategies:
+            raise ValueError(
+                "expected batch_strategy to be in {}, got {}".format(
+                    allowed_batch_strategies, batch_strategy
+                )
+            )
+        self.batch_strategy = batch_strategy
+        # number of candidates used to estimate the lipschitz constant for local penalization
+        self.lipschitz_samples = 500
+
         # estimator that has not been fit on any data.
         self.base_model = None
 
+        # number of times the model of a budget has been fit
+        self.model_versions = {}
+
         if self.async_strategy == "impute":
             self._log("Impute Strategy: {}".format(self.impute_strategy))
 
     def sampling_routine(self, budget=0):
-        # even with BFGS as optimizer we want to sample a large number
-        # of points and then pick the best ones as starting points
-        random_hparams = self.searchspace.get_random_parameter_values(self.n_points)
-        random_hparams_list = np.array(
-            [self.searchspace.dict_to_list(hparams) for hparams in random_hparams]
+        n_best = (
+            self.population_size
+            if self.acq_optimizer == "evolution"
+            else self.n_restarts_optimizer
         )
-        y_opt = self.ybest(budget)
+        X, values, y_opt = self._acquisition_candidates(budget, n_best=n_best)
+        next_x = self._minimize_acquisition(X, values, budget, y_opt)
+        return self._to_hparams(next_x)
+
+    def batch_sampling_routine(self, budget=0, q=1):
+        """Samples up to `q` diverse configs from the current model, see `BaseAsyncBO.batch_sampling_routine()`
+
+        The first config minimizes the acquisition function like in `sampling_routine()`. The remaining configs are
+        chosen among the sampled candidates according to `batch_strategy`:
+
+        - async strategy `"impute"`: local penalization (González et al. 2016), i.e. greedily maximize the
+          acquisition function multiplied with penalizers around the configs of the batch. The radius of a penalizer
+          is the distance within which the objective can not reach the best observed metric, given the predicted
+          metric of the config and a Lipschitz constant of the posterior mean.
+        - async strategy `"asy_ts"`: every config minimizes a new sample of the posterior
+
+        Local penalization: https://arxiv.org/abs/1505.08052
+        """
+        # local penalization chooses among the best candidates of all chunks
+        X, values, y_opt = self._acquisition_candidates(
+            budget, n_best=self.acq_chunk_size
+        )
+        batch = [self._minimize_acquisition(X, values, budget, y_opt)]
+
+        if self.batch_strategy is not None and q > 1:
+            if self.async_strategy == "asy_ts":
+                # draw all posterior samples at once, they share the covariance of the candidates
+                samples = self.models[budget].sample_y(
+                    X,
+                    n_samples=q - 1,
+                    random_state=int(self.rng.integers(2 ** 31 - 1)),
+                )
+                samples = samples.reshape(len(X), -1)
+                for i in range(samples.shape[1]):
+                    # a confident posterior has the same minimum in many samples, take each candidate once
+                    idx = np.argmin(samples[:, i])
+                    batch.append(X[idx])
+                    samples[idx] = np.inf
+            else:
+                batch += self._local_penalization(
+                    X, values, batch[0], budget, y_opt, q - 1
+                )
+
+        return [self._to_hparams(x) for x in batch]
 
-        # transform configs
-        X = np.apply_along_axis(
-            self.searchspace.transform,
-            1,
-            random_hparams_list,
-            normalize_categorical=True,
+    def _acquisition_candidates(self, budget=0, n_best=1):
+        """samples `n_points` candidates in transformed representation and evaluates the acquisition function at them
+
+        :return: tuple of the best candidates and their acquisition function values, sorted by ascending value, and
+                 the best observed metric
+        :rtype: (np.ndarray, np.ndarray, float)
+        """
+        y_opt = self.ybest(budget)
+        X, values = self._best_candidates(
+            self._sample_candidates, self.models[budget], y_opt, n_best
         )
+        return X, values, y_opt
 
+    def _sample_candidates(self, n):
+        """samples `n` random candidates directly in transformed representation"""
+        X = self.searchspace.sample_transformed(
+            n, rng=self.rng, normalize_categorical=True
+        )
         if self.interim_results:
             # Always sample with max budget: xt ← argmax acq([x, N])
             # normalized max budget is 1 → add 1 to hparam configs
             X = np.append(X, np.ones(X.shape[0]).reshape(-1, 1), 1)
+        return X
 
-        values = self.acq_fun.evaluate(
-            X=X,
-            surrogate_model=self.models[budget],
-            y_opt=y_opt,
-            acq_func_kwargs=self.acq_func_kwargs,
-        )
+    def _best_candidates(self, sample, model, y_opt, n_best):
+        """returns the `n_best` of `n_points` candidates and their acquisition function values, sorted by ascending
+        value
+
+        The candidates are sampled with `sample(n)` and evaluated in chunks of `acq_chunk_size`, only the running
+        `n_best` candidates are kept between chunks.
+        """
+        # even with BFGS as optimizer we want to sample a large number
+        # of points and then pick the best ones as starting points
+        best_X, best_values = None, None
+        n_remaining = self.n_points
+        while n_remaining > 0:
+            n_chunk = min(self.acq_chunk_size, n_remaining)
+            n_remaining -= n_chunk
+
+            X = sample(n_chunk)
+            values = self.acq_fun.evaluate(
+                X=X,
+                surrogate_model=model,
+                y_opt=y_opt,
+                acq_func_kwargs=self.acq_func_kwargs,
+            )
+
+            if best_X is not None:
+                X = np.concatenate((best_X, X))
+                values = np.concatenate((best_values, values))
+            if len(values) > n_best:
+                keep = np.argpartition(values, n_best - 1)[:n_best]
+                X, values = X[keep], values[keep]
+            best_X, best_values = X, values
 
+        order = np.argsort(best_values, kind="stable")
+        return best_X[order], best_values[order]
+
+    def _minimize_acquisition(self, X, values, budget, y_opt):
+        """returns the minimum of the acquisition function found with `acq_optimizer`, starting from the candidates
+        `X` with acquisition function `values`"""
         # Find the minimum of the acquisition function by randomly
         # sampling points from the space
         if self.acq_optimizer == "sampling":
             next_x = X[np.argmin(values)]
 
-        # Use BFGS to find the mimimum of the acquisition function, the
-        # minimization starts from `n_restarts_optimizer` different
-        # points and the best minimum is
-        elif self.acq_optimizer == "lbfgs":
-            # in asynchronous ts the acquisition function is not returning the gradient, hence we need to approximate
-            approx_grad = True if self.async_strategy == "asy_ts" else False
-
-            x0 = X[np.argsort(values)[: self.n_restarts_optimizer]]
-
-            results = []
-            # bounds of transformed hparams are always [0.0,1.0] ( if categorical encodings get normalized,
-            # which is the case here )
-            bounds = [(0.0, 1.0) for _ in self.searchspace.values()]
-            if self.interim_results:
-                bounds.append((0.0, 1.0))
-            for x in x0:
-                # todo evtl. use Parallel / delayed like skopt
-                result = fmin_l_bfgs_b(
-                    func=self.acq_fun.evaluate_1_d,
-                    x0=x,
-                    args=(
-                        self.models[budget],
-                        y_opt,
-                        self.acq_func_kwargs,
-                    ),
-                    bounds=bounds,
-                    approx_grad=approx_grad,
-                    maxiter=20,
+        # Use BFGS or the evolution strategy to find the mimimum of the
+        # acquisition function, starting from the best candidates
+        else:
+            tracker = _AcquisitionTracker(
+                X[np.argmin(values)],
+                np.min(values),
+                max_seconds=self.acq_optimizer_max_seconds,
+            )
+            try:
+                if self.acq_optimizer == "evolution":
+                    next_x = self._evolution(X, values, budget, y_opt, tracker)
+                else:
+                    next_x = self._lbfgs(X, values, budget, y_opt, tracker)
+            except _AcquisitionTimeout:
+                self._log(
+                    "Acquisition optimization stopped after {} seconds".format(
+                        self.acq_optimizer_max_seconds
+                    )
                 )
-                results.append(result)
-
-            cand_xs = np.array([r[0] for r in results])
-            cand_acqs = np.array([r[1] for r in results])
-            next_x = cand_xs[np.argmin(cand_acqs)]
+                next_x = tracker.best_x
 
         # lbfgs should handle this but just in case there are
         # precision errors.
-        next_x = np.clip(next_x, 0.0, 1.0)
+        return np.clip(next_x, 0.0, 1.0)
 
+    def _to_hparams(self, x):
+        """returns hparam dict of a config in transformed representation"""
         # transform back to original representation. (also removes augumented budget if interim_results)
-        next_x = self.searchspace.inverse_transform(
-            next_x, normalize_categorical=True
+        x = self.searchspace.inverse_transform(
+            x, normalize_categorical=True
         )  # is array [-3,3,"blue"]
 
         # convert list to dict representation
-        hparam_dict = self.searchspace.list_to_dict(next_x)
+        return self.searchspace.list_to_dict(x)
+
+    def _local_penalization(self, X, values, x_first, budget, y_opt, q):
+        """greedily chooses `q` candidates of `X` that maximize the locally penalized acquisition function, given the
+        first config of the batch `x_first`"""
+        model = self.models[budget]
+
+        # penalizers are multiplied with a positive acquisition function to maximize
+        if isinstance(self.acq_fun, GaussianProcess_LCB):
+            utility = np.logaddexp(0.0, -values)
+        else:
+            # negated EI and PI
+            utility = -values
+        log_acq = np.log(np.maximum(utility, np.finfo(float).tiny))
+
+        # lipschitz constant of the posterior mean, estimated at random configs since the candidates are the best
+        # ones only
+        X_lipschitz = self.searchspace.sample_transformed(
+            self.lipschitz_samples, rng=self.rng, normalize_categorical=True
+        )
+        if self.interim_results:
+            X_lipschitz = np.append(
+                X_lipschitz, np.ones(X_lipschitz.shape[0]).reshape(-1, 1), 1
+            )
+        # chunked like the candidates, only the largest gradient norm is kept between chunks
+        lipschitz = 0.0
+        for start in range(0, X_lipschitz.shape[0], self.acq_chunk_size):
+            mean_grad = predict_mean_gradients(
+                model, X_lipschitz[start : start + self.acq_chunk_size]
+            )
+            lipschitz = max(lipschitz, np.max(np.linalg.norm(mean_grad, axis=1)))
+        if lipschitz < 1e-7:
+            # flat posterior mean, avoid dividing by zero (as in GPyOpt)
+            lipschitz = 10.0
+
+        batch = []
+        x = x_first
+        for _ in range(q):
+            # log of the probability that the objective at the candidates is not excluded by x
+            mean, std = model.predict(x.reshape(1, -1), return_std=True)
+            distance = np.linalg.norm(X - x, axis=1)
+            log_acq += norm.logcdf(
+                (lipschitz * distance - mean[0] + y_opt)
+                / max(std[0], np.finfo(float).eps)
+            )
+
+            idx = np.argmax(log_acq)
+            x = X[idx]
+            batch.append(x)
+            log_acq[idx] = -np.inf
+        return batch
 
-        return hparam_dict
+    def _lbfgs(self, X, values, budget, y_opt, tracker):
+        """minimizes the acquisition function with lbfgs from the best `n_restarts_optimizer` candidates"""
+        x0 = X[np.argsort(values)[: self.n_restarts_optimizer]]
+
+        # bounds of transformed hparams are always [0.0,1.0] ( if categorical encodings get normalized,
+        # which is the case here )
+        bounds = [(0.0, 1.0) for _ in self.searchspace.values()]
+        if self.interim_results:
+            bounds.append((0.0, 1.0))
+
+        if self.acq_optimizer_stacked and self.async_strategy != "asy_ts":
+            return self._lbfgs_stacked(x0, bounds, budget, y_opt, tracker)
+        return self._lbfgs_sequential(x0, bounds, budget, y_opt, tracker)
+
+    def _evolution(self, X, values, budget, y_opt, tracker):
+        """minimizes the acquisition function with a (mu + lambda) evolution strategy in transformed representation
+
+        The best `population_size` candidates are the first parents. Every generation has five offspring per parent,
+        each of them is a uniform crossover of two random parents that is mutated afterwards:
+
+        - DOUBLE and INTEGER hparams take a normal step. INTEGER hparams are rounded to their closest value, hence the
+          normalized distance between neighboring integers is the smallest step that changes them.
+        - DISCRETE and CATEGORICAL hparams are resampled with probability 1 / n_hparams, since their encodings have
+          no order.
+
+        The step size follows the 1/5th success rule, i.e. it grows if more than a fifth of the offspring improve on
+        their first parent and shrinks otherwise. The best parents and offspring survive.
+        """
+        n_hparams = len(self.searchspace.keys())
+        n_offspring = 5 * self.population_size
+
+        n_steps, n_categories, is_categorical = self._transformed_grid()
+
+        order = np.argsort(values)[: self.population_size]
+        parents, parent_values = X[order], values[order]
+        sigma = 0.2
+        for _ in range(self.n_generations):
+            first = self.rng.integers(0, len(parents), size=n_offspring)
+            second = self.rng.integers(0, len(parents), size=n_offspring)
+            offspring = parents[first].copy()
+
+            # the budget column of interim results is not mutated
+            genes = offspring[:, :n_hparams]
+            crossover = self.rng.random(genes.shape) < 0.5
+            genes = np.where(crossover, parents[second, :n_hparams], genes)
+
+            genes = np.where(
+                is_categorical,
+                genes,
+                genes + self.rng.normal(0.0, sigma, size=genes.shape),
+            )
+            resample = is_categorical & (self.rng.random(genes.shape) < 1 / n_hparams)
+            genes = np.where(
+                resample,
+                np.floor(self.rng.random(genes.shape) * n_categories)
+                / np.maximum(n_steps, 1),
+                genes,
+            )
+            offspring[:, :n_hparams] = self._round_to_grid(genes, n_steps)
+
+            offspring_values = self.acq_fun.evaluate(
+                X=offspring,
+                surrogate_model=self.models[budget],
+                y_opt=y_opt,
+                acq_func_kwargs=self.acq_func_kwargs,
+            )
+            tracker.update(offspring, offspring_values)
+
+            success = np.mean(offspring_values < parent_values[first])
+            sigma = np.clip(sigma * np.exp((success - 0.2) / 0.8), 1e-3, 0.5)
+
+            # (mu + lambda) selection
+            candidates = np.concatenate((parents, offspring))
+            candidate_values = np.concatenate((parent_values, offspring_values))
+            survivors = np.argsort(candidate_values, kind="stable")[: len(parents)]
+            parents, parent_values = candidates[survivors], candidate_values[survivors]
+
+        return parents[0]
+
+    def _transformed_grid(self):
+        """returns the grid of the transformed hparams, normalized categorical encodings
+
+        :return: tuple of the number of steps between the transformed values per hparam, i.e. the values are multiples
+                 of 1 / n_steps (0 for DOUBLE hparams), the number of categories per hparam (1 for DOUBLE and INTEGER
+                 hparams) and the mask of DISCRETE and CATEGORICAL hparams
+        :rtype: (np.ndarray, np.ndarray, np.ndarray)
+        """
+        n_hparams = len(self.searchspace.keys())
+        n_steps = np.zeros(n_hparams)
+        n_categories = np.ones(n_hparams, dtype=int)
+        is_categorical = np.zeros(n_hparams, dtype=bool)
+        for col, hparam in enumerate(self.searchspace.items()):
+            if hparam["type"] == self.searchspace.INTEGER:
+                n_steps[col] = max(hparam["values"][1] - hparam["values"][0], 1)
+            elif hparam["type"] in [
+                self.searchspace.CATEGORICAL,
+                self.searchspace.DISCRETE,
+            ]:
+                n_categories[col] = len(hparam["values"])
+                n_steps[col] = max(n_categories[col] - 1, 1)
+                is_categorical[col] = True
+        return n_steps, n_categories, is_categorical
+
+    @staticmethod
+    def _round_to_grid(X, n_steps):
+        """clips configs in transformed representation to [0,1] and rounds discrete hparams to their closest value"""
+        X = np.clip(X, 0.0, 1.0)
+        is_discrete = n_steps > 0
+        X[:, is_discrete] = (
+            np.round(X[:, is_discrete] * n_steps[is_discrete]) / n_steps[is_discrete]
+        )
+        return X
+
+    def _lbfgs_stacked(self, x0, bounds, budget, y_opt, tracker):
+        """minimizes the acquisition function from all starting points `x0` in a single lbfgs run.
+
+        The starting points are stacked to one vector. The objective is the sum of the acquisition function values of
+        all points, its gradient is the concatenation of their gradients, i.e. all points are evaluated with one
+        prediction of the surrogate model per iteration.
+        """
+        n_points, n_dims = x0.shape
+
+        def func(z):
+            points = z.reshape(n_points, n_dims)
+            values, grads = self.acq_fun.evaluate_batch(
+                X=points,
+                surrogate_model=self.models[budget],
+                y_opt=y_opt,
+                acq_func_kwargs=self.acq_func_kwargs,
+            )
+            tracker.update(points, values)
+            return np.sum(values), grads.ravel()
+
+        fmin_l_bfgs_b(
+            func=func,
+            x0=x0.ravel(),
+            bounds=bounds * n_points,
+            maxiter=20,
+        )
+        # the best point of all iterations, the final iterate might not be the best point of every start
+        return tracker.best_x
+
+    def _lbfgs_sequential(self, x0, bounds, budget, y_opt, tracker):
+        """minimizes the acquisition function with one lbfgs run per starting point in `x0`"""
+        # in asynchronous ts the acquisition function is not returning the gradient, hence we need to approximate
+        approx_grad = True if self.async_strategy == "asy_ts" else False
+
+        def func(x):
+            result = self.acq_fun.evaluate_1_d(
+                x, self.models[budget], y_opt, self.acq_func_kwargs
+            )
+            value = result if approx_grad else result[0]
+            tracker.update(x.reshape(1, -1), np.ravel(value))
+            return result
+
+        results = []
+        for x in x0:
+            results.append(
+                fmin_l_bfgs_b(
+                    func=func, x0=x, bounds=bounds, approx_grad=approx_grad, maxiter=20
+                )
+            )
+
+        cand_xs = np.array([r[0] for r in results])
+        cand_acqs = np.array([r[1] for r in results])
+        return cand_xs[np.argmin(cand_acqs)]
 
     def init_model(self):
         """initializes the surrogate model of the gaussian process
@@ -282,12 +665,30 @@ class GP(BaseAsyncBO):
             length_scale_bounds=[(0.01, 100)] * n_dims,
             nu=2.5,
         )
-        base_model = GaussianProcessRegressor(
-            kernel=cov_amplitude * other_kernel,
-            normalize_y=True,
-            noise="gaussian",
-            n_restarts_optimizer=2,
-        )
+        if self.surrogate == "incremental":
+            base_model = IncrementalGaussianProcessRegressor(
+                kernel=cov_amplitude * other_kernel,
+                normalize_y=True,
+                noise="gaussian",
+                n_restarts_optimizer=2,
+                **self.surrogate_kwargs
+            )
+        elif self.surrogate == "sparse":
+            base_model = SparseGaussianProcessRegressor(
+                kernel=cov_amplitude * other_kernel,
+                normalize_y=True,
+                noise="gaussian",
+                n_restarts_optimizer=2,
+                random_state=self.seed,
+                **self.surrogate_kwargs
+            )
+        else:
+            base_model = GaussianProcessRegressor(
+                kernel=cov_amplitude * other_kernel,
+                normalize_y=True,
+                noise="gaussian",
+                n_restarts_optimizer=2,
+            )
         self.base_model = base_model
 
     def update_model(self, budget=0):
@@ -309,22 +710,90 @@ class GP(BaseAsyncBO):
             )
             return
 
-        # create model without any data
-        model = clone(self.base_model)
-
         Xi, yi = self.get_XY(
             budget=budget,
             interim_results=self.interim_results,
             interim_results_interval=self.interim_results_interval,
         )
 
-        # fit model with data
-        model.fit(Xi, yi)
+        if self.surrogate == "incremental":
+            # update existing model, observations of finalized trials precede the ones of busy trials in Xi
+            model = self.models.get(budget)
+            if model is None:
+                model = clone(self.base_model)
+            refit = model.update(Xi, yi, n_fixed=self._n_finalized_observations(budget))
+            self._log("{} model with data".format("refitted" if refit else "updated"))
+        else:
+            if self.surrogate == "sparse" and budget in self.models:
+                # refit existing model, warm started from its kernel hyperparameters
+                model = self.models[budget]
+            else:
+                # create model without any data
+                model = clone(self.base_model)
+
+            # fit model with data
+            model.fit(Xi, yi)
 
-        self._log("fitted model with data")
+            self._log("fitted model with data")
 
         # update model of budget
         self.models[budget] = model
+        self.model_versions[budget] = self.model_versions.get(budget, 0) + 1
+
+    def _n_finalized_observations(self, budget=0):
+        """returns number of rows of `get_XY()` that are observations of finalized trials"""
+        observations = self.get_observations()
+        if self.interim_results:
+            return len(
+                observations.interim(
+                    self.interim_results_interval, self.get_max_budget(), budget=budget
+                )[1]
+            )
+        return len(observations.y(budget))
+
+    def impute_metrics(self, trials, budget=0):
+        """calculates the imputed metrics of all given currently evaluating trials at once.
+
+        See `impute_metric()`. For the kriging believer strategy, the metrics of all trials are predicted with one
+        call to the model. The imputed metric (in the original direction) is appended to the `imputed_metrics` of the
+        info dict of the trial.
+
+        :param trials: currently evaluating trials that were sampled from the model with `budget`
+        :type trials: list[Trial]
+        :param budget: budget of the model that sampled the hparam configs
+        :type budget: int
+        :return: imputed metrics, negated if the optimization direction is `max` (like the metrics of `get_XY()`),
+                 shape (n_trials,)
+        :rtype: np.ndarray
+        """
+        imputed_metrics = np.empty(len(trials), dtype=float)
+        if not trials:
+            return imputed_metrics
+
+        if self.impute_strategy == "kb":
+            X = self.searchspace.transform_batch(
+                np.array(
+                    [self.searchspace.dict_to_list(trial.params) for trial in trials],
+                    dtype=object,
+                ),
+                normalize_categorical=True,
+            )
+            if self.interim_results:
+                # augument with full budget
+                X = np.append(X, np.ones((X.shape[0], 1)), 1)
+            imputed_metrics[:] = self.models[budget].predict(X)
+        else:
+            # constant liar, same lie for all trials
+            imputed_metrics[:] = self.impute_metric(trials[0].params, budget)
+            imputed_metrics *= self.observations.metric_multiplier
+
+        # add info about imputed metric to trial info dict, in the original direction
+        for trial, imputed_metric in zip(trials, imputed_metrics):
+            trial.info_dict.setdefault("imputed_metrics", []).append(
+                float(imputed_metric * self.observations.metric_multiplier)
+            )
+
+        return imputed_metrics
 
     def impute_metric(self, hparams, budget=0):
         """calculates the value of the imputed metric for hparams of a currently evaluating trial.
@@ -371,3 +840,23 @@ class GP(BaseAsyncBO):
             imputed_metric = -imputed_metric
 
         return imputed_metric
+
+
+class _AcquisitionTimeout(Exception):
+    """raised to stop the acquisition optimizer when its wall clock limit is reached"""
+
+
+class _AcquisitionTracker(object):
+    """keeps track of the best point evaluated by the acquisition optimizer and enforces its wall clock limit"""
+
+    def __init__(self, x, value, max_seconds=None):
+        self.best_x = x
+        self.best_value = value
+        self.deadline = None if max_seconds is None else time.time() + max_seconds
+
+    def update(self, points, values):
+        i = np.argmin(values)
+        if values[i] < self.best_value:
+            self.best_x, self.best_value = points[i].copy(), values[i]
+        if self.deadline is not None and time.time() > self.deadline:
+            raise _AcquisitionTimeout()
@@ -0,0 +1,244 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import numpy as np
+from sklearn.base import clone
+
+from maggy.optimizer.bayes.base import BaseAsyncBO
+from maggy.optimizer.bayes.acquisitions import (
+    GaussianProcess_EI,
+    GaussianProcess_LCB,
+    GaussianProcess_PI,
+)
+from maggy.optimizer.bayes.surrogates import FastExtraTreesRegressor
+
+"""
+The implementation follows SMAC (Hutter et al. 2011), with extremely randomized trees instead of a random forest
+
+SMAC: https://www.cs.ubc.ca/~hutter/papers/10-TR-SMAC.pdf
+"""
+
+
+class RF(BaseAsyncBO):
+    """Random forest based Asynchronous Bayesian Optimization
+
+    The surrogate is an ensemble of extremely randomized trees. The predictive mean is the mean of the trees and the
+    predictive variance is the spread of the trees (plus the variance of the observations within their leaves). Fitting
+    is O(n log n) in the number of observations, so the optimizer scales to high trial counts and interim results.
+
+    Trees split on the encodings of INTEGER, CATEGORICAL and DISCRETE hparams directly, hence all hparam types are
+    supported and searchspaces do not need continuous hparams.
+
+    The acquisition function has no gradients, it is optimized with random sampling followed by a local search from the
+    best samples. Diversity of the sampled configs in the asynchronous setting comes from the randomization of the trees
+    and the local search, busy locations are not imputed.
+    """
+
+    def __init__(
+        self,
+        n_estimators=100,
+        min_samples_leaf=1,
+        acq_fun=None,
+        acq_fun_kwargs=None,
+        acq_optimizer_kwargs=None,
+        **kwargs
+    ):
+        """
+        See docstring of `BaseAsyncBO` for more info on parameters of base class
+
+        :param n_estimators: number of trees
+        :type n_estimators: int
+        :param min_samples_leaf: minimum number of observations in a leaf
+        :type min_samples_leaf: int
+        :param acq_fun: Function to minimize over the predictive distribution of the trees. If None, `"EI"` is used
+                        - `"EI"` for negative expected improvement.
+                        - `"LCB"` for lower confidence bound.
+                        - `"PI"` for negative probability of improvement.
+        :type acq_fun: str|None
+        :param acq_fun_kwargs: Additional arguments to be passed to the acquisition function.
+        :type acq_fun_kwargs: dict|None
+        :param acq_optimizer_kwargs: Additional arguments to be passed to the acquisition optimizer.
+
+                                     - `"n_points"`: number of randomly sampled points, default 1000
+                                     - `"n_local_search"`: number of best sampled points to start the local search
+                                       from, default 10
+                                     - `"n_neighbors"`: number of neighbors evaluated per local search step, default 20
+                                     - `"n_local_steps"`: maximum number of local search steps, default 10
+        :type acq_optimizer_kwargs: dict|None
+        """
+        super().__init__(**kwargs)
+
+        allowed_acq_funs = {
+            "EI": GaussianProcess_EI,
+            "LCB": GaussianProcess_LCB,
+            "PI": GaussianProcess_PI,
+        }
+        if acq_fun is None:
+            acq_fun = "EI"
+        if acq_fun not in allowed_acq_funs:
+            raise ValueError(
+                "Expected acq_fun to be in {} with RF as surrogate, got {}".format(
+                    list(allowed_acq_funs.keys()), acq_fun
+                )
+            )
+        self.acq_fun = allowed_acq_funs[acq_fun]()
+        self.acq_func_kwargs = acq_fun_kwargs
+
+        if acq_optimizer_kwargs is None:
+            acq_optimizer_kwargs = dict()
+        self.n_points = acq_optimizer_kwargs.get("n_points", 1000)
+        self.n_local_search = acq_optimizer_kwargs.get("n_local_search", 10)
+        self.n_neighbors = acq_optimizer_kwargs.get("n_neighbors", 20)
+        self.n_local_steps = acq_optimizer_kwargs.get("n_local_steps", 10)
+        self.acq_optimizer_kwargs = acq_optimizer_kwargs
+
+        self.n_estimators = n_estimators
+        self.min_samples_leaf = min_samples_leaf
+
+        # estimator that has not been fit on any data.
+        self.base_model = None
+
+    def validate_searchspace(self):
+        # trees support all hparam types
+        pass
+
+    def init_model(self):
+        """initializes the surrogate model of the random forest
+
+        the model gets created with the right parameters, but is not fit with any data yet. the `base_model` will be
+        cloned in `update_model` and fit with observation data
+        """
+        self.base_model = FastExtraTreesRegressor(
+            n_estimators=self.n_estimators,
+            min_samples_leaf=self.min_samples_leaf,
+            random_state=self.seed,
+        )
+
+    def update_model(self, budget=0):
+        """update surrogate model with new observations
+
+        Use observations of finished trials to build model.
+        Only build model when there are at least as many observations as hyperparameters
+        """
+        self._log("start updateing model with budget {}".format(budget))
+
+        # check if enough observations available for model building
+        if len(self.searchspace.keys()) > len(self.get_metrics_array(budget=budget)):
+            self._log(
+                "not enough observations available to build with budget {} yet. At least {} needed, got {}".format(
+                    budget,
+                    len(self.searchspace.keys()),
+                    len(self.get_metrics_array(budget=budget)),
+                )
+            )
+            return
+
+        Xi, yi = self.get_XY(
+            budget=budget,
+            interim_results=self.interim_results,
+            interim_results_interval=self.interim_results_interval,
+        )
+
+        model = clone(self.base_model)
+        if self.seed is not None:
+            # different trees for every fit, but reproducible
+            model.set_params(random_state=self.seed + len(yi))
+        model.fit(Xi, yi)
+        self._log("fitted model with data")
+
+        self.models[budget] = model
+
+    def sampling_routine(self, budget=0):
+        n_dims = len(self.searchspace.keys())
+        y_opt = self.ybest(budget)
+
+        # random sampling in the unit hypercube, see `Searchspace.unit_cube_to_transformed()`
+        points = self.rng.random((self.n_points, n_dims))
+        values = self._acquisition(points, budget, y_opt)
+
+        # local search from the best samples
+        starts = np.argsort(values)[: self.n_local_search]
+        points, values = points[starts], values[starts]
+        is_double = np.array(
+            [
+                hparam["type"] == self.searchspace.DOUBLE
+                for hparam in self.searchspace.items()
+            ]
+        )
+        for _ in range(self.n_local_steps):
+            neighbors = self._neighbors(points, is_double)
+            neighbor_values = self._acquisition(
+                neighbors.reshape(-1, n_dims), budget, y_opt
+            ).reshape(len(points), self.n_neighbors)
+
+            best = np.argmin(neighbor_values, axis=1)
+            best_values = neighbor_values[np.arange(len(points)), best]
+            improved = best_values < values
+            if not np.any(improved):
+                break
+            points[improved] = neighbors[improved, best[improved]]
+            values[improved] = best_values[improved]
+
+        next_x = self.searchspace.unit_cube_to_transformed(
+            points[np.argmin(values)], normalize_categorical=True
+        )
+        # transform back to original representation
+        next_x = self.searchspace.inverse_transform_batch(
+            next_x, normalize_categorical=True
+        )[0]
+
+        # convert list to dict representation
+        hparam_dict = self.searchspace.list_to_dict(next_x)
+
+        return hparam_dict
+
+    def _acquisition(self, points, budget, y_opt):
+        """evaluates the acquisition function at points of the unit hypercube"""
+        X = self.searchspace.unit_cube_to_transformed(
+            points, normalize_categorical=True
+        )
+        if self.interim_results:
+            # Always sample with max budget: xt ← argmax acq([x, N])
+            # normalized max budget is 1 → add 1 to hparam configs
+            X = np.append(X, np.ones(X.shape[0]).reshape(-1, 1), 1)
+
+        return self.acq_fun.evaluate(
+            X=X,
+            surrogate_model=self.models[budget],
+            y_opt=y_opt,
+            acq_func_kwargs=self.acq_func_kwargs,
+        )
+
+    def _neighbors(self, points, is_double):
+        """returns `n_neighbors` neighbors per point of the unit hypercube, shape (n_points, n_neighbors, n_dims)
+
+        every neighbor differs from its point in one hparam. DOUBLE hparams are moved by a normal step, all other
+        hparams are resampled uniformly.
+        """
+        n_points, n_dims = points.shape
+        neighbors = np.repeat(points[:, None, :], self.n_neighbors, axis=1)
+        rows, cols = np.indices((n_points, self.n_neighbors))
+        dims = self.rng.integers(0, n_dims, size=(n_points, self.n_neighbors))
+
+        values = neighbors[rows, cols, dims]
+        values = np.where(
+            is_double[dims],
+            values + self.rng.normal(0.0, 0.1, size=values.shape),
+            self.rng.random(values.shape),
+        )
+        # the unit hypercube is half open, see `Searchspace.unit_cube_to_transformed()`
+        neighbors[rows, cols, dims] = np.clip(values, 0.0, np.nextafter(1.0, 0.0))
+        return neighbors
@@ -0,0 +1,622 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import time
+
+import numpy as np
+from scipy.linalg import cho_solve, cholesky, solve_triangular
+from scipy.special import logsumexp
+from scipy.stats import norm
+from sklearn.gaussian_process.kernels import Sum
+from sklearn.utils import check_random_state
+from skopt.learning import ExtraTreesRegressor
+from skopt.learning.gaussian_process import GaussianProcessRegressor
+from skopt.learning.gaussian_process.kernels import WhiteKernel
+
+
+class IncrementalGaussianProcessRegressor(GaussianProcessRegressor):
+    """Gaussian process regressor that adds new observations with low rank updates of its Cholesky factor.
+
+    The training data is split in two parts:
+
+    - fixed observations, i.e. observations of finalized trials. The training data of consecutive calls to `update()`
+      has to start with the fixed observations of the previous call (plus newly fixed observations)
+    - temporary observations, i.e. imputed metrics of busy trials, that are replaced in every call
+
+    New observations are added to the Cholesky factor `L_` and the inverse kernel matrix `K_inv_` with block updates
+    while the kernel hyperparameters are kept fixed, which is O(n^2) per new observation instead of O(n^3) for a full
+    fit. The kernel hyperparameters are refit by maximizing the log marginal likelihood every `refit_every` fixed
+    observations or if the last refit is older than `refit_seconds`. Refits are warm started from the previous kernel
+    hyperparameters.
+    """
+
+    def __init__(
+        self,
+        kernel=None,
+        alpha=1e-10,
+        optimizer="fmin_l_bfgs_b",
+        n_restarts_optimizer=0,
+        normalize_y=False,
+        copy_X_train=True,
+        random_state=None,
+        noise=None,
+        refit_every=10,
+        refit_seconds=None,
+    ):
+        """
+        See `skopt.learning.GaussianProcessRegressor` for the other parameters
+
+        :param refit_every: number of new fixed observations after which the kernel hyperparameters are refit
+        :type refit_every: int
+        :param refit_seconds: If set, the kernel hyperparameters are also refit if the last refit is older than
+                              `refit_seconds`
+        :type refit_seconds: float
+        """
+        super().__init__(
+            kernel=kernel,
+            alpha=alpha,
+            optimizer=optimizer,
+            n_restarts_optimizer=n_restarts_optimizer,
+            normalize_y=normalize_y,
+            copy_X_train=copy_X_train,
+            random_state=random_state,
+            noise=noise,
+        )
+        self.refit_every = refit_every
+        self.refit_seconds = refit_seconds
+
+    def fit(self, X, y, n_fixed=None):
+        """Fits the model, including the kernel hyperparameters.
+
+        After the first fit, the optimization of the kernel hyperparameters starts from the previous ones.
+
+        :param X: training data, shape (n_samples, n_features)
+        :type X: np.ndarray
+        :param y: target values, shape (n_samples,)
+        :type y: np.ndarray
+        :param n_fixed: number of fixed observations at the beginning of the training data, all if None
+        :type n_fixed: int
+        :return: self
+        """
+        _warm_started_fit(self, super().fit, X, y)
+
+        n_fixed = len(y) if n_fixed is None else n_fixed
+        self._X_fixed = self.X_train_[:n_fixed]
+        self._y_fixed = np.asarray(y, dtype=float)[:n_fixed]
+        # the cholesky factor of the fixed observations is the leading block of the factor of all observations
+        self._L_fixed = self.L_[:n_fixed, :n_fixed]
+        L_inv = solve_triangular(self._L_fixed.T, np.eye(n_fixed))
+        self._K_inv_fixed = L_inv.dot(L_inv.T)
+
+        self._n_new = 0
+        self._last_refit = time.time()
+        self.n_refits_ = getattr(self, "n_refits_", 0) + 1
+        return self
+
+    def update(self, X, y, n_fixed):
+        """Updates the model with new training data.
+
+        :param X: training data, the first `n_fixed` rows are the fixed observations, shape (n_samples, n_features)
+        :type X: np.ndarray
+        :param y: target values, shape (n_samples,)
+        :type y: np.ndarray
+        :param n_fixed: number of fixed observations at the beginning of the training data
+        :type n_fixed: int
+        :return: True if the kernel hyperparameters were refit, False if the model was updated incrementally
+        :rtype: bool
+        """
+        X = np.asarray(X, dtype=float)
+        y = np.asarray(y, dtype=float)
+
+        if not hasattr(self, "_X_fixed") or n_fixed < len(self._y_fixed):
+            self.fit(X, y, n_fixed=n_fixed)
+            return True
+
+        n_old = len(self._y_fixed)
+        n_new = self._n_new + n_fixed - n_old
+        refit_due = n_new >= self.refit_every or (
+            self.refit_seconds is not None
+            and time.time() - self._last_refit > self.refit_seconds
+        )
+        if refit_due:
+            self.fit(X, y, n_fixed=n_fixed)
+            return True
+
+        try:
+            # add new fixed observations to the fixed factorization
+            if n_fixed > n_old:
+                self._L_fixed, self._K_inv_fixed = self._extend(
+                    self._X_fixed, self._L_fixed, self._K_inv_fixed, X[n_old:n_fixed]
+                )
+                self._X_fixed = X[:n_fixed].copy()
+                self._y_fixed = y[:n_fixed].copy()
+                self._n_new = n_new
+
+            # add temporary observations on top of the fixed factorization
+            if len(y) > n_fixed:
+                L, K_inv = self._extend(
+                    self._X_fixed, self._L_fixed, self._K_inv_fixed, X[n_fixed:]
+                )
+            else:
+                L, K_inv = self._L_fixed, self._K_inv_fixed
+        except np.linalg.LinAlgError:
+            # new observations are numerically not positive definite with the current kernel
+            self.fit(X, y, n_fixed=n_fixed)
+            return True
+
+        self.X_train_ = X.copy()
+        self.L_ = L
+        self.K_inv_ = K_inv
+        self._set_targets(y)
+        return False
+
+    def _extend(self, X_old, L, K_inv, X_new):
+        """returns cholesky factor and inverse of the kernel matrix of `X_old` extended by `X_new`
+
+        With K = [[A, B], [B^T, D]] and A = L L^T, the factor is [[L, 0], [V^T, C]] with V = L^-1 B and C the cholesky
+        factor of the schur complement S = D - V^T V. The inverse is updated blockwise with S^-1.
+        """
+        B = self.kernel_(X_old, X_new)
+        D = self._training_kernel(X_new)
+        V = solve_triangular(L, B, lower=True)
+        C = cholesky(D - V.T.dot(V), lower=True)
+
+        n_old, n_new = L.shape[0], C.shape[0]
+        L_ext = np.zeros((n_old + n_new, n_old + n_new))
+        L_ext[:n_old, :n_old] = L
+        L_ext[n_old:, :n_old] = V.T
+        L_ext[n_old:, n_old:] = C
+
+        S_inv = cho_solve((C, True), np.eye(n_new))
+        W = K_inv.dot(B)
+        W_S_inv = W.dot(S_inv)
+        K_inv_ext = np.empty((n_old + n_new, n_old + n_new))
+        K_inv_ext[:n_old, :n_old] = K_inv + W_S_inv.dot(W.T)
+        K_inv_ext[:n_old, n_old:] = -W_S_inv
+        K_inv_ext[n_old:, :n_old] = -W_S_inv.T
+        K_inv_ext[n_old:, n_old:] = S_inv
+        return L_ext, K_inv_ext
+
+    def _training_kernel(self, X):
+        """kernel matrix of training data, i.e. including the noise that is removed from `kernel_` after fitting"""
+        K = self.kernel_(X)
+        K[np.diag_indices_from(K)] += (self.noise_ or 0.0) + self.alpha
+        return K
+
+    def _set_targets(self, y):
+        """normalizes targets like `fit()` and solves for the dual coefficients with the current factorization"""
+        if self.normalize_y:
+            self._y_train_mean = np.mean(y, axis=0)
+            std = np.std(y, axis=0)
+            self._y_train_std = std if std > 0 else 1.0
+        else:
+            self._y_train_mean = 0.0
+            self._y_train_std = 1.0
+        self.y_train_mean_ = self._y_train_mean
+        self.y_train_std_ = self._y_train_std
+        self.y_train_ = (y - self._y_train_mean) / self._y_train_std
+        self.alpha_ = cho_solve((self.L_, True), self.y_train_)
+
+
+class SparseGaussianProcessRegressor(GaussianProcessRegressor):
+    """Gaussian process regressor that approximates the posterior with a subset of the training data as inducing
+    points (deterministic training conditional, DTC).
+
+    The kernel hyperparameters are fit by maximizing the log marginal likelihood of an exact gaussian process on
+    `n_inducing` randomly chosen training points. The posterior is then conditioned on all training data through the
+    inducing points, which is O(n m^2) in time and O(m^2) in memory for n training points and m inducing points
+    instead of O(n^3) and O(n^2). Refits are warm started from the previous kernel hyperparameters.
+
+    The approximate posterior has the same form as the posterior of an exact gaussian process with the inducing points
+    as training data, i.e. `X_train_`, `alpha_` and `K_inv_` are set accordingly and `predict()` (including the
+    gradients) works unchanged. With at most `n_inducing` training points the model is an exact gaussian process.
+    """
+
+    # number of training points of which the kernel with the inducing points is computed at once
+    _CHUNK_SIZE = 4096
+
+    def __init__(
+        self,
+        kernel=None,
+        alpha=1e-10,
+        optimizer="fmin_l_bfgs_b",
+        n_restarts_optimizer=0,
+        normalize_y=False,
+        copy_X_train=True,
+        random_state=None,
+        noise=None,
+        n_inducing=500,
+    ):
+        """
+        See `skopt.learning.GaussianProcessRegressor` for the other parameters
+
+        :param n_inducing: number of inducing points
+        :type n_inducing: int
+        """
+        super().__init__(
+            kernel=kernel,
+            alpha=alpha,
+            optimizer=optimizer,
+            n_restarts_optimizer=n_restarts_optimizer,
+            normalize_y=normalize_y,
+            copy_X_train=copy_X_train,
+            random_state=random_state,
+            noise=noise,
+        )
+        self.n_inducing = n_inducing
+
+    def fit(self, X, y):
+        """Fits the model, including the kernel hyperparameters.
+
+        :param X: training data, shape (n_samples, n_features)
+        :type X: np.ndarray
+        :param y: target values, shape (n_samples,)
+        :type y: np.ndarray
+        :return: self
+        """
+        X = np.asarray(X, dtype=float)
+        y = np.asarray(y, dtype=float)
+
+        self.sparse_ = len(y) > self.n_inducing
+        if not self.sparse_:
+            _warm_started_fit(self, super().fit, X, y)
+            return self
+
+        rng = check_random_state(self.random_state)
+        inducing = np.sort(rng.choice(len(y), self.n_inducing, replace=False))
+        _warm_started_fit(self, super().fit, X[inducing], y[inducing])
+        self._set_posterior(X, y)
+        return self
+
+    def _set_posterior(self, X, y):
+        """conditions the posterior on all training data through the inducing points `X_train_`
+
+        With K_mm = L L^T and A = L^-1 K_mn / sqrt(noise), B = I + A A^T is well conditioned. The posterior mean is
+        k_xm L^-T B^-1 A y / sqrt(noise) and the variance is k_xx - k_xm L^-T (I - B^-1) L^-1 k_mx.
+        """
+        Z = self.X_train_
+        if self.normalize_y:
+            self._y_train_mean = np.mean(y, axis=0)
+            std = np.std(y, axis=0)
+            self._y_train_std = std if std > 0 else 1.0
+            self.y_train_mean_ = self._y_train_mean
+            self.y_train_std_ = self._y_train_std
+        y_train_mean, y_train_std = _target_scale(self)
+        y = (y - y_train_mean) / y_train_std
+        noise_std = np.sqrt((self.noise_ or 0.0) + self.alpha)
+
+        K_mm = self.kernel_(Z)
+        # jitter, the inducing points may be close to each other or even contain duplicates
+        K_mm[np.diag_indices_from(K_mm)] += 1e-6 * np.mean(np.diag(K_mm))
+        L = cholesky(K_mm, lower=True)
+
+        # accumulate A A^T and A y chunk by chunk to keep the memory independent of the number of training points
+        B = np.eye(len(Z))
+        b = np.zeros(len(Z))
+        for start in range(0, len(y), self._CHUNK_SIZE):
+            K_mn = self.kernel_(Z, X[start : start + self._CHUNK_SIZE])
+            A = solve_triangular(L, K_mn, lower=True) / noise_std
+            B += A.dot(A.T)
+            b += A.dot(y[start : start + self._CHUNK_SIZE])
+
+        B_inv = cho_solve((cholesky(B, lower=True), True), np.eye(len(Z)))
+        self.alpha_ = solve_triangular(L.T, B_inv.dot(b), lower=False) / noise_std
+        L_inv = solve_triangular(L, np.eye(len(Z)), lower=True)
+        self.K_inv_ = L_inv.T.dot(np.eye(len(Z)) - B_inv).dot(L_inv)
+        self.y_train_ = y
+
+    def predict(
+        self,
+        X,
+        return_std=False,
+        return_cov=False,
+        return_mean_grad=False,
+        return_std_grad=False,
+    ):
+        """See `skopt.learning.GaussianProcessRegressor.predict()`"""
+        if return_cov and getattr(self, "sparse_", False):
+            # the covariance of the exact gaussian process is computed from the cholesky factor `L_`
+            y_train_mean, y_train_std = _target_scale(self)
+            K_trans = self.kernel_(X, self.X_train_)
+            y_mean = K_trans.dot(self.alpha_) * y_train_std + y_train_mean
+            y_cov = self.kernel_(X) - K_trans.dot(self.K_inv_).dot(K_trans.T)
+            return y_mean, y_cov * y_train_std ** 2
+        return super().predict(
+            X,
+            return_std=return_std,
+            return_cov=return_cov,
+            return_mean_grad=return_mean_grad,
+            return_std_grad=return_std_grad,
+        )
+
+
+class FastExtraTreesRegressor(ExtraTreesRegressor):
+    """Extremely randomized trees that predict the mean and the standard deviation of all trees in one pass.
+
+    `skopt.learning.ExtraTreesRegressor.predict()` predicts every tree twice through the validating sklearn API, which
+    dominates the time of optimizing an acquisition function with many small batches. This looks up the leaves of every
+    tree once with the low level tree API. The standard deviation is computed like in skopt, i.e. with the law of total
+    variance over the trees and the variance of the observations in the leaves.
+    """
+
+    def predict(self, X, return_std=False):
+        """See `skopt.learning.ExtraTreesRegressor.predict()`"""
+        # trees work on float32, like in `BaseDecisionTree._validate_X_predict()`
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        mean = np.zeros(X.shape[0])
+        second_moment = np.zeros(X.shape[0])
+        for tree in self.estimators_:
+            leaves = tree.tree_.apply(X)
+            mean_tree = tree.tree_.value[leaves, 0, 0]
+            mean += mean_tree
+            if return_std:
+                var_tree = np.maximum(tree.tree_.impurity[leaves], self.min_variance)
+                second_moment += var_tree + mean_tree ** 2
+        mean /= len(self.estimators_)
+        if not return_std:
+            return mean
+
+        var = second_moment / len(self.estimators_) - mean ** 2
+        return mean, np.sqrt(np.clip(var, 0.0, None))
+
+
+class ParzenEstimator(object):
+    """Product kernel density estimator of hparam configs in transformed representation, the surrogate of TPE.
+
+    Continuous hparams (var type `"c"`) use gaussian kernels that are truncated to the [0,1] range of the transformed
+    hparams, unordered hparams (var type `"u"`) use Aitchison-Aitken kernels over the categories of the hparam. The
+    bandwidths follow statsmodels' `KDEMultivariate`, but are computed from running moments of the observations, so
+    moving a few observations in or out with `update()` does not recompute them from scratch. The densities of all
+    configs are evaluated at once with numpy.
+    """
+
+    _BW_FACTORS = {
+        "normal_reference": lambda k: 1.06,
+        "scott": lambda k: 1.0,
+        "silverman": lambda k: (4.0 / (k + 2)) ** (1.0 / (k + 4)),
+    }
+
+    def __init__(
+        self, var_type, n_levels, bw_estimation="normal_reference", min_bw=1e-3
+    ):
+        """
+        :param var_type: var type per hparam, `"c"` for continuous and `"u"` for unordered, e.g. "ccu"
+        :type var_type: str
+        :param n_levels: number of categories per hparam, ignored for continuous hparams
+        :type n_levels: list[int]
+        :param bw_estimation: rule of thumb of the bandwidths, one of "normal_reference", "scott" and "silverman"
+        :type bw_estimation: str
+        :param min_bw: lower bound of the bandwidths, e.g. for hparams that are equal for all observations
+        :type min_bw: float
+        """
+        if bw_estimation not in self._BW_FACTORS:
+            raise ValueError(
+                "expected bw_estimation to be in {}, got {}".format(
+                    list(self._BW_FACTORS.keys()), bw_estimation
+                )
+            )
+        self.var_type = var_type
+        self.k_vars = len(var_type)
+        self.is_continuous = np.array([t == "c" for t in var_type])
+        self.n_levels = np.array(n_levels, dtype=float)
+        self.bw_estimation = bw_estimation
+        self.min_bw = min_bw
+
+        self.data = np.empty((0, self.k_vars))
+        self.ids = np.empty(0, dtype=int)
+        self.bw = None
+        self._sum = np.zeros(self.k_vars)
+        self._sum_sq = np.zeros(self.k_vars)
+
+    @property
+    def nobs(self):
+        return len(self.data)
+
+    def fit(self, data, ids=None):
+        """fits the estimator to the observations `data` from scratch
+
+        :param data: observations, shape (n_obs, k_vars)
+        :type data: np.ndarray
+        :param ids: unique ids of the observations, e.g. their index in the observation store, for `update()`
+        :type ids: np.ndarray
+        :return: fitted estimator
+        :rtype: ParzenEstimator
+        """
+        self.data = np.asarray(data, dtype=float).reshape(-1, self.k_vars)
+        self.ids = np.arange(len(self.data)) if ids is None else np.asarray(ids)
+        self._sum = self.data.sum(axis=0)
+        self._sum_sq = (self.data ** 2).sum(axis=0)
+        self._set_bandwidths()
+        return self
+
+    def update(self, data, ids):
+        """refits the estimator to the observations `data`, updating the moments only with the observations that were
+        added or removed since the last fit, e.g. when observations move between the good and bad set of TPE
+
+        :param data: observations, shape (n_obs, k_vars)
+        :type data: np.ndarray
+        :param ids: unique ids of the observations
+        :type ids: np.ndarray
+        :return: fitted estimator
+        :rtype: ParzenEstimator
+        """
+        data = np.asarray(data, dtype=float).reshape(-1, self.k_vars)
+        ids = np.asarray(ids)
+        removed = ~np.isin(self.ids, ids)
+        added = ~np.isin(ids, self.ids)
+        if not removed.any() and not added.any():
+            # same observations, keep the cached bandwidths
+            self.data, self.ids = data, ids
+            return self
+
+        self._sum += data[added].sum(axis=0) - self.data[removed].sum(axis=0)
+        self._sum_sq += (data[added] ** 2).sum(axis=0) - (self.data[removed] ** 2).sum(
+            axis=0
+        )
+        self.data, self.ids = data, ids
+        self._set_bandwidths()
+        return self
+
+    def _set_bandwidths(self):
+        """rule of thumb bandwidths from the running moments, like statsmodels' `KDEMultivariate`"""
+        n = max(self.nobs, 1)
+        mean = self._sum / n
+        std = np.sqrt(np.clip(self._sum_sq / n - mean ** 2, 0.0, None))
+        factor = self._BW_FACTORS[self.bw_estimation](self.k_vars)
+        bw = factor * std * n ** (-1.0 / (4 + self.k_vars))
+        # at most uniform weights over the categories of unordered hparams
+        max_bw = np.where(
+            self.is_continuous,
+            np.inf,
+            (self.n_levels - 1) / np.maximum(self.n_levels, 1),
+        )
+        self.bw = np.clip(bw, self.min_bw, np.maximum(max_bw, self.min_bw))
+
+    def log_pdf(self, X):
+        """returns the log density at all configs of `X`
+
+        :param X: configs in transformed representation, shape (n_configs, k_vars)
+        :type X: np.ndarray
+        :return: log densities, shape (n_configs,)
+        :rtype: np.ndarray
+        """
+        X = np.asarray(X, dtype=float).reshape(-1, self.k_vars)
+        log_kernels = np.zeros((X.shape[0], self.nobs))
+        for col in range(self.k_vars):
+            data, bw = self.data[:, col], self.bw[col]
+            if self.is_continuous[col]:
+                # gaussian kernel truncated to [0,1]
+                log_mass = np.log(
+                    np.maximum(norm.cdf((1 - data) / bw) - norm.cdf(-data / bw), 1e-300)
+                )
+                log_kernels += (
+                    norm.logpdf(X[:, col, None], loc=data, scale=bw) - log_mass
+                )
+            else:
+                # Aitchison-Aitken kernel
+                n_levels = self.n_levels[col]
+                log_other = np.log(bw / (n_levels - 1)) if n_levels > 1 else -np.inf
+                log_kernels += np.where(
+                    X[:, col, None] == data, np.log(1 - bw), log_other
+                )
+        return logsumexp(log_kernels, axis=1) - np.log(self.nobs)
+
+    def pdf(self, X):
+        """returns the density at all configs of `X`, see `log_pdf()`"""
+        return np.exp(self.log_pdf(X))
+
+
+def _warm_started_fit(model, fit, X, y):
+    """calls `fit(X, y)` of a gaussian process `model`, after the first fit warm started with a single optimizer run
+    from the previous kernel hyperparameters
+
+    The warm start kernel is kept in `_warm_start_kernel` without the white noise term, since the `fit()` of skopt adds
+    one for `noise="gaussian"` (versions before 0.8 even if the kernel already has one). The constructor parameters
+    `kernel` and `n_restarts_optimizer` are restored after the fit, `fit()` of skopt versions before 0.8 also assigns
+    the kernel with the white noise term to `kernel`.
+    """
+    kernel, n_restarts_optimizer = model.kernel, model.n_restarts_optimizer
+    if getattr(model, "_warm_start_kernel", None) is not None:
+        model.kernel = model._warm_start_kernel
+        model.n_restarts_optimizer = 0
+    try:
+        fit(X, y)
+    finally:
+        model.kernel, model.n_restarts_optimizer = kernel, n_restarts_optimizer
+    model._warm_start_kernel = _without_white_kernel(
+        model.kernel_.clone_with_theta(model.kernel_.theta)
+    )
+
+
+def _without_white_kernel(kernel):
+    """returns `kernel` without the white noise terms of its sums"""
+    if isinstance(kernel, Sum):
+        if isinstance(kernel.k2, WhiteKernel):
+            return _without_white_kernel(kernel.k1)
+        if isinstance(kernel.k1, WhiteKernel):
+            return _without_white_kernel(kernel.k2)
+        return type(kernel)(
+            _without_white_kernel(kernel.k1), _without_white_kernel(kernel.k2)
+        )
+    return kernel
+
+
+def predict_with_gradients(model, X):
+    """Predicts mean and standard deviation of a fitted gaussian process and their gradients at many points at once.
+
+    `GaussianProcessRegressor.predict()` only returns gradients for a single point, this computes the kernel between
+    all points and the training data once and only loops over the points for the kernel gradients.
+
+    :param model: fitted gaussian process
+    :type model: GaussianProcessRegressor
+    :param X: points to predict, shape (n_points, n_features)
+    :type X: np.ndarray
+    :return: tuple of mean (n_points,), std (n_points,), mean gradients (n_points, n_features) and std gradients
+             (n_points, n_features)
+    :rtype: tuple
+    """
+    X = np.asarray(X, dtype=float)
+    y_train_mean, y_train_std = _target_scale(model)
+    K_trans = model.kernel_(X, model.X_train_)
+    K_trans_K_inv = K_trans.dot(model.K_inv_)
+
+    mean = K_trans.dot(model.alpha_) * y_train_std + y_train_mean
+    var = model.kernel_.diag(X) - np.einsum("ij,ij->i", K_trans_K_inv, K_trans)
+    # negative variances are numerical errors
+    std = np.sqrt(np.clip(var, 0.0, None)) * y_train_std
+
+    # gradient of the kernel between every point and the training data, shape (n_points, n_train, n_features)
+    K_trans_grad = np.stack([model.kernel_.gradient_x(x, model.X_train_) for x in X])
+    mean_grad = np.einsum("ijk,j->ik", K_trans_grad, model.alpha_) * y_train_std
+    std_grad = np.zeros_like(mean_grad)
+    positive = std > 0
+    std_grad[positive] = (
+        -np.einsum("ij,ijk->ik", K_trans_K_inv[positive], K_trans_grad[positive])
+        / std[positive, None]
+        * y_train_std ** 2
+    )
+    return mean, std, mean_grad, std_grad
+
+
+def predict_mean_gradients(model, X):
+    """Predicts the gradients of the mean of a fitted gaussian process at many points at once.
+
+    Unlike `predict_with_gradients()` the kernel gradients are reduced point by point instead of being stacked for all
+    points, so only one (n_train, n_features) kernel gradient is held at a time.
+
+    :param model: fitted gaussian process
+    :type model: GaussianProcessRegressor
+    :param X: points to predict, shape (n_points, n_features)
+    :type X: np.ndarray
+    :return: mean gradients, shape (n_points, n_features)
+    :rtype: np.ndarray
+    """
+    X = np.asarray(X, dtype=float)
+    _, y_train_std = _target_scale(model)
+    mean_grad = np.empty(X.shape)
+    for i, x in enumerate(X):
+        mean_grad[i] = model.alpha_.dot(model.kernel_.gradient_x(x, model.X_train_))
+    return mean_grad * y_train_std
+
+
+def _target_scale(model):
+    """returns mean and standard deviation the targets of a fitted gaussian process were normalized with
+
+    skopt versions before 0.8 only set `y_train_mean_`, the standard deviation is then the one scikit-learn normalized
+    with, if any.
+    """
+    y_train_std = getattr(model, "y_train_std_", getattr(model, "_y_train_std", 1.0))
+    return model.y_train_mean_, y_train_std
@@ -15,10 +15,10 @@
 #
 
 import numpy as np
-import statsmodels.api as sm
 import scipy.stats as sps
 
 from maggy.optimizer.bayes.base import BaseAsyncBO
+from maggy.optimizer.bayes.surrogates import ParzenEstimator
 
 """
 The implementation is heavliy inspired by the BOHB (Falkner et al. 2018) paper and the HpBandSter Framework
@@ -52,7 +52,7 @@ class TPE(BaseAsyncBO):
         :type gamma: float
         :param n_samples: number of samples drawn from model to optimize EI via sampling
         :type n_samples: int
-        :param bw_estimation: method used by statsmodel for the bandwidth estimation of the kde. Options are 'normal_reference', 'silvermann', 'scott'
+        :param bw_estimation: rule of thumb for the bandwidth estimation of the kde. Options are 'normal_reference', 'silverman', 'scott'
         :type bw_estimation: str
         :param bw_factor: widens the bandwidth for contiuous parameters for proposed points to optimize EI. Higher values favor more exploration
         :type bw_factor: float
@@ -73,64 +73,63 @@ class TPE(BaseAsyncBO):
         self.bw_factor = bw_factor
 
     def sampling_routine(self, budget=0):
-        best_improvement = -np.inf
-        best_sample = None
-
         kde_good = self.models[budget]["good"]
         kde_bad = self.models[budget]["bad"]
 
-        # alternative way of implementation:
-        # instead of this loop, sample all configs beforehand and then optimize acquisition function like in GP
-        for sample in range(self.n_samples):
-            # randomly choose one of the `good` samples as mean
-            idx = np.random.randint(0, len(kde_good.data))
-            obs = kde_good.data[idx]
-            sample_vector = []
-
-            # loop through hparams
-            for mean, bw, hparam_spec in zip(
-                obs, kde_good.bw, self.searchspace.items()
-            ):
-
-                if hparam_spec["type"] in [
-                    self.searchspace.DOUBLE,
-                    self.searchspace.INTEGER,
-                ]:
-                    # sample for cont. hparams
-                    # clip by min bw and multiply by factor to favor more exploration
-                    bw = max(bw, self.min_bw) * self.bw_factor
-
-                    # low and high are calculated with bounds of hparamsm, because they are always [0,
-                    # 1] for transformed hparams we do not have to incorporate them explicitly
-                    # `a, b = (myclip_a - my_mean) / my_std, (myclip_b - my_mean) / my_std`
-                    # see: https://docs.scipy.org/doc/scipy/reference/generated/scipy.stats.truncnorm.html
-                    low = -mean / bw
-                    high = (1 - mean) / bw
-
-                    rv = sps.truncnorm.rvs(low, high, loc=mean, scale=bw)
-                    sample_vector.append(rv)
-                else:
-                    # sample for categorical hparams (sampling logic taken from HpBandSter)
-                    if np.random.rand() < (1 - bw):
-                        sample_vector.append(int(mean))
-                    else:
-                        n_choices = len(hparam_spec["values"])
-                        sample_vector.append(np.random.randint(n_choices))
-
-            # calculate EI for current sample
-            ei_val = self._calculate_ei(sample_vector, kde_good, kde_bad)
-
-            if ei_val > best_improvement:
-                best_improvement = ei_val
-                best_sample = sample_vector
+        # sample all configs at once and evaluate EI for the whole batch
+        samples = self._sample_kde(kde_good, self.n_samples)
+        ei_values = self._calculate_ei(samples, kde_good, kde_bad)
+        best_sample = samples[np.argmax(ei_values)]
 
         # get original representation of hparams in dict
         best_sample_dict = self.searchspace.list_to_dict(
-            self.searchspace.inverse_transform(best_sample)
+            self.searchspace.inverse_transform(list(best_sample))
         )
 
         return best_sample_dict
 
+    def _sample_kde(self, kde, n_samples):
+        """draws `n_samples` configs from `kde` with widened bandwidths of the continuous hparams
+
+        Every sample is centered at a randomly chosen observation of `kde`.
+
+        :return: samples in transformed representation, shape (n_samples, n_hparams)
+        :rtype: np.ndarray
+        """
+        # randomly choose one of the `good` samples as mean
+        means = kde.data[self.rng.integers(0, len(kde.data), size=n_samples)]
+        samples = np.empty_like(means, dtype=float)
+
+        for col, (bw, hparam_spec) in enumerate(zip(kde.bw, self.searchspace.items())):
+            mean = means[:, col]
+            if hparam_spec["type"] in [
+                self.searchspace.DOUBLE,
+                self.searchspace.INTEGER,
+            ]:
+                # sample for cont. hparams
+                # clip by min bw and multiply by factor to favor more exploration
+                bw = max(bw, self.min_bw) * self.bw_factor
+
+                # low and high are calculated with bounds of hparamsm, because they are always [0,
+                # 1] for transformed hparams we do not have to incorporate them explicitly
+                # `a, b = (myclip_a - my_mean) / my_std, (myclip_b - my_mean) / my_std`
+                # see: https://docs.scipy.org/doc/scipy/reference/generated/scipy.stats.truncnorm.html
+                low = -mean / bw
+                high = (1 - mean) / bw
+                samples[:, col] = sps.truncnorm.rvs(
+                    low, high, loc=mean, scale=bw, random_state=self.rng
+                )
+            else:
+                # sample for categorical hparams (sampling logic taken from HpBandSter)
+                n_choices = len(hparam_spec["values"])
+                samples[:, col] = np.where(
+                    self.rng.random(n_samples) < (1 - bw),
+                    mean.astype(int),
+                    self.rng.integers(0, n_choices, size=n_samples),
+                )
+
+        return samples
+
     def init_model(self):
         pass
 
@@ -148,48 +147,50 @@ class TPE(BaseAsyncBO):
         :type budget: int
         """
         # split good and bad trials
-        good_hparams, bad_hparams = self._split_trials(budget)
+        good_idx, bad_idx = self._split_indices(budget)
 
         n_hparams = len(self.searchspace.keys())
-        if n_hparams >= len(good_hparams) or n_hparams >= len(bad_hparams):
+        if n_hparams >= len(good_idx) or n_hparams >= len(bad_idx):
             self._log(
                 "Not enough observations to build model with budget {} yet. n_good_hparams: {}, n_bad_hparams: {}, n_hparmas: {}".format(
-                    budget, len(good_hparams), len(bad_hparams), n_hparams
+                    budget, len(good_idx), len(bad_idx), n_hparams
                 )
             )
             return
 
         self._log(
             "Update Model with budget {}. n_good_hparams: {}, n_bad_hparams: {}".format(
-                budget, len(good_hparams), len(bad_hparams)
+                budget, len(good_idx), len(bad_idx)
             )
         )
 
-        transformed_good_hparams = np.apply_along_axis(
-            self.searchspace.transform, 1, good_hparams
-        )
-        transformed_bad_hparams = np.apply_along_axis(
-            self.searchspace.transform, 1, bad_hparams
-        )
+        # the kdes of a budget are updated with the observations that moved between the good and bad set
+        kdes = self.models.get(budget)
+        if kdes is None:
+            kdes = {"good": self._init_kde(), "bad": self._init_kde()}
+        hparam_history = self.get_observations().X(budget)
+        good_kde = kdes["good"].update(hparam_history[good_idx], good_idx)
+        bad_kde = kdes["bad"].update(hparam_history[bad_idx], bad_idx)
 
-        # self._log("good: {}".format(good_hparams))
-        # self._log("normalized good: {}".format(transformed_good_hparams))
-        # self._log("bad: {}".format(bad_hparams))
-        # self._log("normalized bad: {}".format(transformed_bad_hparams))
-
-        var_type = self._get_statsmodel_vartype()
+        self.models[budget] = {"good": good_kde, "bad": bad_kde}
 
-        good_kde = sm.nonparametric.KDEMultivariate(
-            data=transformed_good_hparams, var_type=var_type, bw=self.bw_estimation
+    def _init_kde(self):
+        """returns a parzen estimator without observations for the hparams of the searchspace"""
+        n_levels = [
+            len(hparam_spec["values"])
+            if hparam_spec["type"] == self.searchspace.CATEGORICAL
+            else 0
+            for hparam_spec in self.searchspace.items()
+        ]
+        return ParzenEstimator(
+            var_type=self._get_parzen_vartype(),
+            n_levels=n_levels,
+            bw_estimation=self.bw_estimation,
+            min_bw=self.min_bw,
         )
-        bad_kde = sm.nonparametric.KDEMultivariate(
-            data=transformed_bad_hparams, var_type=var_type, bw=self.bw_estimation
-        )
-
-        self.models[budget] = {"good": good_kde, "bad": bad_kde}
 
-    def _split_trials(self, budget=0):
-        """splits trials in good and bad according to tpe algo, for given budget
+    def _split_indices(self, budget=0):
+        """splits observations in good and bad according to tpe algo, for given budget
 
         We use the logic from the BOHB paper to calculate the best and worst observations.
         This ensures that both models have enough datapoints and have the least overlap when only a limited
@@ -199,13 +200,11 @@ class TPE(BaseAsyncBO):
 
         :param budget: the budget for which observations shoul be split
         :type budget: int
-        :return: tuple with arrays of good trials and bad trials
-        :rtype (np.ndarray(n_trials, n_hparams), np.ndarray(n_trials, n_params))
+        :return: tuple with indices of the good and bad observations in the observations of `budget`
+        :rtype (np.ndarray, np.ndarray)
         """
-
-        metric_history = self.get_metrics_array(budget=budget)
-        metric_idx_ascending = np.argsort(metric_history)
-        hparam_history = self.get_hparams_array(budget=budget)
+        metric_history = self.get_observations().y(budget)
+        metric_idx_ascending = np.argsort(metric_history, kind="stable")
 
         n_good = max(
             len(self.searchspace.keys()) + 1, int(self.gamma * metric_history.shape[0])
@@ -215,13 +214,13 @@ class TPE(BaseAsyncBO):
             int((1 - self.gamma) * metric_history.shape[0]),
         )
 
-        good_trials = hparam_history[metric_idx_ascending[:n_good]]
-        bad_trials = hparam_history[metric_idx_ascending[n_good : n_good + n_bad]]
+        good_idx = metric_idx_ascending[:n_good]
+        bad_idx = metric_idx_ascending[n_good : n_good + n_bad]
 
-        return good_trials, bad_trials
+        return good_idx, bad_idx
 
-    def _get_statsmodel_vartype(self):
-        """Returns *statsmodel* type specifier string consisting of the types for each hparam of the searchspace , so for example 'ccuo'.
+    def _get_parzen_vartype(self):
+        """Returns type specifier string of the parzen estimator consisting of the types for each hparam of the searchspace, so for example 'ccu'.
 
         :rtype: str
         """
@@ -234,11 +233,11 @@ class TPE(BaseAsyncBO):
 
     @staticmethod
     def _get_vartype(maggy_vartype):
-        """Transforms Maggy vartype to statsmodel vartype, e.g. 'DOUBLE' → 'c'
+        """Transforms Maggy vartype to the vartype of the parzen estimator, e.g. 'DOUBLE' → 'c'
 
         :param maggy_vartype: maggy type of hparam, e.g. 'DOUBLE'
         :type maggy_vartype: str
-        :returns: corresponding vartype of statsmodel
+        :returns: corresponding vartype of the parzen estimator
         :rtype: str
         """
         if maggy_vartype == "DOUBLE":
@@ -251,16 +250,16 @@ class TPE(BaseAsyncBO):
             raise NotImplementedError("Only cont vartypes are implemented yer")
 
     @staticmethod
-    def _calculate_ei(x, kde_good, kde_bad):
-        """Returns Expected Improvement for given hparams
+    def _calculate_ei(X, kde_good, kde_bad):
+        """Returns Expected Improvement for a batch of hparam configs
 
-        :param x: list of hyperparameters, shape(n_hparams,)
-        :type x: list
+        :param X: hyperparameters, shape(n_configs, n_hparams)
+        :type X: np.ndarray
         :param kde_good: kde of good observations
-        :type kde_good: sm.KDEMultivariate
-        :param kde_bad: pdf of kde of bad observations
-        :type kde_bad: sm.KDEMultivariate of KDE instance
-        :return: expected improvement
-        :rtype: float
+        :type kde_good: ParzenEstimator
+        :param kde_bad: kde of bad observations
+        :type kde_bad: ParzenEstimator
+        :return: expected improvement, shape(n_configs,)
+        :rtype: np.ndarray
         """
-        return max(1e-32, kde_good.pdf(x)) / max(kde_bad.pdf(x), 1e-32)
+        return np.maximum(1e-32, kde_good.pdf(X)) / np.maximum(kde_bad.pdf(X), 1e-32)
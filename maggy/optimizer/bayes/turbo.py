@@ -0,0 +1,334 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import numpy as np
+from sklearn.base import clone
+
+from maggy.optimizer.bayes.gp import GP
+
+"""
+The implementation follows TuRBO (Eriksson et al. 2019), adapted to asynchronous trials and mixed searchspaces
+
+TuRBO: https://arxiv.org/abs/1910.01739
+"""
+
+
+class TuRBO(GP):
+    """Trust region Bayesian Optimization for high dimensional searchspaces
+
+    Instead of one global gaussian process, the optimizer keeps `n_trust_regions` trust regions, i.e. boxes in the
+    transformed searchspace around the best config found in them. Every trust region has a local gaussian process that
+    is fit on the observations in its box only (at most `max_observations`), hence fitting and evaluating the models
+    does not slow down with the number of trials.
+
+    Configs are proposed from candidates in the trust regions, the trust region with the best acquisition value
+    proposes the next config. A trust region is expanded after `success_tolerance` consecutive proposals that improved
+    its best metric and shrunk after `failure_tolerance` consecutive proposals that did not. If it shrinks below
+    `length_min`, it is restarted at a random config.
+
+    Warmup, pruner, interim results and the async strategies are the ones of `GP`, busy locations are imputed for the
+    local models the same way as for the global model.
+    """
+
+    def __init__(
+        self,
+        n_trust_regions=1,
+        length_init=0.8,
+        length_min=0.5 ** 7,
+        length_max=1.6,
+        success_tolerance=3,
+        failure_tolerance=None,
+        max_observations=200,
+        **kwargs
+    ):
+        """
+        See docstring of `GP` for more info on parameters of the base class. The acquisition function is optimized by
+        sampling `n_points` candidates per trust region, i.e. `acq_optimizer` is always `"sampling"`.
+
+        :param n_trust_regions: number of trust regions
+        :type n_trust_regions: int
+        :param length_init: initial side length of the trust regions in the transformed searchspace, the side length of
+                            every hparam is scaled by the length scale of the local model
+        :type length_init: float
+        :param length_min: trust regions that shrink below this side length are restarted
+        :type length_min: float
+        :param length_max: maximum side length of the trust regions
+        :type length_max: float
+        :param success_tolerance: number of consecutive improvements after which a trust region is expanded
+        :type success_tolerance: int
+        :param failure_tolerance: number of consecutive proposals without improvement after which a trust region is
+                                  shrunk. If None, the number of hparams but at least 4
+        :type failure_tolerance: int|None
+        :param max_observations: maximum number of observations the local models are fit on, the ones closest to the
+                                 center of the trust region are used
+        :type max_observations: int
+        """
+        acq_optimizer = kwargs.pop("acq_optimizer", "sampling")
+        if acq_optimizer != "sampling":
+            raise ValueError(
+                "TuRBO optimizes the acquisition function by sampling in the trust regions, expected acq_optimizer to "
+                "be `sampling`, got {}".format(acq_optimizer)
+            )
+        super().__init__(acq_optimizer=acq_optimizer, **kwargs)
+
+        if n_trust_regions < 1:
+            raise ValueError(
+                "expected n_trust_regions to be at least 1, got {}".format(
+                    n_trust_regions
+                )
+            )
+        if not 0 < length_min <= length_init <= length_max:
+            raise ValueError(
+                "expected 0 < length_min <= length_init <= length_max, got {}, {}, {}".format(
+                    length_min, length_init, length_max
+                )
+            )
+        self.n_trust_regions = n_trust_regions
+        self.length_init = length_init
+        self.length_min = length_min
+        self.length_max = length_max
+        self.success_tolerance = success_tolerance
+        self.failure_tolerance = failure_tolerance
+        self.max_observations = max_observations
+
+        self.trust_regions = []
+        # local models per budget, one (model, best local metric) tuple per trust region
+        self.region_models = {}
+        # index of the trust region that proposed the current config
+        self._active_region = 0
+        # index of the trust region that proposed a config, by config
+        self._proposals = {}
+        # number of trials of `final_store` the trust regions have been updated with
+        self._n_updated = 0
+
+    def sampling_routine(self, budget=0):
+        hparams = super().sampling_routine(budget)
+        self._proposals[self._key(hparams)] = self._active_region
+        return hparams
+
+    def batch_sampling_routine(self, budget=0, q=1):
+        batch = super().batch_sampling_routine(budget, q)
+        for hparams in batch:
+            self._proposals[self._key(hparams)] = self._active_region
+        return batch
+
+    def _acquisition_candidates(self, budget=0, n_best=1):
+        """samples `n_points` candidates per trust region and evaluates them with the local model of their region
+
+        The trust region with the best candidate becomes the active region, its local model the model of `budget`.
+        """
+        best = None
+        for i, (region, (model, y_opt)) in enumerate(
+            zip(self.trust_regions, self.region_models[budget])
+        ):
+            half_width = region.length / 2 * self._weights(model)
+            X, values = self._best_candidates(
+                lambda n: self._region_candidates(region, half_width, n),
+                model,
+                y_opt,
+                n_best,
+            )
+            if best is None or values[0] < best[1][0]:
+                best = (X, values, y_opt, i)
+
+        X, values, y_opt, self._active_region = best
+        self.models[budget] = self.region_models[budget][self._active_region][0]
+        self._log(
+            "trust region {} proposes config, side length {}".format(
+                self._active_region, self.trust_regions[self._active_region].length
+            )
+        )
+        return X, values, y_opt
+
+    def _region_candidates(self, region, half_width, n):
+        """samples `n` candidates in transformed representation within the box of `region`
+
+        Like in TuRBO, every candidate perturbs a random subset of the hparams of the center, on average 20 hparams,
+        which keeps the candidates close to the center in high dimensional searchspaces. DISCRETE and CATEGORICAL
+        hparams are resampled from all their values, since their encodings have no order.
+        """
+        n_hparams = len(region.center)
+        n_steps, n_categories, is_categorical = self._transformed_grid()
+
+        lower = np.clip(region.center - half_width, 0.0, 1.0)
+        upper = np.clip(region.center + half_width, 0.0, 1.0)
+        points = lower + (upper - lower) * self.rng.random((n, n_hparams))
+
+        perturb = self.rng.random((n, n_hparams)) < min(20 / n_hparams, 1.0)
+        # perturb at least one hparam
+        perturb[np.arange(n), self.rng.integers(0, n_hparams, size=n)] = True
+        X = np.where(perturb, points, region.center)
+        X = np.where(
+            perturb & is_categorical,
+            np.floor(self.rng.random((n, n_hparams)) * n_categories)
+            / np.maximum(n_steps, 1),
+            X,
+        )
+        X = self._round_to_grid(X, n_steps)
+
+        if self.interim_results:
+            # Always sample with max budget: xt ← argmax acq([x, N])
+            X = np.append(X, np.ones(X.shape[0]).reshape(-1, 1), 1)
+        return X
+
+    def update_model(self, budget=0):
+        """fits the local models of the trust regions with new observations
+
+        The trust regions are updated with the trials that finalized since the last update first. Every local model is
+        fit on the observations in the box of its trust region, including busy locations with imputed metrics, but at
+        least on the `2 * n_hparams` and at most on the `max_observations` observations closest to its center.
+        """
+        self._log("start updateing model with budget {}".format(budget))
+
+        # check if enough observations available for model building
+        if len(self.searchspace.keys()) > len(self.get_metrics_array(budget=budget)):
+            self._log(
+                "not enough observations available to build with budget {} yet. At least {} needed, got {}".format(
+                    budget,
+                    len(self.searchspace.keys()),
+                    len(self.get_metrics_array(budget=budget)),
+                )
+            )
+            return
+
+        self._update_trust_regions()
+
+        Xi, yi = self.get_XY(
+            budget=budget,
+            interim_results=self.interim_results,
+            interim_results_interval=self.interim_results_interval,
+        )
+        n_hparams = len(self.searchspace.keys())
+        previous_models = self.region_models.get(budget)
+
+        region_models = []
+        for i, region in enumerate(self.trust_regions):
+            # the box is scaled with the length scales of the previous local model
+            weights = self._weights(previous_models[i][0] if previous_models else None)
+            distance = np.max(
+                np.abs(Xi[:, :n_hparams] - region.center)
+                / (region.length / 2 * weights),
+                axis=1,
+            )
+            n_local = min(
+                max(np.sum(distance <= 1), 2 * n_hparams), self.max_observations
+            )
+            local = np.argsort(distance, kind="stable")[:n_local]
+
+            model = clone(self.base_model)
+            model.fit(Xi[local], yi[local])
+            region_models.append((model, np.min(yi[local])))
+
+        self._log(
+            "fitted local models of {} trust regions with data".format(
+                len(region_models)
+            )
+        )
+
+        self.region_models[budget] = region_models
+        self.models[budget] = region_models[self._active_region][0]
+        self.model_versions[budget] = self.model_versions.get(budget, 0) + 1
+
+    def _update_trust_regions(self):
+        """creates the trust regions or updates them with the trials that finalized since the last update"""
+        if not self.trust_regions:
+            # center the trust regions at the best observations
+            observations = self.get_observations()
+            X, y = observations.X(0), observations.y(0)
+            for idx in np.argsort(y, kind="stable")[: self.n_trust_regions]:
+                self.trust_regions.append(
+                    _TrustRegion(X[idx].copy(), y[idx], self.length_init)
+                )
+            while len(self.trust_regions) < self.n_trust_regions:
+                self.trust_regions.append(self._random_trust_region())
+            self._n_updated = len(self.final_store)
+            return
+
+        failure_tolerance = self.failure_tolerance or max(
+            4, len(self.searchspace.keys())
+        )
+        for trial in self.final_store[self._n_updated :]:
+            idx = self._proposals.pop(self._key(trial.params), None)
+            if idx is None or trial.final_metric is None:
+                continue
+            region = self.trust_regions[idx]
+            metric = (
+                -trial.final_metric if self.direction == "max" else trial.final_metric
+            )
+
+            if region.improves(metric):
+                region.n_success += 1
+                region.n_failure = 0
+            else:
+                region.n_success = 0
+                region.n_failure += 1
+            if metric < region.best:
+                region.best = metric
+                region.center = self.searchspace.transform_batch(
+                    [[trial.params[name] for name in self.searchspace.keys()]],
+                    normalize_categorical=True,
+                )[0]
+
+            if region.n_success >= self.success_tolerance:
+                region.length = min(2 * region.length, self.length_max)
+                region.n_success = 0
+            elif region.n_failure >= failure_tolerance:
+                region.length /= 2
+                region.n_failure = 0
+            if region.length < self.length_min:
+                self._log("restart trust region {}".format(idx))
+                self.trust_regions[idx] = self._random_trust_region()
+        self._n_updated = len(self.final_store)
+
+    def _random_trust_region(self):
+        """returns a new trust region at a random config"""
+        center = self.searchspace.sample_transformed(
+            1, rng=self.rng, normalize_categorical=True
+        )[0]
+        return _TrustRegion(center, np.inf, self.length_init)
+
+    def _weights(self, model):
+        """returns the relative side lengths of the box per hparam, i.e. the length scales of the kernel of `model`
+        normalized to a geometric mean of 1. Without model, the box is a cube"""
+        n_hparams = len(self.searchspace.keys())
+        if model is None:
+            return np.ones(n_hparams)
+        for name, value in model.kernel_.get_params().items():
+            if name.endswith("length_scale") and np.ndim(value) == 1:
+                length_scales = np.asarray(value[:n_hparams], dtype=float)
+                return length_scales / np.exp(np.mean(np.log(length_scales)))
+        return np.ones(n_hparams)
+
+    def _key(self, hparams):
+        """returns hashable key of a hparam config, without the budget of the trial"""
+        return tuple(hparams[name] for name in self.searchspace.keys())
+
+
+class _TrustRegion(object):
+    """center, best metric, side length and counters of consecutive successes and failures of a trust region"""
+
+    def __init__(self, center, best, length):
+        self.center = center
+        self.best = best
+        self.length = length
+        self.n_success = 0
+        self.n_failure = 0
+
+    def improves(self, metric):
+        """returns True if `metric` improves the best metric of the trust region by more than a relative 1e-3"""
+        if not np.isfinite(self.best):
+            return True
+        return metric < self.best - 1e-3 * abs(self.best)
@@ -0,0 +1,163 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+"""
+Space filling designs in the unit hypercube, e.g. for warming up bayesian optimization.
+
+All designs return points in [0,1)^dim, use `Searchspace.unit_cube_to_transformed()` to map them to hparam configs.
+"""
+
+import numpy as np
+from scipy.spatial.distance import pdist
+
+# primitive polynomials and initial direction numbers of the first dimensions of the Sobol sequence
+# (Joe & Kuo, new-joe-kuo-6.21201). A polynomial x^s + a_1 x^(s-1) + ... + a_(s-1) x + 1 is encoded by its
+# coefficients as bits, e.g. x^2 + x + 1 → 0b111 = 7
+# fmt: off
+_SOBOL_POLY = (
+    1, 3, 7, 11, 13, 19, 25, 37, 41, 47, 55, 59, 61, 67, 91, 97, 103, 109, 115, 131,
+    137, 143, 145, 157, 167, 171, 185, 191, 193, 203, 211, 213, 229, 239, 241, 247,
+    253, 285, 299, 301,
+)
+_SOBOL_VINIT = (
+    (1,), (1,), (1, 3), (1, 3, 1), (1, 1, 1), (1, 1, 3, 3), (1, 3, 5, 13), (1, 1, 5, 5, 17),
+    (1, 1, 5, 5, 5), (1, 1, 7, 11, 19), (1, 1, 5, 1, 1), (1, 1, 1, 3, 11), (1, 3, 5, 5, 31),
+    (1, 3, 3, 9, 7, 49), (1, 1, 1, 15, 21, 21), (1, 3, 1, 13, 27, 49), (1, 1, 1, 15, 7, 5),
+    (1, 3, 1, 15, 13, 25), (1, 1, 5, 5, 19, 61), (1, 3, 7, 11, 23, 15, 103),
+    (1, 3, 7, 13, 13, 15, 69), (1, 1, 3, 13, 7, 35, 63), (1, 3, 5, 9, 1, 25, 53),
+    (1, 3, 1, 13, 9, 35, 107), (1, 3, 1, 5, 27, 61, 31), (1, 1, 5, 11, 19, 41, 61),
+    (1, 3, 5, 3, 3, 13, 69), (1, 1, 7, 13, 1, 19, 1), (1, 3, 7, 5, 13, 19, 59),
+    (1, 1, 3, 9, 25, 29, 41), (1, 3, 5, 13, 23, 1, 55), (1, 3, 7, 3, 13, 59, 17),
+    (1, 3, 1, 3, 5, 53, 69), (1, 1, 5, 5, 23, 33, 13), (1, 1, 7, 7, 1, 61, 123),
+    (1, 1, 7, 9, 13, 61, 49), (1, 3, 3, 5, 3, 55, 33), (1, 3, 1, 15, 31, 13, 49, 245),
+    (1, 3, 5, 15, 31, 59, 63, 97), (1, 3, 1, 11, 11, 11, 77, 249),
+)
+# fmt: on
+# number of bits of the Sobol points, i.e. at most 2^30 points
+_SOBOL_BITS = 30
+
+SOBOL_MAX_DIM = len(_SOBOL_POLY)
+
+
+def _sobol_direction_numbers(dim):
+    """returns direction numbers of the first `dim` dimensions, shape (dim, _SOBOL_BITS)"""
+    directions = np.zeros((dim, _SOBOL_BITS), dtype=np.int64)
+    for i in range(dim):
+        poly = _SOBOL_POLY[i]
+        degree = poly.bit_length() - 1
+        m = list(_SOBOL_VINIT[i]) if degree > 0 else [1]
+        # m_j = 2 a_1 m_(j-1) ^ 4 a_2 m_(j-2) ^ ... ^ 2^s m_(j-s) ^ m_(j-s)
+        for j in range(len(m), _SOBOL_BITS):
+            if degree == 0:
+                m.append(1)
+                continue
+            m_j = m[j - degree] ^ (m[j - degree] << degree)
+            for k in range(1, degree):
+                if (poly >> (degree - k)) & 1:
+                    m_j ^= m[j - k] << k
+            m.append(m_j)
+        directions[i] = [m[j] << (_SOBOL_BITS - 1 - j) for j in range(_SOBOL_BITS)]
+    return directions
+
+
+def sobol(num, dim, rng=None):
+    """Sobol low discrepancy sequence with a random digital shift.
+
+    The first `num` points of the sequence are returned. The sequence is balanced best if `num` is a power of 2. The
+    random digital shift keeps the net properties of the sequence, but avoids starting in the corner of the cube.
+
+    :param num: number of points
+    :type num: int
+    :param dim: number of dimensions, at most `SOBOL_MAX_DIM`
+    :type dim: int
+    :param rng: random number generator for the digital shift
+    :type rng: np.random.Generator
+    :return: points in the unit hypercube, shape (num, dim)
+    :rtype: np.ndarray
+    """
+    if dim > SOBOL_MAX_DIM:
+        raise ValueError(
+            "Sobol designs support at most {} dimensions, got {}. Use `lhs` or `maximin` instead.".format(
+                SOBOL_MAX_DIM, dim
+            )
+        )
+    if rng is None:
+        rng = np.random.default_rng()
+
+    directions = _sobol_direction_numbers(dim)
+    index = np.arange(num, dtype=np.int64)
+    # gray code order, each point differs from the previous one in one direction number
+    gray = index ^ (index >> 1)
+    points = np.zeros((num, dim), dtype=np.int64)
+    for bit in range(_SOBOL_BITS):
+        points ^= ((gray >> bit) & 1)[:, None] * directions[:, bit]
+    points ^= rng.integers(0, 2 ** _SOBOL_BITS, size=dim, dtype=np.int64)
+
+    return points / 2.0 ** _SOBOL_BITS
+
+
+def latin_hypercube(num, dim, rng=None):
+    """Latin hypercube design, i.e. each dimension is divided into `num` strata with exactly one point per stratum.
+
+    :param num: number of points
+    :type num: int
+    :param dim: number of dimensions
+    :type dim: int
+    :param rng: random number generator
+    :type rng: np.random.Generator
+    :return: points in the unit hypercube, shape (num, dim)
+    :rtype: np.ndarray
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    # independent random permutation of the strata per dimension
+    strata = rng.random((num, dim)).argsort(axis=0)
+    return (strata + rng.random((num, dim))) / num
+
+
+def maximin(num, dim, rng=None, n_candidates=100, transform=None):
+    """Maximin latin hypercube design, i.e. the latin hypercube with the largest minimum distance between its points
+    out of `n_candidates` random latin hypercubes.
+
+    :param num: number of points
+    :type num: int
+    :param dim: number of dimensions
+    :type dim: int
+    :param rng: random number generator
+    :type rng: np.random.Generator
+    :param n_candidates: number of latin hypercubes to choose from
+    :type n_candidates: int
+    :param transform: maps points of the unit hypercube to the space the distances are measured in, e.g. to account
+                      for INTEGER and CATEGORICAL hparams collapsing to the same value. Distances are measured in the
+                      unit hypercube if None.
+    :type transform: callable
+    :return: points in the unit hypercube, shape (num, dim)
+    :rtype: np.ndarray
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    best_design, best_distance = None, -np.inf
+    for _ in range(n_candidates):
+        design = latin_hypercube(num, dim, rng)
+        points = design if transform is None else transform(design)
+        distance = pdist(points).min() if num > 1 else 0.0
+        if distance > best_distance:
+            best_design, best_distance = design, distance
+    return best_design
+
+
+DESIGNS = {"sobol": sobol, "lhs": latin_hypercube, "maximin": maximin}
@@ -0,0 +1,115 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import math
+
+from maggy.searchspace import Searchspace
+
+
+class HparamsIndex(object):
+    """Hash index of the hparam configs of all started trials, used for duplicate detection.
+
+    Every config is canonicalized to a hashable key, i.e. a tuple of its hparam values in the order of the
+    searchspace. The "budget" key that is added to the params in multi fidelity settings is not part of the key.
+
+    **near duplicates**
+
+    If a `tolerance` is given, DOUBLE and INTEGER hparams are max-min normalized and bucketed into cells of width
+    `tolerance`, i.e. two configs are considered duplicates if all their continuous hparams fall into the same cell and
+    all other hparams are equal. E.g. `tolerance=0.01` divides every continuous hparam range into 100 cells.
+    """
+
+    # placeholder for hparams that are missing in the params of a trial
+    _MISSING = object()
+
+    def __init__(self, searchspace, tolerance=None):
+        """
+        :param searchspace: searchspace of the experiment
+        :type searchspace: Searchspace
+        :param tolerance: width of the buckets of continuous hparams relative to their range, between (0,1).
+                          If None, only exact duplicates are detected
+        :type tolerance: float
+        """
+        if tolerance is not None and not 0 < tolerance < 1:
+            raise ValueError(
+                "expected tolerance to be in (0,1), got {}".format(tolerance)
+            )
+        self.tolerance = tolerance
+
+        # (name, bounds) per hparam, bounds is None if the hparam is not bucketed
+        self._hparams = []
+        for hparam in searchspace.items():
+            bounds = None
+            if tolerance is not None and hparam["type"] in [
+                Searchspace.DOUBLE,
+                Searchspace.INTEGER,
+            ]:
+                bounds = hparam["values"]
+            self._hparams.append((hparam["name"], bounds))
+
+        # maps key to trial_id of the first trial started with that config
+        self._trial_ids = {}
+        # number of trials of `final_store` that have been indexed
+        self._n_synced = 0
+
+    def __len__(self):
+        return len(self._trial_ids)
+
+    def key(self, params):
+        """returns the canonical, hashable key of a hparam config
+
+        :param params: hparam dict
+        :type params: dict
+        :rtype: tuple
+        """
+        key = []
+        for name, bounds in self._hparams:
+            value = params.get(name, self._MISSING)
+            if bounds is not None and value is not self._MISSING:
+                lower, upper = bounds
+                normalized = (value - lower) / (upper - lower) if upper > lower else 0.0
+                # the upper bound belongs to the last cell
+                value = min(
+                    math.floor(normalized / self.tolerance),
+                    math.ceil(1 / self.tolerance) - 1,
+                )
+            key.append(value)
+        return tuple(key)
+
+    def add(self, trial):
+        """adds the config of `trial` to the index, configs that are already indexed keep their trial_id"""
+        self._trial_ids.setdefault(self.key(trial.params), trial.trial_id)
+
+    def sync(self, trial_store, final_store):
+        """indexes trials that have been started since the last sync
+
+        Trials are moved from `trial_store` to the append-only `final_store` when they are finalized, hence the
+        finalized trials only need to be indexed once and the busy trials are bounded by the number of executors.
+
+        :param trial_store: currently evaluating trials
+        :type trial_store: dict[str, Trial]
+        :param final_store: finalized trials
+        :type final_store: list[Trial]
+        """
+        for trial in final_store[self._n_synced :]:
+            self.add(trial)
+        self._n_synced = len(final_store)
+        for trial in trial_store.values():
+            self.add(trial)
+
+    def find(self, trial):
+        """returns trial_id of an indexed trial with the same config as `trial`, or None if there is none"""
+        return self._trial_ids.get(self.key(trial.params))
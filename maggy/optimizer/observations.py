@@ -0,0 +1,252 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import numpy as np
+
+
+class GrowableArray(object):
+    """Append-only numpy array with geometrically grown capacity.
+
+    `view()` returns a read-only view on the filled part of the array, so no data is copied when reading.
+    """
+
+    def __init__(self, row_shape=(), dtype=float, capacity=64):
+        """
+        :param row_shape: shape of one row, e.g. `(n_hparams,)` for a matrix or `()` for a vector
+        :type row_shape: tuple
+        :param dtype: dtype of the array
+        :param capacity: number of rows that are preallocated
+        :type capacity: int
+        """
+        self._data = np.empty((max(capacity, 1),) + tuple(row_shape), dtype=dtype)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _reserve(self, n_rows):
+        if n_rows > self._data.shape[0]:
+            capacity = max(n_rows, 2 * self._data.shape[0])
+            data = np.empty((capacity,) + self._data.shape[1:], dtype=self._data.dtype)
+            data[: self.size] = self._data[: self.size]
+            self._data = data
+
+    def append(self, row):
+        self._reserve(self.size + 1)
+        self._data[self.size] = row
+        self.size += 1
+
+    def extend(self, rows):
+        rows = np.asarray(rows, dtype=self._data.dtype)
+        self._reserve(self.size + rows.shape[0])
+        self._data[self.size : self.size + rows.shape[0]] = rows
+        self.size += rows.shape[0]
+
+    def view(self):
+        view = self._data[: self.size]
+        view.flags.writeable = False
+        return view
+
+
+class ObservationStore(object):
+    """Append-only store of the observations of finalized trials, owned by the optimizer.
+
+    Every finalized trial is added exactly once, when the store is synced with the `final_store` of the optimizer.
+    The store holds
+
+    - `X`: hparams in transformed representation (see `Searchspace.transform()`), shape (n_trials, n_hparams)
+    - `y`: final metrics, shape (n_trials,)
+    - `budgets`: budget the trial was run with (0 if single fidelity), shape (n_trials,)
+    - `curves`: metric histories, i.e. interim results, stored flat with offsets per trial
+
+    in preallocated, geometrically grown arrays, plus an index of rows per budget. Metrics are negated if the
+    optimization direction is `max`, so the store always describes a minimization problem.
+
+    The training data of surrogates that use interim results (hparams augmented with the budget of every used
+    interim metric) is assembled incrementally as well, see `interim()`.
+    """
+
+    def __init__(self, searchspace, direction="min", normalize_categorical=False):
+        """
+        :param searchspace: searchspace of the experiment
+        :type searchspace: Searchspace
+        :param direction: optimization direction, `min` or `max`
+        :type direction: str
+        :param normalize_categorical: If True, the encoded categorical hparams are also max-min normalized
+        :type normalize_categorical: bool
+        """
+        self.searchspace = searchspace
+        self.normalize_categorical = normalize_categorical
+        self.metric_multiplier = -1 if direction == "max" else 1
+
+        n_hparams = len(searchspace.keys())
+        self._X = GrowableArray((n_hparams,))
+        self._y = GrowableArray()
+        self._budgets = GrowableArray(dtype=int)
+        self._curve_values = GrowableArray(capacity=1024)
+        self._curve_offsets = GrowableArray(dtype=int)
+        self._curve_offsets.append(0)
+        # maps budget to rows that were run with that budget
+        self._budget_rows = {}
+        self.trial_ids = []
+        # incrementally assembled interim results, see `interim()`
+        self._interim_cache = {}
+
+        # number of trials of `final_store` that have been added
+        self._n_synced = 0
+
+    def __len__(self):
+        return self._y.size
+
+    def sync(self, final_store):
+        """adds trials that were appended to `final_store` since the last sync
+
+        :param final_store: the append-only list of finalized trials of the optimizer
+        :type final_store: list[Trial]
+        """
+        for trial in final_store[self._n_synced :]:
+            self.add(trial)
+        self._n_synced = len(final_store)
+
+    def add(self, trial):
+        """adds observations of one finalized trial to the store
+
+        :param trial: finalized trial
+        :type trial: Trial
+        """
+        budget = trial.params.get("budget", 0)
+        row = len(self)
+
+        self._X.append(
+            self.searchspace.transform(
+                self.searchspace.dict_to_list(trial.params),
+                normalize_categorical=self.normalize_categorical,
+            )
+        )
+        self._y.append(trial.final_metric * self.metric_multiplier)
+        self._budgets.append(budget)
+        self._curve_values.extend(
+            np.asarray(trial.metric_history, dtype=float) * self.metric_multiplier
+        )
+        self._curve_offsets.append(self._curve_values.size)
+        self._budget_rows.setdefault(budget, GrowableArray(dtype=int)).append(row)
+        self.trial_ids.append(trial.trial_id)
+
+    def rows(self, budget=0):
+        """returns indices of the trials that were run with `budget`, or all trials if budget is 0 or None"""
+        if not budget:
+            return np.arange(len(self))
+        if budget not in self._budget_rows:
+            return np.empty(0, dtype=int)
+        return self._budget_rows[budget].view()
+
+    def _select(self, array, budget):
+        if not budget:
+            return array.view()
+        return array.view()[self.rows(budget)]
+
+    def X(self, budget=0):
+        """transformed hparams of trials run with `budget`, shape (n_trials, n_hparams)"""
+        return self._select(self._X, budget)
+
+    def y(self, budget=0):
+        """final metrics of trials run with `budget`, shape (n_trials,)"""
+        return self._select(self._y, budget)
+
+    def budgets(self, budget=0):
+        """budgets of trials run with `budget`, shape (n_trials,)"""
+        return self._select(self._budgets, budget)
+
+    def curve_lengths(self, budget=0):
+        """lengths of the metric histories of trials run with `budget`, shape (n_trials,)"""
+        lengths = np.diff(self._curve_offsets.view())
+        if not budget:
+            return lengths
+        return lengths[self.rows(budget)]
+
+    def curves(self, budget=0):
+        """metric histories of trials run with `budget`
+
+        :return: list of read-only views on the metric histories, one array per trial
+        :rtype: list[np.ndarray]
+        """
+        values = self._curve_values.view()
+        offsets = self._curve_offsets.view()
+        return [values[offsets[row] : offsets[row + 1]] for row in self.rows(budget)]
+
+    def interim(self, interval, max_budget, budget=0):
+        """returns hparams augmented with the normalized budget and metrics of the interim results of trials run with
+        `budget`
+
+        Every `interval`-th metric of a metric history is used, the final metric is always used (see
+        `BaseAsyncBO.get_interim_result_idx()`). For every used metric, the hparams of the trial are augmented with the
+        max-min normalized index of the metric, i.e. z_t = [x_t, n_t] ; y_t = y_{t,nt}.
+
+        The result is cached per (`interval`, `max_budget`, `budget`), only trials added since the last call are
+        assembled.
+
+        :param interval: interval of interim metrics to be used, e.g. 10 means every 10th metric is used
+        :type interval: int
+        :param max_budget: maximum budget of the experiment, used for normalizing the budget
+        :type max_budget: int
+        :param budget: budget of the trials, 0 for all trials
+        :type budget: int
+        :return: tuple of read-only views on augmented hparams, shape (n_interim_results, n_hparams + 1), and interim
+                 metrics, shape (n_interim_results,)
+        :rtype: (np.ndarray, np.ndarray)
+        """
+        key = (interval, max_budget, budget)
+        if key not in self._interim_cache:
+            self._interim_cache[key] = {
+                "n_trials": 0,
+                "Z": GrowableArray((self._X.view().shape[1] + 1,), capacity=1024),
+                "y": GrowableArray(capacity=1024),
+            }
+        cache = self._interim_cache[key]
+
+        rows = self.rows(budget)
+        if cache["n_trials"] < len(rows):
+            Z, y = self._assemble_interim(
+                rows[cache["n_trials"] :], interval, max_budget
+            )
+            cache["Z"].extend(Z)
+            cache["y"].extend(y)
+            cache["n_trials"] = len(rows)
+
+        return cache["Z"].view(), cache["y"].view()
+
+    def _assemble_interim(self, rows, interval, max_budget):
+        """assembles augmented hparams and interim metrics of the trials in `rows` without python loops"""
+        offsets = self._curve_offsets.view()
+        starts = offsets[rows]
+        lengths = offsets[rows + 1] - starts
+
+        # every interval-th metric plus the final metric, if it is not already part of the interval
+        n_interval = lengths // interval
+        counts = n_interval + ((lengths % interval != 0) & (lengths > 0))
+        trial_idx = np.repeat(np.arange(len(rows)), counts)
+        # position of every used metric within the used metrics of its trial
+        position = np.arange(counts.sum()) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+        metric_idx = (position + 1) * interval - 1
+        is_final = position == n_interval[trial_idx]
+        metric_idx[is_final] = lengths[trial_idx][is_final] - 1
+
+        normalized_budget = np.clip(metric_idx / max(max_budget - 1, 1), 0.0, 1.0)
+        Z = np.hstack((self._X.view()[rows][trial_idx], normalized_budget[:, None]))
+        y = self._curve_values.view()[starts[trial_idx] + metric_idx]
+        return Z, y
@@ -0,0 +1,304 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import math
+import time
+from collections import deque
+
+import numpy as np
+
+from maggy.optimizer.abstractoptimizer import AbstractOptimizer
+from maggy.searchspace import Searchspace
+from maggy.trial import Trial
+
+
+class PBT(AbstractOptimizer):
+    """Implements asynchronous Population Based Training - PBT
+    (https://arxiv.org/abs/1711.09846).
+
+    A population of `population_size` members is trained in intervals of
+    `perturbation_interval` budget until every member reached `max_budget`.
+    Each interval is a trial with the hparams of the member and the `budget`
+    the member is trained to. A trial resumes from the checkpoint of the
+    previous interval of its member, which is passed as parent trial, see
+    `Reporter.load_checkpoint()` and `Reporter.get_parent_budget()`.
+
+    When a member finished an interval and its last metric is in the bottom
+    `quantile_fraction` of the population, it exploits a member of the top
+    `quantile_fraction`: it resumes from the checkpoint of that member and
+    explores hparams perturbed from the hparams of that member.
+
+    Sample usage:
+
+    >>> def train_fn(lr, budget, reporter):
+    >>>     state = reporter.load_checkpoint() or init_state()
+    >>>     for epoch in range(reporter.get_parent_budget() or 0, budget):
+    >>>         ...
+    >>>     reporter.save_checkpoint(state)
+    >>>     return accuracy
+    >>> from maggy.optimizer import PBT
+    >>> pbt = PBT(population_size=8, perturbation_interval=2, max_budget=20)
+    >>> experiment.lagom(..., optimizer=pbt, ...)
+    """
+
+    def __init__(
+        self,
+        population_size=8,
+        perturbation_interval=1,
+        max_budget=10,
+        quantile_fraction=0.25,
+        resample_probability=0.25,
+        perturbation_factors=(0.8, 1.2),
+        **kwargs
+    ):
+        """
+        :param population_size: number of members trained in parallel
+        :type population_size: int
+        :param perturbation_interval: budget a member is trained for in one trial
+        :type perturbation_interval: int
+        :param max_budget: budget members are trained to
+        :type max_budget: int
+        :param quantile_fraction: fraction of members that exploit the top members, and of top members that are
+                                  exploited
+        :type quantile_fraction: float
+        :param resample_probability: probability to resample a hparam from the searchspace instead of perturbing it
+        :type resample_probability: float
+        :param perturbation_factors: DOUBLE and INTEGER hparams are multiplied by one of the factors, DISCRETE hparams
+                                     move to the next smaller or larger value, CATEGORICAL hparams are only resampled
+        :type perturbation_factors: tuple[float]
+        """
+        super().__init__(**kwargs)
+
+        if self.pruner:
+            raise ValueError("PBT does not support pruners")
+        if population_size < 2:
+            raise ValueError(
+                "expected population_size to be at least 2, got {}".format(
+                    population_size
+                )
+            )
+        if not 0 < perturbation_interval <= max_budget:
+            raise ValueError(
+                "expected 0 < perturbation_interval <= max_budget, got {}, {}".format(
+                    perturbation_interval, max_budget
+                )
+            )
+        if not 0 < quantile_fraction <= 0.5:
+            raise ValueError(
+                "expected quantile_fraction to be in (0, 0.5], got {}".format(
+                    quantile_fraction
+                )
+            )
+
+        self.population_size = population_size
+        self.perturbation_interval = perturbation_interval
+        self.max_budget = max_budget
+        self.quantile_fraction = quantile_fraction
+        self.resample_probability = resample_probability
+        self.perturbation_factors = perturbation_factors
+
+        self.members = []
+        # indices of members whose last trial finished and that are not trained to `max_budget` yet
+        self._ready = deque()
+        # maps trial ids to the index of their member
+        self._member_of = {}
+        # number of trials of `final_store` that have been added to their members
+        self._n_finalized = 0
+
+    def initialize(self):
+        pass
+
+    def get_num_trials(self):
+        """Returns the number of trials of the experiment if no member exploits
+        another member. Exploiting a member that was trained further, or less,
+        changes the number of trials of a member.
+
+        :rtype: int
+        """
+        return self.population_size * math.ceil(
+            self.max_budget / self.perturbation_interval
+        )
+
+    def get_suggestion(self, trial=None):
+        self._log("### start get_suggestion ###")
+        self.sampling_time_start = time.time()
+        self._add_finalized_trials()
+
+        # start the population
+        if len(self.members) < self.population_size:
+            self.members.append(_Member(self._sample()))
+            return self._create(
+                len(self.members) - 1,
+                self.members[-1].hparams,
+                "random",
+                budget=self.perturbation_interval,
+            )
+
+        if self._ready:
+            return self._next_interval(self._ready.popleft())
+
+        if all(member.done(self.max_budget) for member in self.members):
+            self._log("All members have been trained to the max budget")
+            return None
+
+        self._log("Worker is IDLE and has to wait until a member finished its interval")
+        return "IDLE"
+
+    def finalize_experiment(self, trials):
+        return
+
+    def _next_interval(self, idx):
+        """Returns the next trial of member `idx`, either continuing the member
+        or exploiting a top member."""
+        member = self.members[idx]
+        ranked = sorted(
+            (m for m in self.members if m.metric is not None), key=lambda m: m.metric
+        )
+        n_quantile = int(len(ranked) * self.quantile_fraction)
+        sources = [m for m in ranked[:n_quantile] if m.last_budget < self.max_budget]
+
+        if n_quantile and member in ranked[-n_quantile:] and sources:
+            source = sources[self.rng.integers(len(sources))]
+            member.hparams = self._explore(source.hparams)
+            parent_trial_id, parent_budget = source.last_trial_id, source.last_budget
+            sample_type = "exploit"
+            self._log(
+                "member {} exploits member {}".format(idx, self.members.index(source))
+            )
+        else:
+            parent_trial_id, parent_budget = member.last_trial_id, member.last_budget
+            sample_type = "promoted"
+
+        budget = min(parent_budget + self.perturbation_interval, self.max_budget)
+        # the same config on the same budget would get the same trial id
+        for _ in range(10):
+            if self._trial_id(member.hparams, budget) not in self._member_of:
+                break
+            member.hparams = self._explore(member.hparams)
+            sample_type = "exploit"
+        else:
+            member.hparams = self._sample()
+
+        return self._create(
+            idx, member.hparams, sample_type, budget, parent_trial_id, parent_budget
+        )
+
+    def _create(
+        self,
+        idx,
+        hparams,
+        sample_type,
+        budget,
+        parent_trial_id=None,
+        parent_budget=None,
+    ):
+        """Creates the next trial of member `idx`."""
+        next_trial = self.create_trial(
+            hparams=dict(hparams),
+            sample_type=sample_type,
+            run_budget=budget,
+            parent_trial_id=parent_trial_id,
+            parent_budget=parent_budget,
+        )
+        self._member_of[next_trial.trial_id] = idx
+        self._log(
+            "start trial {} of member {}: {}, {} \n".format(
+                next_trial.trial_id, idx, next_trial.params, next_trial.info_dict
+            )
+        )
+        return next_trial
+
+    def _add_finalized_trials(self):
+        """Updates the members with the trials that finalized since the last call."""
+        for trial in self.final_store[self._n_finalized :]:
+            idx = self._member_of.get(trial.trial_id)
+            if idx is None:
+                continue
+            member = self.members[idx]
+            member.last_trial_id = trial.trial_id
+            member.last_budget = trial.params["budget"]
+            if trial.final_metric is not None:
+                member.metric = (
+                    -trial.final_metric
+                    if self.direction == "max"
+                    else trial.final_metric
+                )
+            if not member.done(self.max_budget):
+                self._ready.append(idx)
+        self._n_finalized = len(self.final_store)
+
+    def _explore(self, hparams):
+        """Returns a copy of `hparams` with every hparam perturbed or resampled."""
+        explored = {}
+        for name, (hparam_type, values) in zip(
+            self.searchspace.keys(), self.searchspace.values()
+        ):
+            value = hparams[name]
+            factor = self.perturbation_factors[
+                self.rng.integers(len(self.perturbation_factors))
+            ]
+            if self.rng.random() < self.resample_probability:
+                explored[name] = self._sample_value(hparam_type, values)
+            elif hparam_type == Searchspace.DOUBLE:
+                explored[name] = float(np.clip(value * factor, values[0], values[1]))
+            elif hparam_type == Searchspace.INTEGER:
+                explored[name] = int(
+                    np.clip(round(value * factor), values[0], values[1])
+                )
+            elif hparam_type == Searchspace.DISCRETE:
+                # move to the next smaller or larger value
+                ordered = sorted(values)
+                idx = ordered.index(value) + (1 if factor > 1 else -1)
+                explored[name] = ordered[min(max(idx, 0), len(ordered) - 1)]
+            else:
+                explored[name] = value
+        return explored
+
+    def _sample(self):
+        """Returns a random hparam config."""
+        return {
+            name: self._sample_value(hparam_type, values)
+            for name, (hparam_type, values) in zip(
+                self.searchspace.keys(), self.searchspace.values()
+            )
+        }
+
+    def _sample_value(self, hparam_type, values):
+        if hparam_type == Searchspace.DOUBLE:
+            return float(self.rng.uniform(values[0], values[1]))
+        elif hparam_type == Searchspace.INTEGER:
+            return int(self.rng.integers(values[0], values[1] + 1))
+        return values[self.rng.integers(len(values))]
+
+    @staticmethod
+    def _trial_id(hparams, budget):
+        params = dict(hparams)
+        params["budget"] = budget
+        return Trial._generate_id(params)
+
+
+class _Member(object):
+    """hparams, last finished trial and its metric of a member of the population"""
+
+    def __init__(self, hparams):
+        self.hparams = hparams
+        self.last_trial_id = None
+        self.last_budget = 0
+        # metric of the last finished trial, negated if the direction is `max`
+        self.metric = None
+
+    def done(self, max_budget):
+        return self.last_budget >= max_budget
@@ -0,0 +1,167 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+"""
+The implementation runs the SH iterations of Hyperband with the asynchronous promotions of ASHA (Li et al. 2020)
+ASHA: https://arxiv.org/abs/1810.05934
+"""
+
+from maggy.pruner.hyperband import Hyperband, SHIteration
+
+
+class AsyncHyperband(Hyperband):
+    """
+    **Asynchronous Hyperband**
+
+    Hyperband with the same SH iterations (brackets), i.e. the same number of configs and budgets per rung, but every
+    iteration promotes trials like ASHA: A finished trial is promoted to the next rung as soon as it is among the best
+    `1/eta` of the finished trials of its rung, instead of waiting until all trials of the rung have finished.
+
+    **Parallelization**
+
+    - Whenever a worker becomes available, the active iterations are asked for a run in ascending order. An iteration
+      returns a promotion (highest rung first) or a new config for its first rung.
+    - If no active iteration can return a run, the next iteration is started. Hence, the iterations run concurrently
+      and workers only become IDLE at the end of the experiment, when all iterations have been started and all their
+      promotable trials are evaluating.
+
+    The pruner is used like `Hyperband`, e.g. `pruner="asynchyperband"` with the same `pruner_kwargs`.
+    """
+
+    def create_iteration(self, n_configs, budgets, iteration_id):
+        return AsyncSHIteration(
+            n_configs=n_configs,
+            budgets=budgets,
+            iteration_id=iteration_id,
+            trial_metric_getter=self.trial_metric_getter,
+            logger=self._log,
+        )
+
+
+class AsyncSHIteration(SHIteration):
+    """SuccessiveHalving iteration with asynchronous promotions
+
+    Trials of a rung are promoted while the rung is still evaluating. Of the finished trials of a rung, the best
+    `n_configs[rung + 1] / n_configs[rung]` fraction can be promoted, i.e. the best `1/eta`. Once all trials of the
+    rung have finished, the best `n_configs[rung + 1]` can be promoted, so the iteration always completes. At most
+    `n_configs[rung + 1]` trials are promoted from a rung.
+
+    `configs` has the same format as in `SHIteration`. A promoted trial is added to the next rung as soon as it is
+    returned by `get_next_run()`, its `actual_trial_id` is set when it is reported by the optimizer.
+    `current_rung` is the rung of the last returned run.
+    """
+
+    def __init__(self, n_configs, budgets, iteration_id, trial_metric_getter, logger):
+        super().__init__(n_configs, budgets, iteration_id, trial_metric_getter, logger)
+        # metrics of finished trials of the iteration, by `trial_id`
+        self.metrics = {}
+
+    def get_next_run(self):
+        """returns dict with `trial_id` and `budget` for next trial.
+
+        **There are 3 possible outcomes:**
+
+        1. A trial can be promoted, the best promotable trial of the highest rung is promoted
+            - return {"trial_id": `promoted_trial_id`, "budget": `budget`}
+        2. There are still slots to fill in the first rung
+            - return {"trial_id": None, "budget": `budget`}
+        3. No trial can be promoted until running trials finish, or the iteration has finished
+            - return None
+
+        :return: dict with info about trial id and budget for the next run in the iteration, or None if iteration is
+                 busy or finished.
+        :rtype: None|dict
+        """
+        self.update_metrics()
+
+        for rung in range(self.n_rungs - 2, -1, -1):
+            trial_id = self.promotable_trial(rung)
+            if trial_id is not None:
+                self.current_rung = rung + 1
+                self.configs[self.current_rung].append(
+                    {"original_trial_id": trial_id, "actual_trial_id": None}
+                )
+                self.actual_n_configs[self.current_rung] += 1
+                self._log(
+                    "{}. Iteration, promote trial {} from rung {}".format(
+                        self.iteration_id, trial_id, rung
+                    )
+                )
+                return {"trial_id": trial_id, "budget": self.budgets[self.current_rung]}
+
+        if self.actual_n_configs[0] < self.n_configs[0]:
+            self.current_rung = 0
+            self.actual_n_configs[0] += 1
+            return {"trial_id": None, "budget": self.budgets[0]}
+
+        if self.finished():
+            # set state so it is no longer returned in `active_iterations()`
+            self.state = SHIteration.FINISHED
+            self._log("{}. Iteration finished".format(self.iteration_id))
+        return None
+
+    def update_metrics(self):
+        """adds the metrics of trials that finished since the last update to `metrics`"""
+        running = [
+            trial["actual_trial_id"]
+            for rung in range(self.n_rungs)
+            for trial in self.configs[rung]
+            if trial["actual_trial_id"] and trial["actual_trial_id"] not in self.metrics
+        ]
+        if running:
+            self.metrics.update(self.trial_metric_getter(running))
+
+    def promotable_trial(self, rung):
+        """returns the trial id of the best trial of `rung` that can be promoted, or None
+
+        :param rung: rung to promote from, not the last rung
+        :type rung: int
+        :rtype: str|None
+        """
+        if self.actual_n_configs[rung + 1] >= self.n_configs[rung + 1]:
+            # all slots of the next rung are filled
+            return None
+
+        finished = [
+            trial["actual_trial_id"]
+            for trial in self.configs[rung]
+            if trial["actual_trial_id"] in self.metrics
+        ]
+        if len(finished) == self.n_configs[rung]:
+            n_top = self.n_configs[rung + 1]
+        else:
+            n_top = len(finished) * self.n_configs[rung + 1] // self.n_configs[rung]
+
+        promoted = {trial["original_trial_id"] for trial in self.configs[rung + 1]}
+        for trial_id in sorted(finished, key=lambda x: self.metrics[x])[:n_top]:
+            if trial_id not in promoted:
+                return trial_id
+        return None
+
+    def promotable(self):
+        """rungs are not promoted at once, see `promotable_trial()`"""
+        return False
+
+    def finished(self):
+        """checks if SH Iteration has finished, i.e. if all trials in the last rung are finished
+
+        :return: True if SH Iteration is finished, False else
+        :rtype: bool
+        """
+        last_rung = self.configs[self.n_rungs - 1]
+        return len(last_rung) == self.n_configs[-1] and all(
+            trial["actual_trial_id"] in self.metrics for trial in last_rung
+        )
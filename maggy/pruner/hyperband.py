@@ -208,15 +208,30 @@ class Hyperband(AbstractPruner):
             # budgets per rung
             budgets = self.budgets[-n_rungs - 1 :]
             self.iterations.append(
-                SHIteration(
-                    n_configs=ns,
-                    budgets=budgets,
-                    iteration_id=iteration,
-                    trial_metric_getter=self.trial_metric_getter,
-                    logger=self._log,
+                self.create_iteration(
+                    n_configs=ns, budgets=budgets, iteration_id=iteration
                 )
             )
 
+    def create_iteration(self, n_configs, budgets, iteration_id):
+        """returns a new SH iteration
+
+        :param n_configs: number of trials per rung
+        :type n_configs: list[int]
+        :param budgets: budget per rung
+        :type budgets: list[int]
+        :param iteration_id: index of the iteration in `iterations`
+        :type iteration_id: int
+        :rtype: SHIteration
+        """
+        return SHIteration(
+            n_configs=n_configs,
+            budgets=budgets,
+            iteration_id=iteration_id,
+            trial_metric_getter=self.trial_metric_getter,
+            logger=self._log,
+        )
+
     def active_iterations(self):
         """returns currently active (i.e. state == "RUNNING") iterations
 
@@ -65,6 +65,8 @@ class Searchspace(object):
     def __init__(self, **kwargs):
         self._hparam_types = {}
         self._names = []
+        # lookup tables for the batch transforms, compiled lazily
+        self._batch_tables = None
         for name, value in kwargs.items():
             self.add(name, value)
 
@@ -138,6 +140,7 @@ class Searchspace(object):
                 self._hparam_types[name] = param_type
                 setattr(self, name, value[1])
                 self._names.append(name)
+                self._batch_tables = None
             else:
                 raise ValueError(
                     "Hyperparameter type is not of type DOUBLE, "
@@ -275,6 +278,8 @@ class Searchspace(object):
         +--------------+-----------------------------------------------------+
         | CATEGORICAL  | Encoding: index in list + opt. Max-Min Normalization|
         +--------------+-----------------------------------------------------+
+        | DISCRETE     | Encoding: index in list + opt. Max-Min Normalization|
+        +--------------+-----------------------------------------------------+
 
         :param hparams: hparams in original representation for one trial
         :type hparams: 1D np.ndarray
@@ -297,7 +302,7 @@ class Searchspace(object):
                     hparam_spec["values"], hparam
                 )
                 transformed_hparams.append(normalized_hparam)
-            elif hparam_spec["type"] == "CATEGORICAL":
+            elif hparam_spec["type"] in ["CATEGORICAL", "DISCRETE"]:
                 encoded_hparam = Searchspace._encode_categorical(
                     hparam_spec["values"], hparam
                 )
@@ -334,7 +339,7 @@ class Searchspace(object):
                     hparam_spec["values"], hparam
                 )
                 hparams.append(value)
-            elif hparam_spec["type"] == "CATEGORICAL":
+            elif hparam_spec["type"] in ["CATEGORICAL", "DISCRETE"]:
                 if normalize_categorical:
                     value = Searchspace._inverse_normalize_integer(
                         [0, len(hparam_spec["values"]) - 1], hparam
@@ -352,6 +357,215 @@ class Searchspace(object):
 
         return hparams
 
+    def transform_batch(self, hparams, normalize_categorical=False):
+        """Transforms hparams of many trials at once, column by column.
+
+        Same transformation as `transform()`, but vectorized over all rows. The bounds, types and categorical lookup
+        tables are compiled once per searchspace.
+
+        :param hparams: hparams in original representation, one row per trial in the order of `keys()`. Additional
+                        trailing columns (e.g. the budget of multi fidelity trials) are ignored like in `transform()`
+        :type hparams: 2D np.ndarray|list[list]
+        :param normalize_categorical: If True, the encoded categorical hparam is also max-min normalized between 0 and 1
+        `inverse_transform_batch()` must use the same value for this parameter
+        :type normalize_categorical: bool
+        :return: transformed hparams, shape (n_rows, n_hparams)
+        :rtype: np.ndarray[np.float]
+        """
+        tables = self._get_batch_tables()
+        if not isinstance(hparams, np.ndarray):
+            # keep the python types of mixed rows, numpy would convert all values to strings
+            hparams = np.array(hparams, dtype=object)
+        if hparams.ndim == 1:
+            hparams = hparams.reshape(1, -1)
+        n_rows = hparams.shape[0]
+        transformed = np.empty((n_rows, len(self._names)), dtype=float)
+
+        if tables["double"].size:
+            transformed[:, tables["double"]] = hparams[:, tables["double"]].astype(
+                float
+            )
+        if tables["integer"].size:
+            transformed[:, tables["integer"]] = np.trunc(
+                hparams[:, tables["integer"]].astype(float)
+            )
+        numeric = tables["numeric"]
+        if numeric.size:
+            transformed[:, numeric] = np.clip(
+                (transformed[:, numeric] - tables["lower"]) / tables["scale"], 0.0, 1.0
+            )
+
+        for col, lookup, choices in tables["categorical"]:
+            transformed[:, col] = Searchspace._encode_categorical_column(
+                lookup, hparams[:, col]
+            )
+            if normalize_categorical:
+                transformed[:, col] /= max(len(choices) - 1, 1)
+
+        return transformed
+
+    def inverse_transform_batch(self, transformed_hparams, normalize_categorical=False):
+        """Returns hparams of many trials in the representation specified when instantiated, column by column.
+
+        Same transformation as `inverse_transform()`, but vectorized over all rows.
+
+        :param transformed_hparams: hparams in transformed representation, shape (n_rows, n_hparams)
+        :type transformed_hparams: 2D np.ndarray
+        :param normalize_categorical: If True, the encoded categorical hparam was also max-min normalized between 0 and 1
+        `transform_batch()` must use the same value for this parameter
+        :type normalize_categorical: bool
+        :return: hparams in original representation, one row per trial. The rows can be passed to `list_to_dict()`
+        :rtype: np.ndarray[object]
+        """
+        tables = self._get_batch_tables()
+        transformed_hparams = np.asarray(transformed_hparams, dtype=float).reshape(
+            -1, len(self._names)
+        )
+        n_rows = transformed_hparams.shape[0]
+        hparams = np.empty((n_rows, len(self._names)), dtype=object)
+
+        numeric = tables["numeric"]
+        if numeric.size:
+            values = transformed_hparams[:, numeric] * tables["scale"] + tables["lower"]
+            is_integer = tables["numeric_is_integer"]
+            # astype(object) converts to python floats and ints
+            hparams[:, numeric[~is_integer]] = values[:, ~is_integer].astype(object)
+            hparams[:, numeric[is_integer]] = (
+                np.round(values[:, is_integer]).astype(int).astype(object)
+            )
+
+        for col, _, choices in tables["categorical"]:
+            encoded = transformed_hparams[:, col]
+            if normalize_categorical:
+                encoded = np.round(encoded * (len(choices) - 1))
+            hparams[:, col] = choices[encoded.astype(int)]
+
+        return hparams
+
+    def sample_transformed(self, num, rng=None, normalize_categorical=False):
+        """Samples random hparam configs directly in transformed representation.
+
+        The configs follow the same distribution as the transformed configs of `get_random_parameter_values()`, i.e.
+        DOUBLE hparams are uniform in [0,1], INTEGER hparams are uniform over the normalized integers of their range
+        and CATEGORICAL hparams are uniform over their encodings. All configs are drawn in one call.
+
+        :param num: number of configs to sample
+        :type num: int
+        :param rng: random number generator, e.g. seeded per experiment. If None, a new unseeded generator is used
+        :type rng: np.random.Generator
+        :param normalize_categorical: If True, the encoded categorical hparam is also max-min normalized between 0 and 1
+        `inverse_transform_batch()` must use the same value for this parameter
+        :type normalize_categorical: bool
+        :return: transformed hparams, shape (num, n_hparams)
+        :rtype: np.ndarray[np.float]
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        return self.unit_cube_to_transformed(
+            rng.random((num, len(self._names))),
+            normalize_categorical=normalize_categorical,
+        )
+
+    def unit_cube_to_transformed(self, points, normalize_categorical=False):
+        """Maps points of the unit hypercube to hparam configs in transformed representation.
+
+        Every hparam is one dimension of the cube. DOUBLE hparams are taken as they are, the [0,1) interval of INTEGER
+        and CATEGORICAL hparams is divided into equally sized bins, one per integer or category. Hence uniform points
+        are mapped to uniform configs and stratified designs (e.g. latin hypercubes) stay stratified over the values of
+        discrete hparams.
+
+        :param points: points in the unit hypercube, shape (n_points, n_hparams)
+        :type points: 2D np.ndarray
+        :param normalize_categorical: If True, the encoded categorical hparam is also max-min normalized between 0 and 1
+        `inverse_transform_batch()` must use the same value for this parameter
+        :type normalize_categorical: bool
+        :return: transformed hparams, shape (n_points, n_hparams)
+        :rtype: np.ndarray[np.float]
+        """
+        tables = self._get_batch_tables()
+        points = np.asarray(points, dtype=float).reshape(-1, len(self._names))
+        transformed = points.copy()
+
+        if tables["integer"].size:
+            ranges = tables["scale"][tables["numeric_is_integer"]]
+            # ranges + 1 integers per hparam
+            transformed[:, tables["integer"]] = (
+                np.minimum(
+                    np.floor(points[:, tables["integer"]] * (ranges + 1)), ranges
+                )
+                / ranges
+            )
+        for col, _, choices in tables["categorical"]:
+            transformed[:, col] = np.minimum(
+                np.floor(points[:, col] * len(choices)), len(choices) - 1
+            )
+            if normalize_categorical:
+                transformed[:, col] /= max(len(choices) - 1, 1)
+
+        return transformed
+
+    def _get_batch_tables(self):
+        """returns the lookup tables for the batch transforms, compiles them if the searchspace has changed"""
+        if self._batch_tables is not None:
+            return self._batch_tables
+
+        double, integer, categorical = [], [], []
+        for col, hparam in enumerate(self.items()):
+            if hparam["type"] == Searchspace.DOUBLE:
+                double.append(col)
+            elif hparam["type"] == Searchspace.INTEGER:
+                integer.append(col)
+            elif hparam["type"] in [Searchspace.CATEGORICAL, Searchspace.DISCRETE]:
+                # DISCRETE hparams are encoded like CATEGORICAL ones, i.e. by their index in the list of values
+                choices = np.empty(len(hparam["values"]), dtype=object)
+                choices[:] = hparam["values"]
+                # same encoding as `_encode_categorical()`, i.e. first index in case of repeated values
+                lookup = {}
+                for idx, value in enumerate(hparam["values"]):
+                    lookup.setdefault(value, idx)
+                categorical.append((col, lookup, choices))
+            else:
+                raise NotImplementedError("Not Implemented other types yet")
+
+        numeric = np.array(double + integer, dtype=int)
+        bounds = np.array(
+            [self.get(self._names[col]) for col in numeric], dtype=float
+        ).reshape(-1, 2)
+        self._batch_tables = {
+            "double": np.array(double, dtype=int),
+            "integer": np.array(integer, dtype=int),
+            "numeric": numeric,
+            "numeric_is_integer": np.arange(len(numeric)) >= len(double),
+            "lower": bounds[:, 0],
+            "scale": bounds[:, 1] - bounds[:, 0],
+            "categorical": categorical,
+        }
+        return self._batch_tables
+
+    @staticmethod
+    def _encode_categorical_column(lookup, column):
+        """Encodes a column of categories to integers, see `_encode_categorical()`
+
+        :param lookup: maps category to encoding
+        :type lookup: dict
+        :param column: categories to encode
+        :type column: 1D np.ndarray
+        :raises ValueError: a value of `column` is not a category
+        :return: encoded categories
+        :rtype: np.ndarray[int]
+        """
+        encoded = np.full(column.shape[0], -1, dtype=int)
+        # one vectorized comparison per category, the number of categories is small compared to the number of rows
+        for value, idx in lookup.items():
+            encoded[column == value] = idx
+        if np.any(encoded < 0):
+            raise ValueError(
+                "{} is not a category of {}".format(
+                    column[np.argmax(encoded < 0)], list(lookup)
+                )
+            )
+        return encoded
+
     @staticmethod
     def _encode_categorical(choices, value):
         """Encodes category to integer. The encoding is the list index of the category
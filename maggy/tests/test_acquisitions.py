@@ -0,0 +1,80 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import numpy as np
+from skopt.learning.gaussian_process import GaussianProcessRegressor
+from skopt.learning.gaussian_process.kernels import ConstantKernel, Matern
+
+from maggy.optimizer.bayes.acquisitions import (
+    GaussianProcess_EI,
+    GaussianProcess_LCB,
+    GaussianProcess_PI,
+)
+from maggy.optimizer.bayes.surrogates import (
+    predict_mean_gradients,
+    predict_with_gradients,
+)
+
+
+def test_evaluate_batch():
+
+    rng = np.random.default_rng(0)
+    X = rng.random((20, 3))
+    y = np.sin(X.sum(axis=1) * 3)
+    kernel = ConstantKernel(1.0) * Matern(length_scale=np.ones(3), nu=2.5)
+    model = GaussianProcessRegressor(
+        kernel=kernel, normalize_y=True, noise="gaussian"
+    ).fit(X, y)
+
+    points = rng.random((6, 3))
+    for acq_fun in [GaussianProcess_EI, GaussianProcess_PI, GaussianProcess_LCB]:
+        values, grads = acq_fun.evaluate_batch(points, model, y.min())
+        expected = [acq_fun.evaluate_1_d(x, model, y.min()) for x in points]
+        assert np.allclose(values, [np.ravel(v)[0] for v, _ in expected])
+        assert np.allclose(grads, [g for _, g in expected])
+
+
+def test_predict_with_gradients_without_y_train_std():
+
+    rng = np.random.default_rng(0)
+    X = rng.random((20, 3))
+    y = np.sin(X.sum(axis=1) * 3)
+    kernel = ConstantKernel(1.0) * Matern(length_scale=np.ones(3), nu=2.5)
+    model = GaussianProcessRegressor(
+        kernel=kernel, normalize_y=True, noise="gaussian"
+    ).fit(X, y)
+
+    points = rng.random((6, 3))
+    expected = predict_with_gradients(model, points)
+    # skopt versions before 0.8 do not set `y_train_std_`
+    del model.y_train_std_
+    for actual, value in zip(predict_with_gradients(model, points), expected):
+        np.testing.assert_allclose(actual, value)
+
+
+def test_predict_mean_gradients():
+
+    rng = np.random.default_rng(0)
+    X = rng.random((20, 3))
+    y = np.sin(X.sum(axis=1) * 3)
+    kernel = ConstantKernel(1.0) * Matern(length_scale=np.ones(3), nu=2.5)
+    model = GaussianProcessRegressor(
+        kernel=kernel, normalize_y=True, noise="gaussian"
+    ).fit(X, y)
+
+    points = rng.random((6, 3))
+    _, _, expected, _ = predict_with_gradients(model, points)
+    np.testing.assert_allclose(predict_mean_gradients(model, points), expected)
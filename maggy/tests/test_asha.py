@@ -0,0 +1,92 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import random
+
+import pytest
+
+from maggy import Searchspace
+from maggy.optimizer import Asha
+from maggy.trial import Trial
+
+
+def _promotable(rung, reduction_factor, direction):
+    """promotable trials of a rung by sorting all finalized trials of the rung"""
+    finalized = sorted(
+        rung.finalized,
+        key=lambda t: t.final_metric,
+        reverse=direction == "max",
+    )
+    n_top = len(finalized) // reduction_factor
+    if n_top <= len(rung.promoted):
+        return set()
+    top = finalized[:n_top]
+    return {t.trial_id for t in top if t.trial_id not in rung.promoted}
+
+
+@pytest.mark.parametrize("direction", ["min", "max"])
+def test_asha_promotions(direction):
+    random.seed(1)
+    optimizer = Asha(reduction_factor=3, resource_min=1, resource_max=9)
+    optimizer.searchspace = Searchspace(x=("DOUBLE", [0.0, 1.0]))
+    optimizer.num_trials = 100
+    optimizer.trial_store = {}
+    optimizer.final_store = []
+    optimizer.direction = direction
+    optimizer.initialize()
+
+    # start trials on 4 executors and finalize them in random order
+    running = [optimizer.get_suggestion() for _ in range(4)]
+    while True:
+        trial = running.pop(random.randrange(len(running)))
+        trial.status = Trial.FINALIZED
+        trial.final_metric = trial.params["x"] * trial.params["budget"]
+        optimizer.final_store.append(trial)
+        for rung in optimizer.rungs.values():
+            rung.finalized = [t for t in rung.trials if t.status == Trial.FINALIZED]
+        expected = {
+            k: _promotable(rung, 3, direction) for k, rung in optimizer.rungs.items()
+        }
+
+        suggestion = optimizer.get_suggestion(trial)
+        if suggestion is None:
+            break
+        running.append(suggestion)
+
+        if suggestion.params["budget"] > 1:
+            # promoted the best promotable trial of the highest possible rung
+            k = {3: 0, 9: 1}[suggestion.params["budget"]]
+            assert all(not expected[j] for j in expected if j > k)
+            promoted = [
+                t
+                for t in optimizer.rungs[k].trials
+                if t.params["x"] == suggestion.params["x"]
+            ][0]
+            assert promoted.trial_id in expected[k]
+            assert suggestion.info_dict == {
+                "parent_trial_id": promoted.trial_id,
+                "parent_budget": promoted.params["budget"],
+            }
+            best = (min if direction == "min" else max)(
+                t.final_metric
+                for t in optimizer.rungs[k].trials
+                if t.trial_id in expected[k]
+            )
+            assert promoted.final_metric == best
+        else:
+            assert not any(expected.values())
+
+    assert len(optimizer.rungs[2].trials) == 1
@@ -0,0 +1,91 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import pytest
+
+from maggy import Searchspace
+from maggy.core.controller_host import ControllerHost
+from maggy.core.exceptions import ControllerHostError
+from maggy.optimizer import RandomSearch
+from maggy.trial import Trial
+
+
+def _init_host(controller, tmp_path, num_trials=4):
+    host = ControllerHost(controller)
+    host.num_trials = num_trials
+    host.searchspace = Searchspace(x=("DOUBLE", [1, 5]), y=("INTEGER", [1, 3]))
+    host.trial_store = {}
+    host.final_store = []
+    host.direction = "max"
+    host._initialize(exp_dir=str(tmp_path))
+    return host
+
+
+def test_controller_host_suggestions(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    host = _init_host(RandomSearch(), tmp_path)
+
+    trial = host.get_suggestion()
+    seen = set()
+    while trial is not None:
+        assert isinstance(trial, Trial)
+        assert trial.trial_id not in seen
+        seen.add(trial.trial_id)
+        # mimic the driver
+        host.trial_store[trial.trial_id] = trial
+        trial.status = Trial.FINALIZED
+        trial.final_metric = 1.0
+        host.final_store.append(host.trial_store.pop(trial.trial_id))
+        trial = host.get_suggestion(trial)
+
+    assert len(seen) == 4
+    host._finalize_experiment(host.final_store)
+    assert host._process is None
+
+
+def test_controller_host_error(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # random search needs at least one continuous hparam, the error has to be raised in the driver process
+    host = ControllerHost(RandomSearch())
+    host.num_trials = 2
+    host.searchspace = Searchspace(z=("CATEGORICAL", ["a", "b"]))
+    host.trial_store = {}
+    host.final_store = []
+    host.direction = "max"
+
+    with pytest.raises(ControllerHostError) as excinfo:
+        host._initialize(exp_dir=str(tmp_path))
+    assert "NotImplementedError" in str(excinfo.value)
+    host._close_log()
+
+
+def test_controller_host_batch_suggestions(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    host = _init_host(RandomSearch(), tmp_path)
+
+    trials = host.get_suggestions(4)
+    assert len(trials) == 4
+    assert len({trial.trial_id for trial in trials}) == 4
+    for trial in trials:
+        # mimic the driver
+        host.trial_store[trial.trial_id] = trial
+        trial.status = Trial.FINALIZED
+        trial.final_metric = 1.0
+        host.final_store.append(host.trial_store.pop(trial.trial_id))
+
+    # the last element applies to all remaining executors
+    assert host.get_suggestions(3, trials[-1]) == [None]
+    host._finalize_experiment(host.final_store)
@@ -0,0 +1,57 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import numpy as np
+import pytest
+
+from maggy import Searchspace
+from maggy.optimizer import designs
+
+
+def test_sobol():
+
+    points = designs.sobol(8, 3, rng=np.random.default_rng(0))
+    assert points.shape == (8, 3)
+    # with a digital shift the first 2^k points still have one point per dyadic interval of length 2^-k
+    for dim in range(3):
+        assert sorted(np.floor(points[:, dim] * 8)) == list(range(8))
+
+    with pytest.raises(ValueError):
+        designs.sobol(8, designs.SOBOL_MAX_DIM + 1)
+
+
+def test_latin_hypercube():
+
+    for design in [designs.latin_hypercube, designs.maximin]:
+        points = design(10, 4, rng=np.random.default_rng(0))
+        assert points.shape == (10, 4)
+        for dim in range(4):
+            assert sorted(np.floor(points[:, dim] * 10)) == list(range(10))
+
+
+def test_unit_cube_to_transformed():
+
+    sp = Searchspace(
+        x=("DOUBLE", [-3, 3]),
+        y=("INTEGER", [1, 4]),
+        z=("CATEGORICAL", ["red", "green", "blue"]),
+    )
+    points = designs.latin_hypercube(12, 3, rng=np.random.default_rng(0))
+    hparams = sp.inverse_transform_batch(sp.unit_cube_to_transformed(points))
+
+    # stratification carries over to the discrete hparams
+    assert sorted(row[1] for row in hparams) == [1, 1, 1, 2, 2, 2, 3, 3, 3, 4, 4, 4]
+    assert sorted(row[2] for row in hparams) == sorted(["red", "green", "blue"] * 4)
@@ -0,0 +1,166 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import random
+import statistics
+
+import numpy as np
+import pytest
+
+from maggy.earlystop import MedianStoppingRule, PercentileStoppingRule
+from maggy.trial import Trial
+
+
+def _trial(i, n_steps):
+    trial = Trial({"x": i})
+    trial.metric_history = [random.random() for _ in range(n_steps)]
+    return trial
+
+
+def _median_check(to_check, finalized_trials, direction):
+    """median rule computed from the full metric histories"""
+    step = len(to_check.metric_history)
+    median = statistics.median(
+        sum(t.metric_history[:step]) / step
+        for t in finalized_trials
+        if len(t.metric_history) >= step
+    )
+    if direction == "max":
+        return to_check.trial_id if max(to_check.metric_history) < median else None
+    return to_check.trial_id if min(to_check.metric_history) > median else None
+
+
+@pytest.mark.parametrize("direction", ["min", "max"])
+def test_median_stopping_rule(direction):
+    random.seed(0)
+    rule = MedianStoppingRule()
+    finalized_trials = [_trial(i, random.randint(5, 20)) for i in range(50)]
+    running = [_trial(i, 0) for i in range(50, 60)]
+
+    n_stopped = 0
+    for i in range(200):
+        to_check = running[i % len(running)]
+        to_check.append_metric(
+            {"step": len(to_check.metric_history), "value": random.random()}
+        )
+        if len(to_check.metric_history) > 5:
+            # no finalized trial has reached the step
+            continue
+        result = MedianStoppingRule.earlystop_check(
+            to_check, finalized_trials, direction
+        )
+        assert result == _median_check(to_check, finalized_trials, direction)
+        # the incremental sweep of one trial gives the same result
+        assert rule.earlystop_sweep([to_check], finalized_trials, direction) == (
+            [] if result is None else [result]
+        )
+        n_stopped += result is not None
+        if i % 7 == 0:
+            finalized_trials.append(_trial(100 + i, random.randint(1, 20)))
+    assert n_stopped > 0
+
+    with pytest.raises(Exception):
+        rule.earlystop_check(_trial(0, 25), finalized_trials, direction)
+    # the sweep skips trials that ran more steps than any finalized trial
+    assert rule.earlystop_sweep([_trial(0, 25)], finalized_trials, direction) == []
+
+    # the rule is bound to the finalized trials of one experiment
+    with pytest.raises(ValueError):
+        rule.earlystop_sweep([to_check], list(finalized_trials), direction)
+    rule.reset(list(finalized_trials))
+    assert rule.step_averages == []
+
+
+def _percentile_check(to_check, finalized_trials, direction, percentile):
+    """percentile rule computed from the full metric histories"""
+    step = len(to_check.metric_history)
+    averages = [
+        sum(t.metric_history[:step]) / step
+        for t in finalized_trials
+        if len(t.metric_history) >= step
+    ]
+    if direction == "max":
+        threshold = np.percentile(averages, percentile)
+        return to_check.trial_id if max(to_check.metric_history) < threshold else None
+    threshold = np.percentile(averages, 100 - percentile)
+    return to_check.trial_id if min(to_check.metric_history) > threshold else None
+
+
+@pytest.mark.parametrize("direction", ["min", "max"])
+@pytest.mark.parametrize(
+    "rule,reference",
+    [
+        (MedianStoppingRule, _median_check),
+        (
+            lambda: PercentileStoppingRule(25),
+            lambda *args: _percentile_check(*args, percentile=25),
+        ),
+        (lambda: PercentileStoppingRule(50), _median_check),
+    ],
+)
+def test_earlystop_sweep(direction, rule, reference):
+    random.seed(1)
+    finalized_trials = [_trial(i, random.randint(5, 20)) for i in range(50)]
+    rule = rule()
+    running = [_trial(i, 0) for i in range(50, 80)]
+
+    for _ in range(3):
+        # half of the trials report metrics below and half above the averages
+        for i, trial in enumerate(running):
+            for _ in range(random.randint(0, 8)):
+                trial.append_metric(
+                    {
+                        "step": len(trial.metric_history),
+                        "value": (random.random() + i % 2) / 2,
+                    }
+                )
+
+        to_stop = rule.earlystop_sweep(running, finalized_trials, direction)
+        expected = [
+            trial.trial_id
+            for trial in running
+            if 0 < len(trial.metric_history) <= 20
+            and reference(trial, finalized_trials, direction) is not None
+        ]
+        assert to_stop == expected
+        assert to_stop
+        # a single trial is checked from the full metric histories
+        assert [
+            trial.trial_id
+            for trial in running
+            if 0 < len(trial.metric_history) <= 20
+            and rule.earlystop_check(trial, finalized_trials, direction) is not None
+        ] == expected
+        finalized_trials.append(_trial(len(finalized_trials) + 100, 20))
+
+
+def test_earlystop_sweep_thresholds_of_checked_steps(monkeypatch):
+    random.seed(2)
+    finalized_trials = [_trial(i, 50) for i in range(10)]
+    rule = MedianStoppingRule(finalized_trials)
+    running = [_trial(i, n_steps) for i, n_steps in enumerate([3, 3, 7], 10)]
+
+    threshold = MedianStoppingRule._threshold
+    indices = []
+
+    def _threshold(self, idx, direction):
+        indices.append(idx)
+        return threshold(self, idx, direction)
+
+    monkeypatch.setattr(MedianStoppingRule, "_threshold", _threshold)
+    rule.earlystop_sweep(running, finalized_trials, "max")
+    # one threshold per distinct step of the checked trials, not per step
+    assert sorted(indices) == [2, 6]
@@ -0,0 +1,181 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import random
+
+import numpy as np
+import pytest
+
+from maggy import Searchspace
+from maggy.optimizer.bayes import GP
+from maggy.trial import Trial
+
+
+@pytest.mark.parametrize("async_strategy", ["impute", "asy_ts"])
+def test_gp_batch_suggestions(tmp_path, monkeypatch, async_strategy):
+    monkeypatch.chdir(tmp_path)
+    sp = Searchspace(x=("DOUBLE", [-2.0, 2.0]), y=("DOUBLE", [-2.0, 2.0]))
+    optimizer = GP(
+        num_warmup_trials=5, random_fraction=0.0, async_strategy=async_strategy
+    )
+    optimizer.num_trials = 20
+    optimizer.searchspace = sp
+    optimizer.trial_store = {}
+    optimizer.final_store = []
+    optimizer.direction = "min"
+    optimizer.seed = 0
+    optimizer._initialize(exp_dir=str(tmp_path))
+
+    # finish the warmup
+    for trial in optimizer.get_suggestions(5):
+        trial.status = Trial.FINALIZED
+        trial.final_metric = trial.params["x"] ** 2 + trial.params["y"] ** 2
+        optimizer.final_store.append(optimizer.trial_store.pop(trial.trial_id))
+
+    suggestions = optimizer.get_suggestions(8)
+    assert len(suggestions) == 8
+    assert all(t.info_dict["sample_type"] == "model" for t in suggestions)
+    # all suggestions are busy and come from one fit of the model
+    assert len(optimizer.trial_store) == 8
+    assert optimizer.model_versions[0] == 1
+    configs = {(t.params["x"], t.params["y"]) for t in suggestions}
+    assert len(configs) == 8
+    assert optimizer.n_pending_suggestions == 1
+
+
+def test_gp_chunked_acquisition(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    sp = Searchspace(x=("DOUBLE", [-2.0, 2.0]), y=("DOUBLE", [-2.0, 2.0]))
+    optimizer = GP(
+        num_warmup_trials=5,
+        acq_optimizer="sampling",
+        acq_optimizer_kwargs={"n_points": 1000, "chunk_size": 128},
+    )
+    optimizer.num_trials = 10
+    optimizer.searchspace = sp
+    optimizer.trial_store = {}
+    optimizer.final_store = []
+    optimizer.direction = "min"
+    optimizer.seed = 0
+    optimizer._initialize(exp_dir=str(tmp_path))
+    for trial in optimizer.get_suggestions(5):
+        trial.status = Trial.FINALIZED
+        trial.final_metric = trial.params["x"] ** 2 + trial.params["y"] ** 2
+        optimizer.final_store.append(optimizer.trial_store.pop(trial.trial_id))
+    optimizer.update_model()
+
+    # record all evaluations of the acquisition function
+    evaluate = optimizer.acq_fun.evaluate
+    chunks = []
+
+    def recording_evaluate(X, **kwargs):
+        values = evaluate(X=X, **kwargs)
+        chunks.append(values)
+        return values
+
+    monkeypatch.setattr(optimizer.acq_fun, "evaluate", recording_evaluate)
+    X, values, _ = optimizer._acquisition_candidates(n_best=10)
+
+    assert max(len(chunk) for chunk in chunks) == 128
+    assert sum(len(chunk) for chunk in chunks) == 1000
+    assert X.shape == (10, 2)
+    assert np.allclose(values, np.sort(np.concatenate(chunks))[:10])
+
+
+def test_gp_evolution_acq_optimizer(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    sp = Searchspace(
+        x=("DOUBLE", [-2.0, 2.0]),
+        n=("INTEGER", [0, 20]),
+        c=("CATEGORICAL", ["a", "b", "c"]),
+    )
+    optimizer = GP(
+        num_warmup_trials=5,
+        random_fraction=0.0,
+        acq_optimizer="evolution",
+        acq_optimizer_kwargs={"population_size": 5, "n_generations": 5},
+    )
+    optimizer.num_trials = 10
+    optimizer.searchspace = sp
+    optimizer.trial_store = {}
+    optimizer.final_store = []
+    optimizer.direction = "min"
+    optimizer.seed = 0
+    optimizer._initialize(exp_dir=str(tmp_path))
+
+    trial = optimizer.get_suggestion()
+    while trial is not None:
+        # mimic the driver
+        optimizer.trial_store[trial.trial_id] = trial
+        trial.status = Trial.FINALIZED
+        trial.final_metric = (
+            trial.params["x"] ** 2
+            + 0.1 * abs(trial.params["n"] - 7)
+            + (trial.params["c"] != "b")
+        )
+        optimizer.final_store.append(optimizer.trial_store.pop(trial.trial_id))
+        trial = optimizer.get_suggestion(trial)
+
+    model_trials = [
+        t for t in optimizer.final_store if t.info_dict["sample_type"] == "model"
+    ]
+    assert model_trials
+    for t in model_trials:
+        assert -2.0 <= t.params["x"] <= 2.0
+        assert t.params["n"] in range(21)
+        assert t.params["c"] in ["a", "b", "c"]
+
+    with pytest.raises(ValueError):
+        GP(async_strategy="asy_ts", acq_optimizer="evolution")
+
+
+def test_gp_random_samples_seeded(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    sp = Searchspace(
+        x=("DOUBLE", [-2.0, 2.0]),
+        n=("INTEGER", [0, 20]),
+        c=("CATEGORICAL", ["a", "b", "c"]),
+    )
+
+    def run(global_seed):
+        # the global random modules must not change the samples
+        random.seed(global_seed)
+        np.random.seed(global_seed)
+        optimizer = GP(num_warmup_trials=3, random_fraction=1.0)
+        optimizer.num_trials = 8
+        optimizer.searchspace = sp
+        optimizer.trial_store = {}
+        optimizer.final_store = []
+        optimizer.direction = "min"
+        optimizer.seed = 0
+        optimizer._initialize(exp_dir=str(tmp_path))
+
+        trial = optimizer.get_suggestion()
+        while trial is not None:
+            optimizer.trial_store[trial.trial_id] = trial
+            trial.status = Trial.FINALIZED
+            trial.final_metric = trial.params["x"] ** 2
+            optimizer.final_store.append(optimizer.trial_store.pop(trial.trial_id))
+            trial = optimizer.get_suggestion(trial)
+        return [t.params for t in optimizer.final_store]
+
+    configs = run(1)
+    assert len(configs) == 8
+    assert configs == run(2)
+    for params in configs:
+        assert -2.0 <= params["x"] <= 2.0
+        assert params["n"] in range(21)
+        assert params["c"] in ["a", "b", "c"]
@@ -0,0 +1,44 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+from maggy import Searchspace
+from maggy.optimizer.hparams_index import HparamsIndex
+from maggy.trial import Trial
+
+
+def test_hparams_index():
+
+    sp = Searchspace(x=("DOUBLE", [0, 10]), y=("INTEGER", [1, 100]), z=("CATEGORICAL", ["a", "b"]))
+    final_store = [Trial({"x": 1.0, "y": 5, "z": "a", "budget": 1})]
+    trial_store = {}
+    busy = Trial({"x": 2.0, "y": 5, "z": "a"})
+    trial_store[busy.trial_id] = busy
+
+    index = HparamsIndex(sp)
+    index.sync(trial_store, final_store)
+    assert len(index) == 2
+    # budget is not part of the config
+    assert index.find(Trial({"x": 1.0, "y": 5, "z": "a", "budget": 3})) == final_store[0].trial_id
+    assert index.find(Trial({"x": 2.0, "y": 5, "z": "a"})) == busy.trial_id
+    assert index.find(Trial({"x": 2.0001, "y": 5, "z": "a"})) is None
+
+    near_index = HparamsIndex(sp, tolerance=0.01)
+    near_index.sync(trial_store, final_store)
+    assert near_index.find(Trial({"x": 2.0001, "y": 5, "z": "a"})) == busy.trial_id
+    assert near_index.find(Trial({"x": 2.0001, "y": 5, "z": "b"})) is None
+    assert near_index.find(Trial({"x": 2.5, "y": 5, "z": "a"})) is None
+    # upper bound falls into the last cell
+    assert near_index.key({"x": 10.0, "y": 100, "z": "a"})[:2] == (99, 99)
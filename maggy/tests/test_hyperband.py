@@ -0,0 +1,71 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import random
+
+from maggy.pruner import AsyncHyperband
+from maggy.pruner.hyperband import SHIteration
+
+
+def test_async_hyperband(tmp_path):
+    random.seed(0)
+    metrics = {}
+    pruner = AsyncHyperband(
+        min_budget=1,
+        max_budget=9,
+        eta=3,
+        n_iterations=3,
+        trial_metric_getter=lambda trial_ids: {
+            trial_id: metrics[trial_id] for trial_id in trial_ids if trial_id in metrics
+        },
+    )
+    pruner.initialize_logger(str(tmp_path))
+
+    # 4 executors, trials finish in random order
+    running = []
+    n_trials = 0
+    early_promotions = 0
+    while True:
+        run = pruner.pruning_routine()
+        while run is not None and run != "IDLE":
+            if run["trial_id"] is not None:
+                iteration = pruner.iterations[pruner.updating_iteration]
+                rung = iteration.current_rung - 1
+                if any(
+                    t["actual_trial_id"] in running for t in iteration.configs[rung]
+                ):
+                    early_promotions += 1
+            trial_id = "trial{}".format(n_trials)
+            n_trials += 1
+            pruner.report_trial(run["trial_id"], trial_id)
+            running.append(trial_id)
+            if len(running) == 4:
+                break
+            run = pruner.pruning_routine()
+        if run is None:
+            break
+        assert running, "pruner is IDLE but no trial is running"
+        trial_id = running.pop(random.randrange(len(running)))
+        metrics[trial_id] = random.random()
+
+    assert pruner.finished()
+    assert n_trials == pruner.num_trials()
+    # trials were promoted before their rung finished
+    assert early_promotions > 0
+    for iteration in pruner.iterations:
+        assert iteration.state == SHIteration.FINISHED
+        for rung, n_configs in enumerate(iteration.n_configs):
+            assert len(iteration.configs[rung]) == n_configs
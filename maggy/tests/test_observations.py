@@ -0,0 +1,84 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import numpy as np
+
+from maggy import Searchspace
+from maggy.optimizer.observations import ObservationStore
+from maggy.trial import Trial
+
+
+def _finalized_trial(params, history):
+    trial = Trial(params)
+    for step, value in enumerate(history):
+        trial.append_metric({"step": step, "value": value})
+    trial.final_metric = history[-1]
+    trial.status = Trial.FINALIZED
+    return trial
+
+
+def test_observation_store_sync():
+
+    sp = Searchspace(x=("DOUBLE", [0, 10]), z=("CATEGORICAL", ["a", "b", "c"]))
+    store = ObservationStore(sp, direction="max", normalize_categorical=True)
+
+    final_store = []
+    # more trials than the initial capacity of the arrays
+    for i in range(100):
+        budget = 1 if i % 2 else 3
+        final_store.append(
+            _finalized_trial(
+                {"x": i / 10, "z": "c", "budget": budget}, [float(i)] * budget
+            )
+        )
+        store.sync(final_store)
+
+    assert len(store) == 100
+    # every trial is only added once
+    store.sync(final_store)
+    assert len(store) == 100
+
+    np.testing.assert_allclose(store.X()[5], [0.05, 1.0])
+    # metrics are negated for maximization
+    assert store.y()[5] == -5.0
+    assert store.y(budget=3).shape == (50,)
+    assert np.all(store.budgets(budget=1) == 1)
+    assert [len(c) for c in store.curves(budget=3)] == [3] * 50
+    np.testing.assert_array_equal(store.curve_lengths(budget=1), np.ones(50))
+    assert store.X(budget=2).shape == (0, 2)
+
+
+def test_observation_store_interim():
+
+    sp = Searchspace(x=("DOUBLE", [0, 10]))
+    store = ObservationStore(sp)
+    final_store = []
+    for n_epochs in [1, 3, 10, 15, 20]:
+        final_store.append(
+            _finalized_trial({"x": n_epochs / 2}, list(range(n_epochs)))
+        )
+
+    store.sync(final_store[:2])
+    Z, y = store.interim(interval=10, max_budget=21)
+    assert len(y) == 2
+    store.sync(final_store)
+    # only the new trials are assembled
+    Z, y = store.interim(interval=10, max_budget=21)
+
+    # every 10th metric and the final metric
+    np.testing.assert_array_equal(y, [0, 2, 9, 9, 14, 9, 19])
+    np.testing.assert_allclose(Z[:, 0], [0.05, 0.15, 0.5, 0.75, 0.75, 1.0, 1.0])
+    np.testing.assert_allclose(Z[:, 1], y / 20)
@@ -0,0 +1,83 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import random
+
+from maggy import Searchspace
+from maggy.optimizer import PBT
+from maggy.trial import Trial
+
+
+def test_pbt(tmp_path):
+    random.seed(0)
+    optimizer = PBT(population_size=6, perturbation_interval=2, max_budget=10)
+    optimizer.searchspace = Searchspace(
+        lr=("DOUBLE", [0.0, 1.0]), layers=("DISCRETE", [1, 2, 4, 8])
+    )
+    optimizer.trial_store = {}
+    optimizer.final_store = []
+    optimizer.direction = "max"
+    optimizer.seed = 0
+    optimizer._initialize(exp_dir=str(tmp_path))
+
+    # training state per trial, resumed from the parent trial
+    checkpoints = {}
+    running = []
+    while True:
+        suggestion = optimizer.get_suggestion()
+        if suggestion is None:
+            break
+        if suggestion != "IDLE":
+            optimizer.trial_store[suggestion.trial_id] = suggestion
+            running.append(suggestion)
+            if len(running) < 4:
+                continue
+        # finish a random trial like its training function would
+        trial = running.pop(random.randrange(len(running)))
+        parent = trial.info_dict.get("parent_trial_id")
+        state = checkpoints[parent] if parent else 0.0
+        start = trial.info_dict.get("parent_budget") or 0
+        for _ in range(start, trial.params["budget"]):
+            state += 1 - abs(trial.params["lr"] - 0.3)
+        checkpoints[trial.trial_id] = state
+        trial.status = Trial.FINALIZED
+        trial.final_metric = state
+        optimizer.final_store.append(optimizer.trial_store.pop(trial.trial_id))
+
+    assert not running
+    assert all(member.last_budget == 10 for member in optimizer.members)
+    exploits = [
+        t for t in optimizer.final_store if t.info_dict["sample_type"] == "exploit"
+    ]
+    assert exploits
+    for t in optimizer.final_store:
+        if t.info_dict["sample_type"] == "random":
+            assert t.params["budget"] == 2
+        else:
+            # resumes from the checkpoint of another trial
+            parent_budget = t.info_dict["parent_budget"]
+            assert t.params["budget"] == min(parent_budget + 2, 10)
+            assert t.params["layers"] in [1, 2, 4, 8]
+    # exploiting moves the population towards the best learning rate
+    final_lrs = [member.hparams["lr"] for member in optimizer.members]
+    initial_lrs = [
+        t.params["lr"]
+        for t in optimizer.final_store
+        if t.info_dict["sample_type"] == "random"
+    ]
+    assert sum(abs(lr - 0.3) for lr in final_lrs) < sum(
+        abs(lr - 0.3) for lr in initial_lrs
+    )
@@ -0,0 +1,52 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import os
+
+from maggy.core.reporter import Reporter
+
+
+def _start_trial(reporter, log_dir, trial_id, parent_trial_id=None, budget=None):
+    """mimic the executor starting a trial"""
+    reporter.set_parent_trial(parent_trial_id, budget)
+    reporter.set_trial_id(trial_id)
+    os.mkdir(os.path.join(log_dir, trial_id))
+    reporter.init_logger(os.path.join(log_dir, trial_id, "output.log"))
+    reporter.init_checkpoints(log_dir)
+
+
+def test_reporter_checkpoints(tmp_path):
+    log_dir = str(tmp_path)
+    reporter = Reporter(os.path.join(log_dir, "executor.log"), 0, 0, print)
+
+    _start_trial(reporter, log_dir, "parent")
+    assert reporter.load_checkpoint() is None
+    assert reporter.get_parent_budget() is None
+    reporter.save_checkpoint({"epoch": 3, "weights": [0.5, 1.5]})
+    reporter.reset()
+
+    _start_trial(reporter, log_dir, "child", parent_trial_id="parent", budget=3)
+    assert reporter.get_parent_budget() == 3
+    assert reporter.get_parent_checkpoint_dir() == os.path.join(
+        log_dir, "parent", Reporter.CHECKPOINT_DIR
+    )
+    assert reporter.load_checkpoint() == {"epoch": 3, "weights": [0.5, 1.5]}
+    assert reporter.get_checkpoint_dir() == os.path.join(
+        log_dir, "child", Reporter.CHECKPOINT_DIR
+    )
+    reporter.reset()
+    assert reporter.get_parent_checkpoint_dir() is None
+    reporter.close_logger()
@@ -0,0 +1,56 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+from maggy import Searchspace
+from maggy.optimizer.bayes import RF
+from maggy.trial import Trial
+
+
+def test_rf_discrete_searchspace(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # no continuous hparams, not supported by GP and TPE
+    sp = Searchspace(
+        x=("DISCRETE", [-2, -1, 0, 1, 2]),
+        y=("INTEGER", [0, 10]),
+        c=("CATEGORICAL", ["a", "b", "c"]),
+    )
+    optimizer = RF(num_warmup_trials=5, random_fraction=0.0)
+    optimizer.num_trials = 20
+    optimizer.searchspace = sp
+    optimizer.trial_store = {}
+    optimizer.final_store = []
+    optimizer.direction = "min"
+    optimizer.seed = 0
+    optimizer._initialize(exp_dir=str(tmp_path))
+
+    trial = optimizer.get_suggestion()
+    while trial is not None:
+        assert trial.params["x"] in sp.x and trial.params["c"] in sp.c
+        # mimic the driver
+        optimizer.trial_store[trial.trial_id] = trial
+        trial.status = Trial.FINALIZED
+        trial.final_metric = (
+            (trial.params["x"] - 1) ** 2
+            + 0.1 * trial.params["y"]
+            + (trial.params["c"] != "b")
+        )
+        optimizer.final_store.append(optimizer.trial_store.pop(trial.trial_id))
+        trial = optimizer.get_suggestion(trial)
+
+    assert len(optimizer.final_store) == 20
+    assert 0 in optimizer.models
+    sample_types = [t.info_dict["sample_type"] for t in optimizer.final_store]
+    assert "model" in sample_types
@@ -18,6 +18,8 @@ import pytest
 import time
 import random
 
+import numpy as np
+
 from maggy import Searchspace
 
 
@@ -75,3 +77,80 @@ def test_searchspace_add():
         # Non numeric interval boundaries
         sp.add("param2", ("DOUBLE", ["lower", 5]))
     assert "type DOUBLE need to be integer or float:" in str(excinfo.value)
+
+
+def test_searchspace_transform_batch():
+
+    sp = Searchspace(
+        x=("DOUBLE", [-3, 3]),
+        y=("INTEGER", [1, 10]),
+        z=("CATEGORICAL", ["red", "green", "blue"]),
+    )
+    rows = [
+        sp.dict_to_list(hparams) for hparams in sp.get_random_parameter_values(100)
+    ]
+
+    for normalize_categorical in [False, True]:
+        expected = [
+            sp.transform(row, normalize_categorical=normalize_categorical)
+            for row in rows
+        ]
+        transformed = sp.transform_batch(
+            rows, normalize_categorical=normalize_categorical
+        )
+        assert transformed.shape == (100, 3)
+        assert np.allclose(transformed, expected)
+
+        hparams = sp.inverse_transform_batch(
+            transformed, normalize_categorical=normalize_categorical
+        )
+        assert [list(row) for row in hparams] == [
+            sp.inverse_transform(row, normalize_categorical=normalize_categorical)
+            for row in transformed
+        ]
+        assert type(hparams[0][1]) == int
+
+
+def test_searchspace_transform_discrete():
+
+    sp = Searchspace(
+        x=("DISCRETE", [1, 2, 4, 8]),
+        z=("CATEGORICAL", ["red", "green", "blue"]),
+    )
+    # DISCRETE hparams are encoded by their index like CATEGORICAL hparams
+    assert sp.transform([4, "blue"]) == [2, 2]
+    assert sp.transform([8, "red"], normalize_categorical=True) == [1.0, 0.0]
+    assert np.allclose(
+        sp.transform_batch([[4, "blue"], [1, "green"]]), [[2, 2], [0, 1]]
+    )
+
+    hparams = sp.inverse_transform_batch(
+        sp.sample_transformed(100, normalize_categorical=True),
+        normalize_categorical=True,
+    )
+    assert {row[0] for row in hparams} == {1, 2, 4, 8}
+    assert sp.inverse_transform([1.0, 0.5], normalize_categorical=True) == [8, "green"]
+
+
+def test_searchspace_sample_transformed():
+
+    sp = Searchspace(
+        x=("DOUBLE", [-3, 3]),
+        y=("INTEGER", [1, 4]),
+        z=("CATEGORICAL", ["red", "green", "blue"]),
+    )
+
+    samples = sp.sample_transformed(1000, rng=np.random.default_rng(1))
+    assert samples.shape == (1000, 3)
+    # same seed, same candidates
+    assert np.array_equal(samples, sp.sample_transformed(1000, np.random.default_rng(1)))
+
+    assert np.all((samples[:, 0] >= 0) & (samples[:, 0] <= 1))
+    assert set(np.round(samples[:, 1] * 3, 8)) == {0, 1, 2, 3}
+    assert set(samples[:, 2]) == {0, 1, 2}
+
+    hparams = sp.inverse_transform_batch(
+        sp.sample_transformed(100, normalize_categorical=True),
+        normalize_categorical=True,
+    )
+    assert all(1 <= row[1] <= 4 and row[2] in sp.z for row in hparams)
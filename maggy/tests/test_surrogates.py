@@ -0,0 +1,123 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import numpy as np
+from skopt.learning.gaussian_process import GaussianProcessRegressor
+from skopt.learning.gaussian_process.kernels import ConstantKernel, Matern
+
+from maggy.optimizer.bayes.surrogates import (
+    IncrementalGaussianProcessRegressor,
+    ParzenEstimator,
+    SparseGaussianProcessRegressor,
+    _without_white_kernel,
+)
+
+
+def test_incremental_gp():
+
+    rng = np.random.default_rng(0)
+    X = rng.random((40, 2))
+    y = np.sin(X.dot([3, 1])) + 0.05 * rng.standard_normal(40)
+    kernel = ConstantKernel(1.0, (0.01, 1000.0)) * Matern(
+        length_scale=np.ones(2), length_scale_bounds=[(0.01, 100)] * 2, nu=2.5
+    )
+    model = IncrementalGaussianProcessRegressor(
+        kernel=kernel, normalize_y=True, noise="gaussian", refit_every=10
+    )
+
+    # the last two rows are temporary observations, e.g. busy trials
+    assert model.update(X[:12], y[:12], n_fixed=10)
+    refits = [model.update(X[:n], y[:n], n_fixed=n - 2) for n in range(13, 31)]
+    assert sum(refits) == 1
+    assert model.n_refits_ == 2
+    # warm starts neither change the constructor params nor stack white noise terms
+    assert model.get_params()["kernel"] is kernel
+    assert model.get_params()["n_restarts_optimizer"] == 0
+    assert str(model.kernel_).count("WhiteKernel") == 1
+
+    # same posterior as a full fit with the same kernel hyperparameters
+    reference = GaussianProcessRegressor(
+        kernel=_without_white_kernel(model.kernel_),
+        optimizer=None,
+        normalize_y=True,
+        noise=model.noise_,
+    ).fit(X[:30], y[:30])
+    X_test = rng.random((5, 2))
+    for actual, expected in zip(
+        model.predict(X_test, return_std=True),
+        reference.predict(X_test, return_std=True),
+    ):
+        np.testing.assert_allclose(actual, expected, atol=1e-8)
+
+
+def test_sparse_gp():
+
+    rng = np.random.default_rng(0)
+    X = rng.random((300, 2))
+    y = np.sin(X.dot([3, 1])) + 0.05 * rng.standard_normal(300)
+    kernel = ConstantKernel(1.0, (0.01, 1000.0)) * Matern(
+        length_scale=np.ones(2), length_scale_bounds=[(0.01, 100)] * 2, nu=2.5
+    )
+    model = SparseGaussianProcessRegressor(
+        kernel=kernel, normalize_y=True, noise="gaussian", n_inducing=100
+    )
+    # the second fit is warm started
+    model.fit(X[:200], y[:200]).fit(X, y)
+    assert model.sparse_
+    assert model.X_train_.shape == (100, 2)
+    assert model.get_params()["kernel"] is kernel
+    assert str(model.kernel_).count("WhiteKernel") == 1
+
+    # close to the posterior of an exact gaussian process with the same kernel hyperparameters
+    reference = GaussianProcessRegressor(
+        kernel=_without_white_kernel(model.kernel_),
+        optimizer=None,
+        normalize_y=True,
+        noise=model.noise_,
+    ).fit(X, y)
+    X_test = rng.random((5, 2))
+    mean, std = model.predict(X_test, return_std=True)
+    expected_mean, expected_std = reference.predict(X_test, return_std=True)
+    np.testing.assert_allclose(mean, expected_mean, atol=0.02)
+    np.testing.assert_allclose(std, expected_std, atol=0.02)
+
+    _, cov = model.predict(X_test, return_cov=True)
+    np.testing.assert_allclose(np.sqrt(np.diag(cov)), std, rtol=1e-5)
+
+
+def test_parzen_estimator():
+
+    rng = np.random.default_rng(0)
+    data = np.column_stack([rng.random(30), rng.integers(0, 3, 30)])
+    kde = ParzenEstimator(var_type="cu", n_levels=[0, 3]).fit(data)
+
+    # normal reference rule of thumb, like statsmodels' KDEMultivariate
+    assert np.allclose(kde.bw, 1.06 * data.std(axis=0) * 30 ** (-1 / 6))
+
+    # the density integrates to 1 over [0,1] x categories
+    grid = np.linspace(0, 1, 2001)
+    X = np.array([[x, c] for c in range(3) for x in grid])
+    integral = kde.pdf(X).reshape(3, -1).mean(axis=1).sum()
+    assert np.isclose(integral, 1.0, atol=1e-3)
+
+    # moving observations in and out gives the same estimator as fitting from scratch
+    ids = np.arange(5, 35)
+    more = np.column_stack([rng.random(5), rng.integers(0, 3, 5)])
+    all_data = np.concatenate((data, more))
+    kde.update(all_data[5:], ids)
+    scratch = ParzenEstimator(var_type="cu", n_levels=[0, 3]).fit(all_data[5:])
+    assert np.allclose(kde.bw, scratch.bw)
+    assert np.allclose(kde.log_pdf(X), scratch.log_pdf(X))
@@ -0,0 +1,76 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import numpy as np
+
+from maggy import Searchspace
+from maggy.optimizer.bayes import TPE
+from maggy.trial import Trial
+
+
+def _run_tpe(tmp_path, num_trials, **kwargs):
+    sp = Searchspace(
+        x=("DOUBLE", [-2.0, 2.0]),
+        n=("INTEGER", [0, 10]),
+        c=("CATEGORICAL", ["a", "b", "c"]),
+    )
+    optimizer = TPE(num_warmup_trials=10, random_fraction=0.0, **kwargs)
+    optimizer.num_trials = num_trials
+    optimizer.searchspace = sp
+    optimizer.trial_store = {}
+    optimizer.final_store = []
+    optimizer.direction = "min"
+    optimizer.seed = 0
+    optimizer._initialize(exp_dir=str(tmp_path))
+
+    trial = optimizer.get_suggestion()
+    while trial is not None:
+        # mimic the driver
+        optimizer.trial_store[trial.trial_id] = trial
+        trial.status = Trial.FINALIZED
+        trial.final_metric = (
+            trial.params["x"] ** 2
+            + 0.1 * abs(trial.params["n"] - 3)
+            + (trial.params["c"] != "b")
+        )
+        optimizer.final_store.append(optimizer.trial_store.pop(trial.trial_id))
+        trial = optimizer.get_suggestion(trial)
+    return optimizer
+
+
+def test_tpe_batch_sampling(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    optimizer = _run_tpe(tmp_path, 30, n_samples=512)
+
+    model_trials = [
+        t for t in optimizer.final_store if t.info_dict["sample_type"] == "model"
+    ]
+    assert model_trials
+    for t in model_trials:
+        assert -2.0 <= t.params["x"] <= 2.0
+        assert t.params["n"] in range(11)
+        assert t.params["c"] in ["a", "b", "c"]
+
+    # all samples are drawn and evaluated at once
+    kde_good = optimizer.models[0]["good"]
+    kde_bad = optimizer.models[0]["bad"]
+    samples = optimizer._sample_kde(kde_good, 512)
+    assert samples.shape == (512, 3)
+    assert np.all((samples[:, :2] >= 0) & (samples[:, :2] <= 1))
+    assert set(np.unique(samples[:, 2])) <= {0.0, 1.0, 2.0}
+    ei_values = optimizer._calculate_ei(samples, kde_good, kde_bad)
+    assert ei_values.shape == (512,)
+    assert np.all(ei_values > 0)
@@ -17,8 +17,9 @@
 import pytest
 import time
 import random
+import json
 
-from maggy import Trial
+from maggy.trial import Trial
 
 
 def test_trial_init():
@@ -46,3 +47,65 @@ def test_trial_serialization():
     assert new_trial.params == exp
     assert new_trial.status == Trial.PENDING
     assert new_trial.trial_id == "3d1cc9fdb1d4d001"
+
+
+def test_trial_json_metric_history():
+
+    trial = Trial({"param1": 5, "param2": "ada"})
+    trial.append_metric({"step": 0, "value": 0.5})
+    trial.append_metric({"step": 1, "value": 0.7})
+
+    obj = json.loads(trial.to_json())
+
+    assert obj["metric_history"] == [0.5, 0.7]
+    assert obj["step_history"] == [0, 1]
+    assert all(isinstance(step, int) for step in obj["step_history"])
+    assert obj["metric_dict"] == {"0": 0.5, "1": 0.7}
+    assert list(Trial.from_json(trial.to_json()).step_history) == [0, 1]
+
+
+def test_trial_append_metric():
+
+    trial = Trial({"param1": 5, "param2": "ada"})
+
+    assert trial.append_metric({"step": 0, "value": 0.5}) == 0
+    # heartbeats resend the last metric, duplicate steps are ignored
+    assert trial.append_metric({"step": 0, "value": 0.5}) is None
+    assert trial.append_metric({"step": 1, "value": None}) is None
+    assert trial.append_metric({"step": 2, "value": 0.7}) == 2
+
+    assert list(trial.metric_history) == [0.5, 0.7]
+    assert list(trial.step_history) == [0, 2]
+    assert trial.metric_dict == {0: 0.5, 2: 0.7}
+
+
+def test_trial_fractional_steps():
+
+    trial = Trial({"param1": 5, "param2": "ada"})
+
+    for step, value in [(0.5, 0.1), (1, 0.2), (1.5, 0.3), (2, 0.4)]:
+        assert trial.append_metric({"step": step, "value": value}) == step
+    assert trial.append_metric({"step": 1.5, "value": 0.3}) is None
+
+    assert list(trial.metric_history) == [0.1, 0.2, 0.3, 0.4]
+    assert trial.step_history == [0.5, 1, 1.5, 2]
+    assert trial.metric_dict == {0.5: 0.1, 1: 0.2, 1.5: 0.3, 2: 0.4}
+
+    obj = json.loads(trial.to_json())
+    assert obj["step_history"] == [0.5, 1, 1.5, 2]
+    assert obj["metric_dict"] == {"0.5": 0.1, "1": 0.2, "1.5": 0.3, "2": 0.4}
+    assert Trial.from_bytes(trial.to_bytes()).step_history == [0.5, 1, 1.5, 2]
+
+
+def test_trial_binary_serialization():
+
+    trial = Trial({"param1": 5, "param2": "ada"}, info_dict={"sample_type": "random"})
+    for step in range(3):
+        trial.append_metric({"step": step, "value": step * 0.1})
+    trial.final_metric = 0.2
+
+    new_trial = Trial.from_bytes(trial.to_bytes())
+
+    assert new_trial.to_json() == trial.to_json()
+    assert new_trial.trial_id == "3d1cc9fdb1d4d001"
+    assert new_trial.info_dict == {"sample_type": "random"}
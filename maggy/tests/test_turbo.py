@@ -0,0 +1,74 @@
+#
+#   Copyright 2021 Logical Clocks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import numpy as np
+
+from maggy import Searchspace
+from maggy.optimizer.bayes import TuRBO
+from maggy.trial import Trial
+
+
+def test_turbo_trust_regions(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    sp_kwargs = {"x{}".format(i): ("DOUBLE", [-1.0, 1.0]) for i in range(10)}
+    sp_kwargs["n"] = ("INTEGER", [0, 10])
+    sp_kwargs["c"] = ("CATEGORICAL", ["a", "b", "c"])
+    sp = Searchspace(**sp_kwargs)
+    optimizer = TuRBO(
+        n_trust_regions=2,
+        failure_tolerance=2,
+        max_observations=20,
+        num_warmup_trials=12,
+        random_fraction=0.0,
+        acq_optimizer_kwargs={"n_points": 500},
+    )
+    optimizer.num_trials = 30
+    optimizer.searchspace = sp
+    optimizer.trial_store = {}
+    optimizer.final_store = []
+    optimizer.direction = "min"
+    optimizer.seed = 0
+    optimizer._initialize(exp_dir=str(tmp_path))
+
+    lengths = set()
+    trial = optimizer.get_suggestion()
+    while trial is not None:
+        lengths.update(r.length for r in optimizer.trust_regions)
+        # mimic the driver
+        optimizer.trial_store[trial.trial_id] = trial
+        trial.status = Trial.FINALIZED
+        trial.final_metric = (
+            sum(trial.params["x{}".format(i)] ** 2 for i in range(10))
+            + 0.1 * abs(trial.params["n"] - 3)
+            + (trial.params["c"] != "b")
+        )
+        optimizer.final_store.append(optimizer.trial_store.pop(trial.trial_id))
+        trial = optimizer.get_suggestion(trial)
+
+    assert len(optimizer.final_store) == 30
+    assert len(optimizer.trust_regions) == 2
+    # the regions have been shrunk or expanded
+    assert lengths - {optimizer.length_init}
+    # local models are fit on at most `max_observations` observations
+    for model, _ in optimizer.region_models[0]:
+        assert len(model.X_train_) <= 20
+
+    for t in optimizer.final_store:
+        if t.info_dict["sample_type"] == "model":
+            assert t.params["n"] in range(11) and t.params["c"] in ["a", "b", "c"]
+    warmup_best = min(t.final_metric for t in optimizer.final_store[:12])
+    assert min(t.final_metric for t in optimizer.final_store) <= warmup_best
+    assert np.isfinite(warmup_best)
@@ -15,11 +15,16 @@
 #
 
 import json
+import struct
 import threading
 import hashlib
+from array import array
 
 from maggy import util
 
+# trials share a fixed pool of locks instead of holding one lock per instance
+_LOCK_STRIPES = tuple(threading.RLock() for _ in range(64))
+
 
 class Trial(object):
     """A Trial object contains all relevant information about the evaluation
@@ -28,6 +33,11 @@ class Trial(object):
     It is used as shared memory between
     the worker thread and rpc server thread. The server thread performs only
     lookups on the `early_stop` and `params` attributes.
+
+    To keep the memory footprint of the driver small for experiments with many
+    trials, the attributes are stored in slots and the metric history is
+    stored once as two growable `array('d')` of steps and values. Whole
+    numbered steps are returned as integers, like the reporter sends them.
     """
 
     PENDING = "PENDING"
@@ -36,6 +46,36 @@ class Trial(object):
     ERROR = "ERROR"
     FINALIZED = "FINALIZED"
 
+    __slots__ = (
+        "trial_type",
+        "trial_id",
+        "params",
+        "status",
+        "early_stop",
+        "final_metric",
+        "start",
+        "duration",
+        "info_dict",
+        "_steps",
+        "_values",
+    )
+
+    # attributes that are serialized, in order
+    _SERIALIZED = (
+        "trial_type",
+        "trial_id",
+        "params",
+        "status",
+        "early_stop",
+        "final_metric",
+        "duration",
+        "info_dict",
+    )
+    # magic number and version of the binary format, see `to_bytes()`
+    _BINARY_HEADER = struct.Struct(">4sBII")
+    _BINARY_MAGIC = b"MGTR"
+    _BINARY_VERSION = 3
+
     def __init__(self, params, trial_type="optimization", info_dict=None):
         """Create a new trial object from a hyperparameter combination
         ``params``.
@@ -69,17 +109,46 @@ class Trial(object):
         self.status = Trial.PENDING
         self.early_stop = False
         self.final_metric = None
-        self.metric_history = []
-        self.step_history = []
-        self.metric_dict = {}
+        self._steps = array("d")
+        self._values = array("d")
         self.start = None
         self.duration = None
-        self.lock = threading.RLock()
         if info_dict is None:
             self.info_dict = {}
         else:
             self.info_dict = info_dict
 
+    @property
+    def lock(self):
+        """Lock guarding the trial, shared with other trials of the same stripe."""
+        return _LOCK_STRIPES[hash(self.trial_id) % len(_LOCK_STRIPES)]
+
+    @property
+    def metric_history(self):
+        """Metric values of the unique steps, in the order they were reported.
+
+        :rtype: array.array
+        """
+        return self._values
+
+    @metric_history.setter
+    def metric_history(self, values):
+        self._values = array("d", values)
+        self._steps = array("d", range(len(self._values)))
+
+    @property
+    def step_history(self):
+        """Unique steps that reported a metric, built on access.
+
+        :rtype: list
+        """
+        return [_step(step) for step in self._steps]
+
+    @property
+    def metric_dict(self):
+        """Metric history as dict with steps as keys, built on access."""
+        return dict(zip(map(_step, self._steps), self._values))
+
     def get_early_stop(self):
         """Return the early stopping flag of the trial."""
         with self.lock:
@@ -91,22 +160,35 @@ class Trial(object):
             self.early_stop = True
 
     def append_metric(self, metric_data):
-        """Append a metric from the heartbeats to the history."""
+        """Append a metric from the heartbeats to the history.
+
+        The reporter only allows monotonically increasing steps, hence a step
+        is new if and only if it is larger than the last recorded step.
+        """
         with self.lock:
-            # from python 3.7 dicts are insertion ordered,
-            # so two of these data structures can be removed
-            if (
-                metric_data["step"] not in self.metric_dict
-                and metric_data["value"] is not None
+            step = metric_data["step"]
+            if metric_data["value"] is not None and (
+                not self._steps or step > self._steps[-1]
             ):
-                self.metric_dict[metric_data["step"]] = metric_data["value"]
-                self.metric_history.append(metric_data["value"])
-                self.step_history.append(metric_data["step"])
+                self._steps.append(step)
+                self._values.append(metric_data["value"])
                 # return step number to indicate that it was a new unique step
-                return metric_data["step"]
+                return step
             # return None to indicate that no new step has finished
             return None
 
+    def __getstate__(self):
+        return {
+            slot: getattr(self, slot, None)
+            for slot in Trial.__slots__
+            if slot != "start"
+        }
+
+    def __setstate__(self, state):
+        self.start = None
+        for slot, value in state.items():
+            setattr(self, slot, value)
+
     @classmethod
     def _generate_id(cls, params):
         """
@@ -136,18 +218,124 @@ class Trial(object):
         raise ValueError("Hyperparameters need to be a dictionary.")
 
     def to_json(self):
-        return json.dumps(self.to_dict(), default=util.json_default_numpy)
+        return "".join(self.iter_json())
+
+    def iter_json(self, chunk_size=1024):
+        """Serializes the trial to json piece by piece, e.g. to write it to a
+        file without materializing the whole string or copying the metric
+        history into lists.
+
+        :param chunk_size: number of metric history entries per yielded piece
+        :type chunk_size: int
+        :return: generator of json string pieces
+        :rtype: generator
+        """
+        yield '{"__class__": ' + json.dumps(self.__class__.__name__)
+        for attr in Trial._SERIALIZED:
+            if attr == "duration":
+                # the metric history precedes the duration, like in the
+                # attribute dict of former versions
+                yield from self._iter_json_history(chunk_size)
+            yield ", {}: {}".format(
+                json.dumps(attr),
+                json.dumps(getattr(self, attr), default=util.json_default_numpy),
+            )
+        yield "}"
+
+    def _iter_json_history(self, chunk_size):
+        """Yields the json pieces of `metric_history`, `step_history` and
+        `metric_dict`, `chunk_size` entries at a time."""
+        for key, history in (
+            ("metric_history", self._values),
+            ("step_history", self._steps),
+            ("metric_dict", None),
+        ):
+            yield ", {}: {}".format(
+                json.dumps(key), "[" if history is not None else "{"
+            )
+            for i in range(0, len(self._values), chunk_size):
+                # only one chunk is converted at a time
+                if history is None:
+                    chunk = dict(
+                        zip(
+                            map(_step, self._steps[i : i + chunk_size]),
+                            self._values[i : i + chunk_size],
+                        )
+                    )
+                elif history is self._steps:
+                    chunk = [_step(step) for step in history[i : i + chunk_size]]
+                else:
+                    chunk = history[i : i + chunk_size].tolist()
+                yield ("" if i == 0 else ", ") + json.dumps(chunk)[1:-1]
+            yield "]" if history is not None else "}"
 
     def to_dict(self):
         obj_dict = {"__class__": self.__class__.__name__}
+        for attr in Trial._SERIALIZED:
+            if attr == "duration":
+                obj_dict["metric_history"] = self._values
+                obj_dict["step_history"] = self.step_history
+                obj_dict["metric_dict"] = self.metric_dict
+            obj_dict[attr] = getattr(self, attr)
 
-        temp_dict = self.__dict__.copy()
-        temp_dict.pop("lock")
-        temp_dict.pop("start")
+        return obj_dict
 
-        obj_dict.update(temp_dict)
+    def to_bytes(self):
+        """Serializes the trial to a compact binary representation.
 
-        return obj_dict
+        The format is a header with magic number, version, length of the json
+        encoded scalar attributes and length of the metric history, followed
+        by the json attributes and the raw (native byte order) step and value
+        arrays.
+
+        :return: binary representation of the trial
+        :rtype: bytes
+        """
+        meta = json.dumps(
+            {attr: getattr(self, attr) for attr in Trial._SERIALIZED},
+            default=util.json_default_numpy,
+        ).encode("utf-8")
+        header = Trial._BINARY_HEADER.pack(
+            Trial._BINARY_MAGIC, Trial._BINARY_VERSION, len(meta), len(self._values)
+        )
+        return b"".join(
+            (header, meta, memoryview(self._steps), memoryview(self._values))
+        )
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Creates a Trial instance from the output of `to_bytes()`.
+
+        :param data: binary representation of the trial
+        :type data: bytes
+        :raises ValueError: data is not a binary Trial object.
+        :return: Instantiated object instance of Trial.
+        :rtype: Trial
+        """
+        data = memoryview(data)
+        header_size = cls._BINARY_HEADER.size
+        magic, version, meta_len, n_steps = cls._BINARY_HEADER.unpack(
+            data[:header_size]
+        )
+        if magic != cls._BINARY_MAGIC or version != cls._BINARY_VERSION:
+            raise ValueError("data is not a binary Trial object.")
+
+        meta = json.loads(bytes(data[header_size : header_size + meta_len]))
+        instance = cls.__new__(cls)
+        instance.start = None
+        for attr in cls._SERIALIZED:
+            setattr(instance, attr, meta[attr])
+
+        offset = header_size + meta_len
+        instance._steps = array("d")
+        n_bytes = n_steps * instance._steps.itemsize
+        instance._steps.frombytes(data[offset : offset + n_bytes])
+        offset += n_bytes
+        instance._values = array("d")
+        n_bytes = n_steps * instance._values.itemsize
+        instance._values.frombytes(data[offset : offset + n_bytes])
+
+        return instance
 
     @classmethod
     def from_json(cls, json_str):
@@ -171,6 +359,14 @@ class Trial(object):
             instance.early_stop = temp_dict.get("early_stop", False)
             instance.final_metric = temp_dict["final_metric"]
             instance.metric_history = temp_dict["metric_history"]
+            if "step_history" in temp_dict:
+                instance._steps = array("d", temp_dict["step_history"])
             instance.duration = temp_dict["duration"]
+            instance.info_dict = temp_dict.get("info_dict", {})
 
         return instance
+
+
+def _step(step):
+    """returns a step of the history as int if it is a whole number"""
+    return int(step) if step.is_integer() else step
@@ -19,6 +19,7 @@
 import math
 import os
 import json
+from array import array
 
 import numpy as np
 from pyspark import TaskContext
@@ -91,7 +92,7 @@ def json_default_numpy(obj):
         return int(obj)
     elif isinstance(obj, np.floating):
         return float(obj)
-    elif isinstance(obj, np.ndarray):
+    elif isinstance(obj, (np.ndarray, array)):
         return obj.tolist()
     else:
         raise TypeError(
@@ -32,7 +32,7 @@ setup(
     name='maggy',
     version=version,
     install_requires=[
-        'numpy==1.19.2', 'scikit-optimize==0.7.4', 'statsmodels==0.12.2', 'scipy==1.6.3'
+        'numpy==1.19.2', 'scikit-optimize==0.7.4', 'scipy==1.6.3'
     ],
     extras_require={
         'pydoop': ['pydoop'],